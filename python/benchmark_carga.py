@@ -0,0 +1,149 @@
+from dotenv import load_dotenv
+from os import getenv, path
+from subprocess import Popen
+import argparse
+import json
+import os
+import sys
+import time
+import mysql.connector
+
+load_dotenv()
+
+# Mede a carga de ponta a ponta (processo separado, como em produção) para cada modo,
+# reportando linhas/s e o pico de memória (RSS) do processo de carga. Usa o banco do .env:
+# as tabelas precisam estar vazias, ou serem esvaziadas com --truncar antes de cada modo.
+
+current_path = path.dirname(path.abspath(__file__))
+
+TABELAS = ["Analise", "Abastecido", "Coleta_Amostra_LocalColeta", "Classificacao", "Abastecimento", "Municipio", "Estado"]
+
+
+def modos(workers):
+    return {
+        "linha": ["load_csv.py", "--batch-size", "1"],
+        "lote": ["load_csv.py"],
+        "paralelo": ["load_csv.py", "--workers", str(workers)],
+        "delta": ["load_csv.py", "--delta"],
+        "staging": ["load_staging.py"],
+    }
+
+
+def conectar():
+    return mysql.connector.connect(
+        host=getenv("db_host"),
+        user=getenv("db_user"),
+        password=getenv("db_password"),
+        database=getenv("db_name")
+    )
+
+
+def contar_linhas(caminho):
+    with open(caminho, "rb") as arquivo:
+        return sum(1 for _ in arquivo) - 1
+
+
+def preparar_banco(truncar):
+    conn = conectar()
+    cursor = conn.cursor()
+    if truncar:
+        cursor.execute("SET foreign_key_checks = 0")
+        for tabela in TABELAS + ["Carga_Impressao"]:
+            cursor.execute(f"SHOW TABLES LIKE '{tabela}'")
+            if cursor.fetchall():
+                cursor.execute(f"TRUNCATE TABLE {tabela}")
+        cursor.execute("SET foreign_key_checks = 1")
+    else:
+        for tabela in TABELAS:
+            cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {tabela})")
+            if cursor.fetchone()[0]:
+                raise SystemExit(f"A tabela {tabela} não está vazia; use --truncar para esvaziá-la antes de cada modo.")
+    cursor.close()
+    conn.close()
+
+
+def pico_rss_windows(processo):
+    """Espera o processo e retorna o pico de memória (bytes) amostrado com psutil, ou None sem psutil."""
+    try:
+        import psutil
+    except ImportError:
+        processo.wait()
+        return None
+    filho = psutil.Process(processo.pid)
+    pico = 0
+    # peak_wset é o pico do próprio Windows; basta a última leitura antes de o processo terminar
+    while processo.poll() is None:
+        try:
+            pico = max(pico, filho.memory_info().peak_wset)
+        except psutil.Error:
+            pass
+        time.sleep(0.1)
+    return pico
+
+
+def executar(comando):
+    """Executa a carga e retorna (segundos, pico de RSS em MB ou None, código de saída)."""
+    inicio = time.perf_counter()
+    processo = Popen(comando)
+    if hasattr(os, "wait4"):
+        # wait4 (só POSIX) devolve o uso de recursos só deste filho (e dos processos que ele esperou);
+        # o getrusage(RUSAGE_CHILDREN) acumularia o máximo dos modos anteriores
+        _, status, uso = os.wait4(processo.pid, 0)
+        segundos = time.perf_counter() - inicio
+        # ru_maxrss vem em KB no Linux e em bytes no macOS
+        divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return segundos, uso.ru_maxrss / divisor, os.waitstatus_to_exitcode(status)
+    # Windows: sem wait4, o pico vem do psutil, se estiver instalado
+    pico = pico_rss_windows(processo)
+    segundos = time.perf_counter() - inicio
+    return segundos, None if pico is None else pico / (1024 * 1024), processo.returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de ponta a ponta dos modos de carga.")
+    parser.add_argument("arquivo", help="CSV de entrada (ex.: gerado por gerar_dados_sinteticos.py)")
+    parser.add_argument("--modos", default="lote,paralelo,staging",
+                        help="modos separados por vírgula, entre linha, lote, paralelo, delta e staging (padrão: %(default)s)")
+    parser.add_argument("--workers", type=int, default=4, help="processos do modo paralelo (padrão: %(default)s)")
+    parser.add_argument("--truncar", action="store_true", help="esvazia as tabelas do banco do .env antes de cada modo")
+    parser.add_argument("--saida", help="grava os resultados também em JSON")
+    args = parser.parse_args()
+
+    disponiveis = modos(args.workers)
+    escolhidos = [modo.strip() for modo in args.modos.split(",")]
+    desconhecidos = [modo for modo in escolhidos if modo not in disponiveis]
+    if desconhecidos:
+        parser.error(f"modos desconhecidos: {', '.join(desconhecidos)}")
+
+    linhas = contar_linhas(args.arquivo)
+    print(f"{args.arquivo}: {linhas} linhas")
+
+    resultados = []
+    for modo in escolhidos:
+        preparar_banco(args.truncar)
+        script, *opcoes = disponiveis[modo]
+        comando = [sys.executable, path.join(current_path, script), args.arquivo, *opcoes]
+        print(f"\n== {modo}: {' '.join(comando)}")
+        segundos, rss, codigo = executar(comando)
+        resultados.append({
+            "modo": modo,
+            "linhas": linhas,
+            "segundos": round(segundos, 2),
+            "linhas_por_segundo": round(linhas / segundos, 1),
+            "pico_rss_mb": None if rss is None else round(rss, 1),
+            "codigo_saida": codigo,
+        })
+
+    print(f"\n{'modo':<10} {'segundos':>10} {'linhas/s':>12} {'pico RSS (MB)':>14}")
+    for resultado in resultados:
+        falha = "" if resultado["codigo_saida"] == 0 else f"  (falhou: código {resultado['codigo_saida']})"
+        rss = "n/d" if resultado["pico_rss_mb"] is None else resultado["pico_rss_mb"]
+        print(f"{resultado['modo']:<10} {resultado['segundos']:>10} {resultado['linhas_por_segundo']:>12} {rss:>14}{falha}")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultados, arquivo, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
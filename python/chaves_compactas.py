@@ -0,0 +1,110 @@
+from os import getenv
+
+# Carga do esquema compacto (sql/tabelas_compacto_squema.sql): as tuplas de extrair_valores, com
+# as chaves naturais, viram tuplas com os ids inteiros de Município, Abastecimento, Classificação
+# e Coleta. Os ids são atribuídos aqui, em sequência a partir do maior id já gravado, e ficam num
+# dicionário em memória: cada chave natural é resolvida no banco uma vez só, no início da carga.
+
+BANCO = getenv("db_name_compacto", "Projeto_final_compacto")
+
+QUERIES_COMPACTO = {
+    "Estado": """
+        INSERT IGNORE INTO Estado (UF, Regiao)
+        VALUES (%s, %s)
+    """,
+    "Dim_Municipio": """
+        INSERT IGNORE INTO Dim_Municipio (IdMunicipio, CodigoDoIBGE, RegionalDeSaude, NomeMunicipio, fk_Estado_UF)
+        VALUES (%s, %s, %s, %s, %s)
+    """,
+    "Dim_Abastecimento": """
+        INSERT IGNORE INTO Dim_Abastecimento (IdAbastecimento, CodigoFormaDeAbastecimento, TipoDaFormaDeAbastecimento, NomeETA_UTA, NomeDaFormaDeAbastecimento)
+        VALUES (%s, %s, %s, %s, %s)
+    """,
+    "Fato_Abastecido": """
+        INSERT IGNORE INTO Fato_Abastecido (fk_Municipio_IdMunicipio, fk_Abastecimento_IdAbastecimento)
+        VALUES (%s, %s)
+    """,
+    "Fato_Coleta": """
+        INSERT IGNORE INTO Fato_Coleta
+        (IdColeta, NumeroDaAmostra, DataDeRegistroNoSISAGUA, DataColeta, DescricaoDoLocal, Zona, CategoriaArea, Area, TipoDoLocal, NomeLocal, Latitude, Longitude, fk_Municipio_IdMunicipio, Procedencia, PontoDeColeta, Motivo, Hora)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """,
+    "Fato_Coleta_Geo": """
+        INSERT IGNORE INTO Fato_Coleta_Geo (fk_Coleta_IdColeta, Latitude, Longitude)
+        VALUES (%s, %s, %s)
+    """,
+    "Dim_Classificacao": """
+        INSERT IGNORE INTO Dim_Classificacao (IdClassificacao, Grupo, Parametro_ciano_)
+        VALUES (%s, %s, %s)
+    """,
+    "Fato_Analise": """
+        INSERT IGNORE INTO Fato_Analise (fk_Coleta_IdColeta, fk_Classificacao_IdClassificacao, Resultado, DataDoLaudo)
+        VALUES (%s, %s, %s, %s)
+    """,
+}
+
+# tabela com ids: (coluna do id, colunas da chave natural)
+IDS = {
+    "Dim_Municipio": ("IdMunicipio", ["CodigoDoIBGE"]),
+    "Dim_Abastecimento": ("IdAbastecimento", ["CodigoFormaDeAbastecimento"]),
+    "Dim_Classificacao": ("IdClassificacao", ["Parametro_ciano_"]),
+    # datas e horas como texto, no mesmo formato de chave_coleta()
+    "Fato_Coleta": ("IdColeta", ["DATE_FORMAT(DataColeta, '%Y-%m-%d')", "TIME_FORMAT(Hora, '%H:%i:%s')", "NumeroDaAmostra"]),
+}
+
+
+def chave_coleta(data, hora, numero):
+    # date/time vindos da normalização; o banco devolve TIME como timedelta, por isso o texto
+    return (data.isoformat(), hora.strftime("%H:%M:%S"), numero)
+
+
+class ResolvedorIds:
+    """Atribui e guarda os ids inteiros das chaves naturais durante a carga."""
+
+    def __init__(self, cursor):
+        self.ids = {}
+        self.proximo = {}
+        for tabela, (coluna, chave) in IDS.items():
+            cursor.execute(f"SELECT {coluna}, {', '.join(chave)} FROM {tabela}")
+            self.ids[tabela] = {tuple(linha[1:]) if len(linha) > 2 else linha[1]: linha[0] for linha in cursor.fetchall()}
+            self.proximo[tabela] = max(self.ids[tabela].values(), default=0) + 1
+
+    def resolver(self, tabela, chave):
+        """Retorna (id, novo): novo indica que a linha da tabela ainda precisa ser inserida."""
+        ids = self.ids[tabela]
+        if chave in ids:
+            return ids[chave], False
+        ids[chave] = self.proximo[tabela]
+        self.proximo[tabela] += 1
+        return ids[chave], True
+
+    def traduzir(self, valores):
+        """Converte o dicionário de extrair_valores nas tuplas de QUERIES_COMPACTO.
+
+        As linhas de dimensão e de coleta só aparecem na primeira vez em que a chave é vista.
+        """
+        uf, regiao = valores["Estado"]
+        codigo_ibge, regional, nome_municipio, _ = valores["Municipio"]
+        codigo_forma, *abastecimento = valores["Abastecimento"]
+        grupo, parametro = valores["Classificacao"]
+        numero, registro, data_coleta, *local, _, procedencia, ponto, motivo, hora = valores["Coleta_Amostra_LocalColeta"]
+        _, _, _, _, resultado, data_laudo = valores["Analise"]
+
+        compactos = {"Estado": (uf, regiao)}
+        id_municipio, novo = self.resolver("Dim_Municipio", codigo_ibge)
+        if novo:
+            compactos["Dim_Municipio"] = (id_municipio, codigo_ibge, regional, nome_municipio, uf)
+        id_abastecimento, novo = self.resolver("Dim_Abastecimento", codigo_forma)
+        if novo:
+            compactos["Dim_Abastecimento"] = (id_abastecimento, codigo_forma, *abastecimento)
+        compactos["Fato_Abastecido"] = (id_municipio, id_abastecimento)
+        id_classificacao, novo = self.resolver("Dim_Classificacao", parametro)
+        if novo:
+            compactos["Dim_Classificacao"] = (id_classificacao, grupo, parametro)
+        id_coleta, novo = self.resolver("Fato_Coleta", chave_coleta(data_coleta, hora, numero))
+        if novo:
+            compactos["Fato_Coleta"] = (id_coleta, numero, registro, data_coleta, *local, id_municipio, procedencia, ponto, motivo, hora)
+            if "Coleta_Geo" in valores:
+                compactos["Fato_Coleta_Geo"] = (id_coleta, *valores["Coleta_Geo"][3:])
+        compactos["Fato_Analise"] = (id_coleta, id_classificacao, resultado, data_laudo)
+        return compactos
@@ -0,0 +1,106 @@
+from dotenv import load_dotenv
+from os import getenv
+import argparse
+import math
+import mysql.connector
+
+load_dotenv()
+
+# Amostras perto de um ponto ou dentro de uma caixa de coordenadas, pelo índice SPATIAL de
+# Coleta_Geo (sql/indices_squema.sql). A busca por raio primeiro filtra pela caixa que envolve o
+# círculo, que é o que o índice resolve, e só então calcula a distância na esfera.
+
+# km por grau de latitude (e de longitude no equador)
+KM_POR_GRAU = 111.32
+
+COLUNAS = """
+    ca.NumeroDaAmostra, ca.DataColeta, ca.Hora, m.NomeMunicipio, m.fk_Estado_UF AS UF,
+    ca.TipoDoLocal, ca.NomeLocal, g.Latitude, g.Longitude
+"""
+
+JUNCOES = """
+    FROM Coleta_Geo g
+    JOIN Coleta_Amostra_LocalColeta ca
+        ON ca.DataColeta = g.fk_Amostra_DataColeta
+       AND ca.Hora = g.fk_Amostra_Hora
+       AND ca.NumeroDaAmostra = g.fk_Amostra_NumeroDaAmostra
+    LEFT JOIN Municipio m ON ca.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+"""
+
+# a caixa vai em WKT com longitude primeiro; o MySQL usaria latitude-longitude para o SRID 4326
+CAIXA = "ST_GeomFromText(%s, 4326, 'axis-order=long-lat')"
+
+
+def poligono(lat_min, lon_min, lat_max, lon_max):
+    cantos = [(lon_min, lat_min), (lon_max, lat_min), (lon_max, lat_max), (lon_min, lat_max), (lon_min, lat_min)]
+    return "POLYGON((" + ", ".join(f"{lon} {lat}" for lon, lat in cantos) + "))"
+
+
+def caixa_do_raio(lat, lon, raio_km):
+    """Caixa (lat_min, lon_min, lat_max, lon_max) que contém o círculo de raio_km em volta do ponto."""
+    delta_lat = raio_km / KM_POR_GRAU
+    # perto dos polos um grau de longitude encolhe até zero: aí a caixa cobre todas as longitudes
+    cosseno = math.cos(math.radians(lat))
+    delta_lon = 180 if cosseno < 1e-6 else min(180, raio_km / (KM_POR_GRAU * cosseno))
+    return (max(-90, lat - delta_lat), max(-180, lon - delta_lon), min(90, lat + delta_lat), min(180, lon + delta_lon))
+
+
+def amostras_no_raio(cursor, lat, lon, raio_km, limite=100):
+    """Amostras a até raio_km do ponto, da mais próxima para a mais distante, com a distância em km."""
+    ponto = "ST_SRID(POINT(%s, %s), 4326)"
+    cursor.execute(f"""
+        SELECT {COLUNAS}, ST_Distance_Sphere(g.Localizacao, {ponto}) / 1000 AS DistanciaKm
+        {JUNCOES}
+        WHERE MBRContains({CAIXA}, g.Localizacao)
+          AND ST_Distance_Sphere(g.Localizacao, {ponto}) <= %s
+        ORDER BY DistanciaKm
+        LIMIT %s
+    """, (lon, lat, poligono(*caixa_do_raio(lat, lon, raio_km)), lon, lat, raio_km * 1000, limite))
+    return cursor.column_names, cursor.fetchall()
+
+
+def amostras_na_caixa(cursor, lat_min, lon_min, lat_max, lon_max, limite=100):
+    """Amostras com coordenadas dentro da caixa, das coletas mais recentes para as mais antigas."""
+    cursor.execute(f"""
+        SELECT {COLUNAS}
+        {JUNCOES}
+        WHERE MBRContains({CAIXA}, g.Localizacao)
+        ORDER BY ca.DataColeta DESC, ca.Hora DESC
+        LIMIT %s
+    """, (poligono(lat_min, lon_min, lat_max, lon_max), limite))
+    return cursor.column_names, cursor.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Amostras num raio em volta de um ponto ou dentro de uma caixa de coordenadas.")
+    busca = parser.add_mutually_exclusive_group(required=True)
+    busca.add_argument("--ponto", nargs=2, type=float, metavar=("LAT", "LON"), help="centro da busca por raio")
+    busca.add_argument("--caixa", nargs=4, type=float, metavar=("LAT_MIN", "LON_MIN", "LAT_MAX", "LON_MAX"),
+                       help="cantos da caixa de coordenadas")
+    parser.add_argument("--raio", type=float, default=10, help="raio em km, com --ponto (padrão: %(default)s)")
+    parser.add_argument("--limite", type=int, default=100, help="máximo de amostras listadas (padrão: %(default)s)")
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(
+        host=getenv("db_host"),
+        user=getenv("db_user"),
+        password=getenv("db_password"),
+        database=getenv("db_name")
+    )
+    cursor = conn.cursor()
+    if args.ponto:
+        colunas, linhas = amostras_no_raio(cursor, *args.ponto, args.raio, args.limite)
+    else:
+        colunas, linhas = amostras_na_caixa(cursor, *args.caixa, args.limite)
+    cursor.close()
+    conn.close()
+
+    # mesmo formato do mysql --batch
+    print("\t".join(colunas))
+    for linha in linhas:
+        print("\t".join("NULL" if valor is None else str(valor) for valor in linha))
+    print(f"\n{len(linhas)} amostras")
+
+
+if __name__ == "__main__":
+    main()
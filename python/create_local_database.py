@@ -1,6 +1,7 @@
 from dotenv import load_dotenv
 from subprocess import run
 from os import getenv, path
+import sys
 
 load_dotenv()
 
@@ -8,17 +9,59 @@ db_user = getenv("db_user")
 db_password = getenv("db_password")
 db_name = getenv("db_name")
 current_path = path.dirname(path.abspath(__file__))
-sql_path = path.join(current_path, "..", "sql", "tabelas_squema.sql") # caminho deste arquivo é usado como referencia, sem necessidade de salvar isso no .env, só as credenciais do banco local mesmo
+sql_path = path.join(current_path, "..", "sql") # caminho deste arquivo é usado como referencia, sem necessidade de salvar isso no .env, só as credenciais do banco local mesmo
 
+# a criação é feita em fases: tabelas sem restrições, carga dos dados e, por último,
+# chaves estrangeiras e UNIQUE numa só passada (bem mais barato que mantê-los a cada insert)
+# relatório das linhas que violariam as restrições (sql/verificar_integridade.sql)
+verificar = f'mysql -u{db_user} -p{db_password} --table -e "source {path.join(sql_path, "verificar_integridade.sql")}"'
+restricoes = None
+if "--compacto" in sys.argv:
+    # esquema compacto, com chaves inteiras, em Projeto_final_compacto
+    commands = [
+        f'mysql -u{db_user} -p{db_password} -e "source {path.join(sql_path, "tabelas_compacto_squema.sql")}"',
+        f'"{sys.executable}" "{path.join(current_path, "load_csv.py")}" --compacto',
+        f'mysql -u{db_user} -p{db_password} -e "source {path.join(sql_path, "restricoes_compacto_squema.sql")}"',
+    ]
+else:
+    particionado = "--particionado" in sys.argv
+    commands = [
+        f'mysql -u{db_user} -p{db_password} -e "source {path.join(sql_path, "tabelas_squema.sql")}"',
+    ]
+    # Coleta e Análise particionadas por ano ainda vazias, antes da carga
+    if particionado:
+        commands.append(f'mysql -u{db_user} -p{db_password} -e "source {path.join(sql_path, "particoes_squema.sql")}"')
+    commands.append(f'"{sys.executable}" "{path.join(current_path, "load_csv.py")}"')
 
-commands = [
-    f'mysql -u{db_user} -p{db_password} -e "source {sql_path}"',
-    f'{current_path}\load_csv.py'
-]
+    # amostras repetidas com outra data ou hora (que o INSERT IGNORE descartava quando o UNIQUE existia
+    # na carga) e as suas análises vão para as tabelas de quarentena, senão a fase 3 falharia
+    commands.append(f'mysql -u{db_user} -p{db_password} --table -e "source {path.join(sql_path, "deduplicar_amostras.sql")}"')
+    # tabelas de resumo do app, calculadas de uma vez sobre os dados já sem as repetidas
+    commands.append(f'mysql -u{db_user} -p{db_password} -e "source {path.join(sql_path, "resumos_squema.sql")}"')
+    commands.append(f'"{sys.executable}" "{path.join(current_path, "resumos.py")}"')
+
+    # relatório opcional das linhas que violariam as restrições, antes de criá-las
+    if "--verificar-integridade" in sys.argv:
+        commands.append(verificar)
+
+    # índices secundários antes das restrições, para as chaves estrangeiras os reaproveitarem
+    commands.append(f'mysql -u{db_user} -p{db_password} -e "source {path.join(sql_path, "indices_squema.sql")}"')
+    arquivo_restricoes = "restricoes_particionado_squema.sql" if particionado else "restricoes_squema.sql"
+    restricoes = f'mysql -u{db_user} -p{db_password} -e "source {path.join(sql_path, arquivo_restricoes)}"'
+    commands.append(restricoes)
 
 for cmd in commands:
     print(f"Executando: {cmd}")
-    run(cmd, shell=True)
+    resultado = run(cmd, shell=True)
+    if resultado.returncode != 0:
+        print(f"Falhou (código {resultado.returncode})")
+        # sem INSERT IGNORE barrando na carga, linhas que violam as chaves estrangeiras ou o
+        # UNIQUE(NumeroDaAmostra) só aparecem aqui: o relatório mostra quais são
+        if cmd == restricoes:
+            print("As restrições não foram criadas. Linhas que as violariam:")
+            run(verificar, shell=True)
+            print("Corrija essas linhas e aplique de novo sql/" + arquivo_restricoes)
+        sys.exit(resultado.returncode)
     print("sucesso!")
 
 print("Execução concluída")
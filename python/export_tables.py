@@ -1,32 +1,356 @@
 from dotenv import load_dotenv
-from subprocess import run
-from os import getenv
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from os import getenv, listdir, makedirs, path, remove, rename, replace, truncate
+import argparse
+import datetime
+import gzip
+import shutil
+import time
+import mysql.connector.pooling
+
+from exportar_sqlite import ARQUIVO as ARQUIVO_SQLITE, BancoSqlite
+from manifesto import ACRESCENTAR, CHAVES, COMPLETA, PULAR, comparar, filtro_chave, gravar_manifesto, ler_manifesto, levantar_estado
+from resumos import RESUMOS, resumos_existem
 
 load_dotenv()
-db_password=getenv("db_password")
-db_user=getenv("db_user")
-db_name=getenv("db_name")
-export_path =getenv("db_export_path_file")
 
-commands = [
+# Exporta as tabelas do banco para data/db_export no mesmo formato que o `mysql --batch --column-names`
+# gerava (TSV com cabeçalho, NULL escrito como "NULL"), que é o que o app do Streamlit lê.
+# As tabelas não dependem umas das outras, então são exportadas ao mesmo tempo, cada uma com
+# uma conexão de um pool pequeno.
+
+current_path = path.dirname(path.abspath(__file__))
+PASTA_PADRAO = path.join(current_path, "..", "data", "db_export")
+
+# linhas lidas do servidor por vez; a memória do exportador não cresce com o tamanho da tabela
+TAMANHO_LOTE = 5000
+
+FORMATOS = ["tsv", "parquet", "sqlite"]
+
+# tabelas grandes demais para um TSV só: saem em partes compactadas <tabela>/parte-0001.tsv.gz,
+# cada uma com cabeçalho e no máximo TAMANHO_PARTE bytes compactados
+TABELAS_EM_PARTES = ["Analise"]
+TAMANHO_PARTE = 50 * 1024 * 1024
+
+TABELAS = ["Estado", "Municipio", "Abastecimento", "Abastecido", "Coleta_Amostra_LocalColeta", "Classificacao", "Analise"]
+# tabelas de resumo (sql/resumos_squema.sql), exportadas por padrão quando existem no banco
+TABELAS_OPCIONAIS = RESUMOS
+
+# escapes do modo --batch do cliente mysql
+ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\0": "\\0"})
+
+
+def formatar(valor):
+    """Converte um valor vindo do conector para o texto que o `mysql --batch` escreveria."""
+    if valor is None:
+        return "NULL"
+    if isinstance(valor, datetime.timedelta):
+        # colunas TIME chegam como timedelta
+        segundos = int(valor.total_seconds())
+        sinal = "-" if segundos < 0 else ""
+        horas, resto = divmod(abs(segundos), 3600)
+        return f"{sinal}{horas:02d}:{resto // 60:02d}:{resto % 60:02d}"
+    if isinstance(valor, datetime.datetime):
+        return valor.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(valor, datetime.date):
+        return valor.isoformat()
+    if isinstance(valor, (bytes, bytearray)):
+        valor = valor.decode("utf-8")
+    return str(valor).translate(ESCAPES)
+
+
+def criar_pool(tamanho):
+    return mysql.connector.pooling.MySQLConnectionPool(
+        pool_name="exportacao",
+        pool_size=tamanho,
+        host=getenv("db_host"),
+        user=getenv("db_user"),
+        password=getenv("db_password"),
+        database=getenv("db_name"),
+        charset="utf8mb4",
+    )
+
+
+def ler_em_lotes(pool, consulta, parametros=(), tamanho_lote=TAMANHO_LOTE):
+    """Executa a consulta e gera (nomes das colunas, lote de tuplas), sempre pelo menos um lote.
+
+    O cursor é sem buffer: o resultado fica no socket e é lido em lotes de tamanho_lote
+    linhas, cada lote entregue antes de o próximo ser pedido.
+    """
+    conn = pool.get_connection()
+    try:
+        cursor = conn.cursor(buffered=False)
+        cursor.execute(consulta, parametros)
+        lote = cursor.fetchmany(tamanho_lote)
+        yield cursor.column_names, lote
+        while lote:
+            lote = cursor.fetchmany(tamanho_lote)
+            if lote:
+                yield cursor.column_names, lote
+        cursor.close()
+    finally:
+        # devolve a conexão ao pool
+        conn.close()
+
+
+def exportar_tsv(tabela, lotes, pasta, tamanho_anterior=None):
+    """Grava os lotes de uma tabela em <pasta>/<tabela>.csv; retorna o número de linhas.
+
+    Com tamanho_anterior, as linhas são acrescentadas a uma cópia do arquivo existente, cortada
+    no tamanho registrado no manifesto (descarta o que uma execução interrompida deixou).
+    """
+    destino = path.join(pasta, f"{tabela}.csv")
+    # escreve num temporário e troca no final: o app nunca lê um arquivo pela metade
+    temporario = destino + ".tmp"
+    linhas = 0
+    if tamanho_anterior is not None:
+        shutil.copyfile(destino, temporario)
+        truncate(temporario, tamanho_anterior)
+        with open(temporario, "a", encoding="utf-8", newline="\n") as arquivo:
+            for _, lote in lotes:
+                arquivo.writelines("\t".join(map(formatar, linha)) + "\n" for linha in lote)
+                linhas += len(lote)
+        replace(temporario, destino)
+        return linhas
+
+    with open(temporario, "w", encoding="utf-8", newline="\n") as arquivo:
+        for indice, (colunas, lote) in enumerate(lotes):
+            if indice == 0:
+                arquivo.write("\t".join(colunas) + "\n")
+            arquivo.writelines("\t".join(map(formatar, linha)) + "\n" for linha in lote)
+            linhas += len(lote)
+    replace(temporario, destino)
+    return linhas
+
+
+def exportar_partes(tabela, lotes, pasta, tamanho_parte=TAMANHO_PARTE, partes_anteriores=None):
+    """Grava os lotes de uma tabela em <pasta>/<tabela>/parte-NNNN.tsv.gz; retorna o número de linhas.
+
+    Com partes_anteriores (as registradas no manifesto), as partes existentes são mantidas e as
+    linhas novas vão para partes seguintes; sem, a pasta inteira é refeita num temporário.
+    """
+    destino = path.join(pasta, tabela)
+    if partes_anteriores is None:
+        alvo = destino + ".tmp"
+        shutil.rmtree(alvo, ignore_errors=True)
+        makedirs(alvo)
+        numero = 1
+    else:
+        alvo = destino
+        # partes que uma execução interrompida deixou para trás
+        for nome in listdir(destino):
+            if nome not in partes_anteriores:
+                remove(path.join(destino, nome))
+        numero = len(partes_anteriores) + 1
+
+    parte, cabecalho, linhas = None, None, 0
+    for colunas, lote in lotes:
+        cabecalho = "\t".join(colunas) + "\n"
+        if not lote:
+            continue
+        if parte is None:
+            parte = gzip.open(path.join(alvo, f"parte-{numero:04d}.tsv.gz"), "wb", compresslevel=6)
+            parte.write(cabecalho.encode("utf-8"))
+        parte.write("".join("\t".join(map(formatar, linha)) + "\n" for linha in lote).encode("utf-8"))
+        linhas += len(lote)
+        # fileobj é o arquivo em disco: tell() dá o tamanho já compactado
+        if parte.fileobj.tell() >= tamanho_parte:
+            parte.close()
+            parte = None
+            numero += 1
+    if parte is not None:
+        parte.close()
+
+    if partes_anteriores is None:
+        if linhas == 0:
+            # tabela vazia: uma parte só com o cabeçalho, para o app conhecer as colunas
+            with gzip.open(path.join(alvo, f"parte-{numero:04d}.tsv.gz"), "wb") as parte:
+                parte.write((cabecalho or "").encode("utf-8"))
+        shutil.rmtree(destino, ignore_errors=True)
+        rename(alvo, destino)
+        # um TSV inteiro de uma exportação antiga seria lido junto com as partes
+        if path.exists(destino + ".csv"):
+            remove(destino + ".csv")
+    return linhas
+
+
+def listar_partes(pasta, tabela):
+    return sorted(nome for nome in listdir(path.join(pasta, tabela)) if nome.endswith(".tsv.gz"))
+
+
+def saida_existe(pasta, tabela, formato, registro):
+    """Confere se o que o manifesto registrou para o formato ainda está no disco."""
+    if formato == "sqlite":
+        return path.exists(path.join(pasta, ARQUIVO_SQLITE))
+    if formato == "parquet":
+        return path.exists(path.join(pasta, "parquet", tabela)) or path.exists(path.join(pasta, "parquet", f"{tabela}.parquet"))
+    if tabela in TABELAS_EM_PARTES:
+        return path.isdir(path.join(pasta, tabela)) and set(registro.get("partes", [None])) <= set(listar_partes(pasta, tabela))
+    destino = path.join(pasta, f"{tabela}.csv")
+    return path.exists(destino) and path.getsize(destino) >= registro.get("bytes", 0)
+
+
+def avaliar_tabela(pool, tabela, anterior):
+    """Levanta o estado atual da tabela no servidor e compara com o manifesto; retorna (estado, ação)."""
+    conn = pool.get_connection()
+    try:
+        cursor = conn.cursor()
+        estado = levantar_estado(cursor, tabela, formatar)
+        acao = comparar(cursor, tabela, estado, anterior)
+        cursor.close()
+    finally:
+        conn.close()
+    return estado, acao
+
+
+def exportar_tabela(pool, tabela, formato, pasta, tamanho_lote=TAMANHO_LOTE, acrescentar_apos=None, registro_anterior=None,
+                    tamanho_parte=TAMANHO_PARTE):
+    """Exporta uma tabela num formato (tsv ou parquet); retorna (linhas, segundos).
+
+    Com acrescentar_apos (a maior chave já exportada), só as linhas depois dela são lidas
+    e acrescentadas à exportação existente.
+    """
+    inicio = time.perf_counter()
+    filtro, parametros = "", ()
+    if acrescentar_apos is not None:
+        filtro, parametros = filtro_chave(tabela, ">", acrescentar_apos)
+        filtro = " WHERE " + filtro
+
+    if formato == "parquet":
+        # pyarrow só é necessário para este formato
+        from exportar_parquet import CONSULTAS_PARTICIONADAS, exportar_parquet
+        consulta = CONSULTAS_PARTICIONADAS.get(tabela, f"SELECT * FROM {tabela}")
+        if filtro:
+            consulta = f"SELECT * FROM ({consulta}) t{filtro}"
+        pasta_parquet = path.join(pasta, "parquet")
+        makedirs(pasta_parquet, exist_ok=True)
+        lotes = ler_em_lotes(pool, consulta, parametros, tamanho_lote)
+        linhas = exportar_parquet(tabela, lotes, pasta_parquet, acrescentar=acrescentar_apos is not None)
+    else:
+        lotes = ler_em_lotes(pool, f"SELECT * FROM {tabela}{filtro}", parametros, tamanho_lote)
+        if tabela in TABELAS_EM_PARTES:
+            partes_anteriores = registro_anterior["partes"] if acrescentar_apos is not None else None
+            linhas = exportar_partes(tabela, lotes, pasta, tamanho_parte, partes_anteriores)
+        else:
+            tamanho_anterior = registro_anterior["bytes"] if acrescentar_apos is not None else None
+            linhas = exportar_tsv(tabela, lotes, pasta, tamanho_anterior)
+    return linhas, time.perf_counter() - inicio
+
+
+def exportar_para_sqlite(pool, trabalhos, pasta, tamanho_lote=TAMANHO_LOTE):
+    """Atualiza <pasta>/sisagua.sqlite; retorna (linhas, segundos).
+
+    trabalhos é uma lista de (tabela, estado, acrescentar_apos). Todas as tabelas vão para o
+    mesmo arquivo, então são escritas em sequência, numa única tarefa.
+    """
+    inicio = time.perf_counter()
+    banco = BancoSqlite(pasta)
+    linhas = 0
+    try:
+        for tabela, estado, acrescentar_apos in trabalhos:
+            consulta, parametros = f"SELECT * FROM {tabela}", ()
+            if acrescentar_apos is None:
+                banco.recriar_tabela(tabela, estado["colunas"], estado["tipos"], CHAVES[tabela])
+            else:
+                filtro, parametros = filtro_chave(tabela, ">", acrescentar_apos)
+                consulta += " WHERE " + filtro
+            linhas += banco.inserir(tabela, ler_em_lotes(pool, consulta, parametros, tamanho_lote))
+        banco.finalizar()
+    except BaseException:
+        banco.descartar()
+        raise
+    return linhas, time.perf_counter() - inicio
+
+
+def registrar_formato(pasta, tabela, formato):
+    if formato == "tsv" and tabela in TABELAS_EM_PARTES:
+        return {"partes": listar_partes(pasta, tabela)}
+    if formato == "tsv":
+        return {"bytes": path.getsize(path.join(pasta, f"{tabela}.csv"))}
+    return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta as tabelas do banco para TSV, Parquet e SQLite, em paralelo.")
+    parser.add_argument("--pasta", default=getenv("db_export_path_file") or PASTA_PADRAO,
+                        help="pasta de destino (padrão: db_export_path_file do .env ou data/db_export)")
+    parser.add_argument("--tabelas", help="tabelas separadas por vírgula (padrão: todas, e as de resumo se existirem)")
+    parser.add_argument("--conexoes", type=int, default=int(getenv("db_export_conexoes", 4)),
+                        help="conexões simultâneas (padrão: %(default)s)")
+    parser.add_argument("--formatos", default=getenv("db_export_formatos", "tsv"),
+                        help="formatos separados por vírgula, entre tsv, parquet e sqlite (padrão: %(default)s)")
+    parser.add_argument("--tamanho-parte", type=float, default=float(getenv("db_export_tamanho_parte", 50)),
+                        help=f"MB compactados por parte de {', '.join(TABELAS_EM_PARTES)} (padrão: %(default)s)")
+    parser.add_argument("--completa", action="store_true", help="ignora o manifesto e exporta todas as tabelas inteiras")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="linhas lidas do servidor por vez (padrão: %(default)s)")
+    args = parser.parse_args()
 
-f'mysql -u{db_user} -p{db_password} --database={db_name} --default-character-set=utf8 --batch --column-names -e "SELECT * FROM Estado" > "{export_path}\\Estado.csv"',
-f'mysql -u{db_user} -p{db_password} --database={db_name} --default-character-set=utf8 --batch --column-names -e "SELECT * FROM Municipio" > "{export_path}\\Municipio.csv"',
+    tabelas = [tabela.strip() for tabela in args.tabelas.split(",")] if args.tabelas else list(TABELAS)
+    desconhecidas = [tabela for tabela in tabelas if tabela not in TABELAS + TABELAS_OPCIONAIS]
+    if desconhecidas:
+        parser.error(f"tabelas desconhecidas: {', '.join(desconhecidas)}")
+    formatos = [formato.strip() for formato in args.formatos.split(",")]
+    desconhecidos = [formato for formato in formatos if formato not in FORMATOS]
+    if desconhecidos:
+        parser.error(f"formatos desconhecidos: {', '.join(desconhecidos)}")
+    makedirs(args.pasta, exist_ok=True)
 
-f'mysql -u{db_user} -p{db_password} --database={db_name} --default-character-set=utf8 --batch --column-names -e "SELECT * FROM Abastecimento" > "{export_path}\\Abastecimento.csv"',
+    manifesto = {"tabelas": {}} if args.completa else ler_manifesto(args.pasta)
+    anteriores = manifesto["tabelas"]
+    conexoes = max(1, min(args.conexoes, len(tabelas) * len(formatos)))
+    pool = criar_pool(conexoes)
+    if not args.tabelas:
+        conn = pool.get_connection()
+        cursor = conn.cursor()
+        if resumos_existem(cursor):
+            tabelas += TABELAS_OPCIONAIS
+        cursor.close()
+        conn.close()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=conexoes) as executor:
+        # contagens e checksums calculados no servidor, todas as tabelas ao mesmo tempo
+        avaliacoes = executor.map(lambda tabela: avaliar_tabela(pool, tabela, anteriores.get(tabela)), tabelas)
+        estados = dict(zip(tabelas, avaliacoes))
 
-f'mysql -u{db_user} -p{db_password} --database={db_name} --default-character-set=utf8 --batch --column-names -e "SELECT * FROM Abastecido" > "{export_path}\\Abastecido.csv"',
+        tarefas = {}
+        trabalhos_sqlite = []
+        for tabela in tabelas:
+            estado, acao = estados[tabela]
+            registros = anteriores.get(tabela, {}).get("formatos", {})
+            for formato in formatos:
+                # um formato que não foi exportado junto com o manifesto anterior sai inteiro
+                acao_formato = acao
+                if formato not in registros or not saida_existe(args.pasta, tabela, formato, registros[formato]):
+                    acao_formato = COMPLETA
+                if acao_formato == PULAR:
+                    print(f"{tabela} ({formato}): sem mudanças desde {manifesto.get('gerado_em')}, pulada")
+                    continue
+                acrescentar_apos = anteriores[tabela]["chave_maxima"] if acao_formato == ACRESCENTAR else None
+                if formato == "sqlite":
+                    trabalhos_sqlite.append((tabela, estado, acrescentar_apos))
+                    continue
+                tarefa = executor.submit(exportar_tabela, pool, tabela, formato, args.pasta, max(1, args.lote),
+                                         acrescentar_apos, registros.get(formato), int(args.tamanho_parte * 1024 * 1024))
+                tarefas[tarefa] = (tabela, formato, acao_formato)
+        if trabalhos_sqlite:
+            tarefa = executor.submit(exportar_para_sqlite, pool, trabalhos_sqlite, args.pasta, max(1, args.lote))
+            tarefas[tarefa] = (", ".join(tabela for tabela, _, _ in trabalhos_sqlite), "sqlite", COMPLETA)
 
-f'mysql -u{db_user} -p{db_password} --database={db_name} --default-character-set=utf8 --batch --column-names -e "SELECT * FROM Coleta_Amostra_LocalColeta" > "{export_path}\\Coleta_Amostra_LocalColeta.csv"',
+        for tarefa in as_completed(tarefas):
+            linhas, segundos = tarefa.result()
+            tabela, formato, acao = tarefas[tarefa]
+            descricao = "linhas novas acrescentadas" if acao == ACRESCENTAR else "linhas"
+            print(f"{tabela} ({formato}): {linhas} {descricao} em {segundos:.1f}s")
 
-f'mysql -u{db_user} -p{db_password} --database={db_name} --default-character-set=utf8 --batch --column-names -e "SELECT * FROM Classificacao" > "{export_path}\\Classificacao.csv"',
+    # o manifesto só é atualizado depois que todas as exportações terminaram
+    for tabela in tabelas:
+        estado, _ = estados[tabela]
+        estado["formatos"] = {formato: registrar_formato(args.pasta, tabela, formato) for formato in formatos}
+        anteriores[tabela] = estado
+    gravar_manifesto(args.pasta, manifesto)
 
-f'mysql -u{db_user} -p{db_password} --database={db_name} --default-character-set=utf8 --batch --column-names -e "SELECT * FROM Analise" > "{export_path}\\Analise.csv"'
-]
+    print(f"Exportação concluída em {time.perf_counter() - inicio:.1f}s ({path.abspath(args.pasta)})")
 
-for cmd in commands:
-    print(f"Executando: {cmd}")
-    run(cmd, shell=True)
-    print("sucesso!")
 
-print("Exportação concluída")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+from itertools import chain
+from os import makedirs, path, rename, replace, walk
+import datetime
+import shutil
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Exportação colunar das tabelas para data/db_export/parquet, usada por export_tables.py --formatos parquet.
+# As tabelas de fato são particionadas por UF e ano da coleta (pastas UF=SP/Ano=2014 no estilo
+# hive), então quem lê pode descartar partições inteiras; as colunas de texto com poucos valores
+# distintos são gravadas com codificação de dicionário.
+
+# consultas das tabelas particionadas: UF vem de Municipio e o ano da data da coleta
+CONSULTAS_PARTICIONADAS = {
+    "Coleta_Amostra_LocalColeta": """
+        SELECT c.*, m.fk_Estado_UF AS UF, YEAR(c.DataColeta) AS Ano
+        FROM Coleta_Amostra_LocalColeta c
+        LEFT JOIN Municipio m ON m.CodigoDoIBGE = c.fk_Municipio_CodigoDoIBGE
+    """,
+    "Analise": """
+        SELECT a.*, m.fk_Estado_UF AS UF, YEAR(a.fk_Amostra_DataColeta) AS Ano
+        FROM Analise a
+        LEFT JOIN Coleta_Amostra_LocalColeta c
+            ON c.DataColeta = a.fk_Amostra_DataColeta
+           AND c.Hora = a.fk_Amostra_Hora
+           AND c.NumeroDaAmostra = a.fk_Amostra_NumeroDaAmostra
+        LEFT JOIN Municipio m ON m.CodigoDoIBGE = c.fk_Municipio_CodigoDoIBGE
+    """,
+}
+
+PARTICIONAMENTO = ds.partitioning(pa.schema([("UF", pa.string()), ("Ano", pa.int16())]), flavor="hive")
+
+# colunas que não são texto; as demais ficam como string
+TIPOS = {
+    "DataColeta": pa.date32(),
+    "fk_Amostra_DataColeta": pa.date32(),
+    "DataDoLaudo": pa.date32(),
+    "DataDeRegistroNoSISAGUA": pa.timestamp("s"),
+    "Hora": pa.time32("s"),
+    "fk_Amostra_Hora": pa.time32("s"),
+    "Resultado": pa.float64(),
+    "Latitude": pa.float64(),
+    "Longitude": pa.float64(),
+    "Ano": pa.int16(),
+}
+
+# texto com poucos valores distintos: vira dictionary<string> no Parquet e category no pandas
+DICIONARIO = ["Zona", "TipoDoLocal", "Motivo", "Parametro_ciano_", "fk_Classificacao_Parametro_ciano_"]
+TIPO_DICIONARIO = pa.dictionary(pa.int32(), pa.string())
+
+
+def tipo_da_coluna(coluna):
+    if coluna in DICIONARIO:
+        return TIPO_DICIONARIO
+    return TIPOS.get(coluna, pa.string())
+
+
+def converter(valor):
+    # TIME chega do conector como timedelta e DECIMAL como Decimal
+    if isinstance(valor, datetime.timedelta):
+        return (datetime.datetime.min + valor).time()
+    if isinstance(valor, (bytes, bytearray)):
+        return valor.decode("utf-8")
+    if valor is not None and not isinstance(valor, (str, int, float, datetime.date, datetime.time)):
+        return float(valor)
+    return valor
+
+
+def para_arrow(lote, esquema):
+    """Transforma um lote de tuplas do cursor num RecordBatch com o esquema da tabela."""
+    arrays = []
+    for campo, valores in zip(esquema, zip(*lote)):
+        dados = [converter(valor) for valor in valores]
+        if campo.type == TIPO_DICIONARIO:
+            arrays.append(pa.array(dados, pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(dados, campo.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=esquema)
+
+
+def opcoes_escrita(esquema):
+    return {
+        "compression": "zstd",
+        "use_dictionary": [campo.name for campo in esquema if campo.type == TIPO_DICIONARIO],
+    }
+
+
+def exportar_parquet(tabela, lotes, pasta, acrescentar=False):
+    """Grava os lotes (colunas, tuplas) de uma tabela em <pasta>/<tabela>.parquet, ou numa pasta particionada.
+
+    Retorna o número de linhas. Os lotes são escritos à medida que chegam; o resultado é
+    montado num temporário e só substitui o anterior no final. Com acrescentar (só nas
+    tabelas particionadas), os arquivos novos entram nas partições ao lado dos existentes.
+    """
+    lotes = iter(lotes)
+    colunas, primeiro = next(lotes, ((), []))
+    esquema = pa.schema([(coluna, tipo_da_coluna(coluna)) for coluna in colunas])
+    linhas = 0
+
+    def em_arrow():
+        nonlocal linhas
+        for _, lote in chain([(colunas, primeiro)], lotes):
+            if lote:
+                linhas += len(lote)
+                yield para_arrow(lote, esquema)
+
+    if tabela in CONSULTAS_PARTICIONADAS:
+        destino = path.join(pasta, tabela)
+        temporario = destino + ".tmp"
+        shutil.rmtree(temporario, ignore_errors=True)
+        # uma tabela vazia não gera nenhuma partição, mas a pasta continua existindo
+        makedirs(temporario)
+        formato = ds.ParquetFileFormat()
+        # nomes únicos por execução, para os acréscimos não sobrescreverem partes anteriores
+        prefixo = datetime.datetime.now().strftime("%Y%m%d%H%M%S") if acrescentar else "0"
+        ds.write_dataset(
+            pa.RecordBatchReader.from_batches(esquema, em_arrow()), temporario, format="parquet",
+            partitioning=PARTICIONAMENTO, basename_template=f"parte-{prefixo}-{{i}}.parquet",
+            file_options=formato.make_write_options(**opcoes_escrita(esquema)),
+        )
+        if acrescentar and path.isdir(destino):
+            for pasta_atual, _, arquivos in walk(temporario):
+                particao = path.join(destino, path.relpath(pasta_atual, temporario))
+                makedirs(particao, exist_ok=True)
+                for nome in arquivos:
+                    rename(path.join(pasta_atual, nome), path.join(particao, nome))
+            shutil.rmtree(temporario)
+        else:
+            # troca a pasta inteira de uma vez
+            shutil.rmtree(destino, ignore_errors=True)
+            rename(temporario, destino)
+    else:
+        destino = path.join(pasta, f"{tabela}.parquet")
+        temporario = destino + ".tmp"
+        with pq.ParquetWriter(temporario, esquema, **opcoes_escrita(esquema)) as escritor:
+            for lote in em_arrow():
+                escritor.write_batch(lote)
+        replace(temporario, destino)
+    return linhas
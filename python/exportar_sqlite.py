@@ -0,0 +1,106 @@
+from os import path, remove, replace
+import datetime
+import shutil
+import sqlite3
+
+# Exportação para um único arquivo SQLite (data/db_export/sisagua.sqlite), usada por
+# export_tables.py --formatos sqlite: as sete tabelas com tipos e os índices das junções do
+# dashboard já criados, para ser aberto somente leitura sem reimportar TSV nenhum.
+
+ARQUIVO = "sisagua.sqlite"
+
+# tipo declarado no SQLite para cada DATA_TYPE do MySQL; datas e horas continuam texto ISO
+# (afinidade NUMERIC), então strftime('%Y', DataColeta) segue funcionando
+TIPOS = {
+    "date": "DATE",
+    "time": "TIME",
+    "datetime": "DATETIME",
+    "timestamp": "DATETIME",
+    "decimal": "REAL",
+    "float": "REAL",
+    "double": "REAL",
+    "tinyint": "INTEGER",
+    "smallint": "INTEGER",
+    "mediumint": "INTEGER",
+    "int": "INTEGER",
+    "bigint": "INTEGER",
+}
+
+# índices nas chaves de junção e filtros das consultas do dashboard
+INDICES = {
+    "Municipio": [["fk_Estado_UF"], ["NomeMunicipio"]],
+    "Abastecido": [["fk_Abastecimento_CodigoFormaDeAbastecimento"]],
+    "Coleta_Amostra_LocalColeta": [["fk_Municipio_CodigoDoIBGE"], ["NumeroDaAmostra"]],
+    "Analise": [["fk_Amostra_DataColeta", "fk_Amostra_Hora", "fk_Amostra_NumeroDaAmostra"], ["fk_Classificacao_Parametro_ciano_"]],
+}
+
+
+def converter(valor):
+    if isinstance(valor, datetime.timedelta):
+        segundos = int(valor.total_seconds())
+        return f"{segundos // 3600:02d}:{segundos % 3600 // 60:02d}:{segundos % 60:02d}"
+    if isinstance(valor, datetime.datetime):
+        return valor.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(valor, datetime.date):
+        return valor.isoformat()
+    if isinstance(valor, (bytes, bytearray)):
+        return valor.decode("utf-8")
+    if valor is not None and not isinstance(valor, (str, int, float)):
+        # DECIMAL
+        return float(valor)
+    return valor
+
+
+class BancoSqlite:
+    """Cópia de trabalho do sisagua.sqlite: as tabelas são recriadas ou completadas nela e o
+    arquivo final só é substituído em finalizar()."""
+
+    def __init__(self, pasta):
+        self.destino = path.join(pasta, ARQUIVO)
+        self.temporario = self.destino + ".tmp"
+        # as tabelas que não mudaram são aproveitadas do arquivo anterior
+        if path.exists(self.destino):
+            shutil.copyfile(self.destino, self.temporario)
+        elif path.exists(self.temporario):
+            remove(self.temporario)
+        self.conn = sqlite3.connect(self.temporario)
+        # é um arquivo descartável até o replace: sem journal nem fsync durante a carga
+        self.conn.execute("PRAGMA journal_mode = OFF")
+        self.conn.execute("PRAGMA synchronous = OFF")
+
+    def recriar_tabela(self, tabela, colunas, tipos, chave):
+        definicoes = [f"{coluna} {TIPOS.get(tipo, 'TEXT')}" for coluna, tipo in zip(colunas, tipos)]
+        definicoes.append(f"PRIMARY KEY ({', '.join(chave)})")
+        # os índices da tabela caem junto e são recriados em finalizar(), depois dos dados
+        self.conn.execute(f"DROP TABLE IF EXISTS {tabela}")
+        self.conn.execute(f"CREATE TABLE {tabela} ({', '.join(definicoes)})")
+
+    def inserir(self, tabela, lotes):
+        linhas = 0
+        for colunas, lote in lotes:
+            if not lote:
+                continue
+            marcadores = ", ".join(["?"] * len(colunas))
+            self.conn.executemany(
+                f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({marcadores})",
+                ([converter(valor) for valor in linha] for linha in lote),
+            )
+            linhas += len(lote)
+        return linhas
+
+    def finalizar(self):
+        existentes = {nome for nome, in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for tabela, indices in INDICES.items():
+            if tabela not in existentes:
+                continue
+            for colunas in indices:
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{tabela}_{'_'.join(colunas)} ON {tabela} ({', '.join(colunas)})")
+        # estatísticas para o planejador escolher os índices
+        self.conn.execute("ANALYZE")
+        self.conn.commit()
+        self.conn.close()
+        replace(self.temporario, self.destino)
+
+    def descartar(self):
+        self.conn.close()
+        remove(self.temporario)
@@ -0,0 +1,151 @@
+from contextlib import contextmanager
+from glob import glob
+from os import path
+import csv
+import gzip
+import queue
+import threading
+import zipfile
+
+# Fontes da carga: o OpenDataSUS distribui o SISAGUA em vários arquivos anuais, muitas vezes
+# compactados. Cada argumento pode ser um CSV, um padrão glob ou uma pasta; arquivos .gz e os
+# CSVs de dentro de um .zip são lidos direto do pacote, sem extrair nada para o disco.
+
+EXTENSOES = (".csv", ".csv.gz", ".zip")
+
+
+class Fonte:
+    """Um CSV a ser carregado: um arquivo comum, um .csv.gz, ou um membro de um .zip."""
+
+    def __init__(self, caminho, membro=None):
+        self.caminho = caminho
+        self.membro = membro
+
+    @property
+    def rotulo(self):
+        # identifica a fonte no checkpoint e na quarentena
+        caminho = path.abspath(self.caminho)
+        return caminho if self.membro is None else f"{caminho}:{self.membro}"
+
+    @contextmanager
+    def abrir(self):
+        """Abre a fonte em modo binário; .gz e membros de .zip são descompactados em fluxo."""
+        if self.membro is not None:
+            with zipfile.ZipFile(self.caminho) as pacote, pacote.open(self.membro) as arquivo:
+                yield arquivo
+        elif self.caminho.lower().endswith(".gz"):
+            with gzip.open(self.caminho, "rb") as arquivo:
+                yield arquivo
+        else:
+            with open(self.caminho, "rb") as arquivo:
+                yield arquivo
+
+
+def expandir_fontes(entradas):
+    """Transforma os argumentos da linha de comando (arquivos, globs e pastas) na lista de fontes."""
+    caminhos = []
+    for entrada in entradas:
+        if path.isdir(entrada):
+            encontrados = sorted(c for c in glob(path.join(entrada, "**", "*"), recursive=True) if c.lower().endswith(EXTENSOES))
+        elif any(caractere in entrada for caractere in "*?["):
+            encontrados = sorted(glob(entrada, recursive=True))
+        elif path.exists(entrada):
+            encontrados = [entrada]
+        else:
+            encontrados = []
+        if not encontrados:
+            raise SystemExit(f"Nenhum arquivo encontrado em {entrada}")
+        caminhos.extend(encontrados)
+
+    fontes = []
+    # o mesmo arquivo pode aparecer em mais de um argumento
+    for caminho in dict.fromkeys(caminhos):
+        if caminho.lower().endswith(".zip"):
+            with zipfile.ZipFile(caminho) as pacote:
+                membros = [m.filename for m in pacote.infolist() if not m.is_dir() and m.filename.lower().endswith(".csv")]
+            fontes.extend(Fonte(caminho, membro) for membro in membros)
+        else:
+            fontes.append(Fonte(caminho))
+    return fontes
+
+
+def ler_linhas(arquivo, offset=0):
+    """Gera (linha, offset) para cada registro do CSV, onde offset é a posição em bytes logo após o registro.
+
+    O arquivo é lido em modo binário para que a posição seja exata e possa ser usada
+    num seek ao retomar a carga; o cabeçalho é sempre lido do início do arquivo. Nos
+    arquivos compactados a posição é a do conteúdo descompactado.
+    """
+    cabecalho = next(csv.reader([arquivo.readline().decode("utf-8-sig")]))
+    posicao = max(offset, arquivo.tell())
+    arquivo.seek(posicao)
+
+    def linhas_decodificadas():
+        nonlocal posicao
+        for linha_bruta in arquivo:
+            posicao += len(linha_bruta)
+            yield linha_bruta.decode("utf-8")
+
+    # o csv só pede a próxima linha quando precisa, então posicao sempre aponta para o fim do registro atual
+    for linha in csv.DictReader(linhas_decodificadas(), fieldnames=cabecalho):
+        yield linha, posicao
+
+
+def ler_blocos(arquivo, offset, tamanho):
+    """Agrupa as linhas de ler_linhas em blocos; gera (linhas, offsets), com o offset logo após cada linha.
+
+    Com o offset de cada linha, a carga pode confirmar e gravar o checkpoint no meio de um bloco.
+    """
+    bloco, offsets = [], []
+    for linha, offset in ler_linhas(arquivo, offset):
+        bloco.append(linha)
+        offsets.append(offset)
+        if len(bloco) >= tamanho:
+            yield bloco, offsets
+            bloco, offsets = [], []
+    if bloco:
+        yield bloco, offsets
+
+
+def ler_fontes(fontes, offsets, tamanho, leitores):
+    """Lê várias fontes ao mesmo tempo, em threads, e gera (fonte, linhas, offsets) na ordem em que os blocos ficam prontos.
+
+    Os blocos de uma mesma fonte saem sempre em ordem. Quando uma fonte termina é gerado
+    (fonte, None, offset final). A leitura e a descompressão liberam o GIL, então os
+    leitores adiantam o próximo bloco enquanto o processo principal normaliza e insere.
+    """
+    pendentes = queue.Queue()
+    for fonte in fontes:
+        pendentes.put(fonte)
+    # fila limitada: os leitores não acumulam mais que alguns blocos à frente da carga
+    prontos = queue.Queue(maxsize=2 * max(1, leitores))
+
+    def leitor():
+        while True:
+            try:
+                fonte = pendentes.get_nowait()
+            except queue.Empty:
+                return
+            offset = offsets.get(fonte.rotulo, 0)
+            try:
+                with fonte.abrir() as arquivo:
+                    for linhas, offsets_linhas in ler_blocos(arquivo, offset, tamanho):
+                        prontos.put((fonte, linhas, offsets_linhas))
+                        offset = offsets_linhas[-1]
+            except Exception as e:
+                prontos.put((fonte, e, offset))
+                return
+            prontos.put((fonte, None, offset))
+
+    # daemon: se a carga falhar, os leitores parados na fila não impedem o processo de terminar
+    for _ in range(min(max(1, leitores), len(fontes))):
+        threading.Thread(target=leitor, daemon=True).start()
+
+    restantes = len(fontes)
+    while restantes:
+        fonte, linhas, offset = prontos.get()
+        if isinstance(linhas, Exception):
+            raise SystemExit(f"Falha ao ler {fonte.rotulo}: {linhas}")
+        if linhas is None:
+            restantes -= 1
+        yield fonte, linhas, offset
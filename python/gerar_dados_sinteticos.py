@@ -0,0 +1,165 @@
+from os import makedirs, path
+from datetime import date, datetime, timedelta
+import argparse
+import csv
+import random
+
+# Gera arquivos no formato do CSV original do SISAGUA (tabela.csv) com o tamanho que for pedido,
+# para medir a carga e o dashboard em escala nacional. As proporções vêm do snapshot em
+# data/db_export: municípios por UF, formas de abastecimento por município, amostras por
+# município, e os atributos de local de coleta são sorteados de coletas reais.
+
+current_path = path.dirname(path.abspath(__file__))
+pasta_export = path.join(current_path, "..", "data", "db_export")
+
+# colunas na ordem do dicionário de dados do OpenDataSUS
+COLUNAS = [
+    "Região Geográfica", "UF", "Regional de Saúde", "Município", "Código IBGE", "Número da amostra",
+    "Motivo da Coleta", "Tipo da Forma de Abastecimento", "Código Forma de Abastecimento",
+    "Nome da Forma de Abastecimento", "Nome da ETA/UTA", "Ano", "Mês", "Data da Coleta", "Hora da coleta",
+    "Data do Laudo", "Data de Registro no SISAGUA", "Procedência da Coleta", "Ponto de Coleta",
+    "Descrição do Local", "Zona", "Categoria Área", "Área", "Tipo do Local", "Local", "Latitude", "Longitude",
+    "Grupo", "Parâmetro (ciano)", "Resultado",
+]
+
+# atributos do local de coleta sorteados juntos, de uma mesma coleta real
+COLUNAS_LOCAL = {
+    "Descrição do Local": "DescricaoDoLocal", "Zona": "Zona", "Categoria Área": "CategoriaArea", "Área": "Area",
+    "Tipo do Local": "TipoDoLocal", "Local": "NomeLocal", "Latitude": "Latitude", "Longitude": "Longitude",
+    "Procedência da Coleta": "Procedencia", "Ponto de Coleta": "PontoDeColeta", "Motivo da Coleta": "Motivo",
+}
+
+# o snapshot não traz a tabela Analise, então a quantidade de parâmetros por amostra é configurável
+PARAMETROS_POR_AMOSTRA = 6
+
+INICIO = date(2014, 1, 1)
+FIM = date(2025, 12, 31)
+
+
+def ler_tabela(nome):
+    with open(path.join(pasta_export, f"{nome}.csv"), encoding="utf-8", newline="") as arquivo:
+        return list(csv.DictReader(arquivo, delimiter="\t"))
+
+
+def ler_tamanho(texto):
+    """Aceita '10000', '10k', '1M', '10M'."""
+    multiplicadores = {"k": 1_000, "m": 1_000_000}
+    texto = texto.strip().lower()
+    if texto[-1] in multiplicadores:
+        return int(float(texto[:-1]) * multiplicadores[texto[-1]])
+    return int(texto)
+
+
+class Gerador:
+    def __init__(self, linhas, parametros_por_amostra, semente):
+        self.aleatorio = random.Random(semente)
+        self.parametros_por_amostra = parametros_por_amostra
+
+        estados = {linha["UF"]: linha["Regiao"] for linha in ler_tabela("Estado")}
+        municipios = ler_tabela("Municipio")
+        abastecimentos = {linha["CodigoFormaDeAbastecimento"]: linha for linha in ler_tabela("Abastecimento")}
+        abastecido = ler_tabela("Abastecido")
+        coletas = ler_tabela("Coleta_Amostra_LocalColeta")
+        self.parametros = [(linha["Grupo"].strip(), linha["Parametro_ciano_"].strip()) for linha in ler_tabela("Classificacao")]
+        self.locais = [{coluna: coleta[origem] for coluna, origem in COLUNAS_LOCAL.items()} for coleta in coletas]
+        self.horas = [coleta["Hora"][:5] for coleta in coletas if coleta["Hora"]]
+
+        # mantém as razões do snapshot: amostras por município e formas de abastecimento por município
+        amostras = max(1, linhas // parametros_por_amostra)
+        amostras_por_municipio = len(coletas) / len(municipios)
+        abastecimentos_por_municipio = len(abastecido) / len(municipios)
+        total_municipios = max(len(municipios), round(amostras / amostras_por_municipio))
+
+        # municípios reais primeiro; os que faltam são sintéticos, distribuídos entre as UFs
+        # na mesma proporção do snapshot
+        self.municipios = [
+            {"UF": m["fk_Estado_UF"], "Regiao": estados[m["fk_Estado_UF"]], "Regional": m["RegionalDeSaude"],
+             "Nome": m["NomeMunicipio"], "Codigo": m["CodigoDoIBGE"]}
+            for m in municipios
+        ]
+        codigos = {m["Codigo"] for m in self.municipios}
+        proximo_codigo = 900000
+        for indice in range(total_municipios - len(municipios)):
+            modelo = self.aleatorio.choice(municipios)
+            while str(proximo_codigo) in codigos:
+                proximo_codigo += 1
+            codigos.add(str(proximo_codigo))
+            self.municipios.append({
+                "UF": modelo["fk_Estado_UF"], "Regiao": estados[modelo["fk_Estado_UF"]], "Regional": modelo["RegionalDeSaude"],
+                "Nome": f"MUNICIPIO SINTETICO {indice + 1}", "Codigo": str(proximo_codigo),
+            })
+
+        modelos_abastecimento = list(abastecimentos.values())
+        for municipio in self.municipios:
+            quantidade = max(1, round(self.aleatorio.expovariate(1 / abastecimentos_por_municipio)))
+            municipio["Abastecimentos"] = []
+            for sequencia in range(1, quantidade + 1):
+                modelo = self.aleatorio.choice(modelos_abastecimento)
+                municipio["Abastecimentos"].append({
+                    "Codigo": f"{modelo['CodigoFormaDeAbastecimento'][0]}{municipio['Codigo']}{sequencia:06d}",
+                    "Tipo": modelo["TipoDaFormaDeAbastecimento"],
+                    "Nome": f"{modelo['NomeDaFormaDeAbastecimento']} {sequencia}",
+                    "ETA": modelo["NomeETA_UTA"],
+                })
+
+    def data_aleatoria(self):
+        return INICIO + timedelta(days=self.aleatorio.randrange((FIM - INICIO).days))
+
+    def amostra(self, numero):
+        """Gera as linhas (uma por parâmetro analisado) de uma amostra."""
+        municipio = self.aleatorio.choice(self.municipios)
+        abastecimento = self.aleatorio.choice(municipio["Abastecimentos"])
+        coleta = self.data_aleatoria()
+        laudo = coleta + timedelta(days=self.aleatorio.randint(1, 30))
+        registro = datetime.combine(laudo, datetime.min.time()) + timedelta(days=self.aleatorio.randint(0, 60), seconds=self.aleatorio.randrange(86400))
+
+        base = {
+            "Região Geográfica": municipio["Regiao"], "UF": municipio["UF"], "Regional de Saúde": municipio["Regional"],
+            "Município": municipio["Nome"], "Código IBGE": municipio["Codigo"], "Número da amostra": f"{numero}/{coleta.year}",
+            "Tipo da Forma de Abastecimento": abastecimento["Tipo"], "Código Forma de Abastecimento": abastecimento["Codigo"],
+            "Nome da Forma de Abastecimento": abastecimento["Nome"], "Nome da ETA/UTA": abastecimento["ETA"],
+            "Ano": coleta.year, "Mês": coleta.month, "Data da Coleta": coleta.isoformat(),
+            "Hora da coleta": self.aleatorio.choice(self.horas), "Data do Laudo": laudo.isoformat(),
+            "Data de Registro no SISAGUA": registro.strftime("%Y-%m-%d %H:%M:%S"),
+            **self.aleatorio.choice(self.locais),
+        }
+
+        quantidade = max(1, min(len(self.parametros), round(self.aleatorio.gauss(self.parametros_por_amostra, 2))))
+        for grupo, parametro in self.aleatorio.sample(self.parametros, quantidade):
+            # a maior parte dos resultados é zero; o resto segue uma cauda longa, com vírgula decimal
+            resultado = 0.0 if self.aleatorio.random() < 0.6 else round(self.aleatorio.lognormvariate(1, 2), 2)
+            yield {**base, "Grupo": grupo, "Parâmetro (ciano)": parametro, "Resultado": f"{resultado:.2f}".replace(".", ",")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um tabela.csv sintético no formato do SISAGUA.")
+    parser.add_argument("--linhas", default="10k", help="quantidade de linhas, ex.: 10k, 1M, 10M (padrão: %(default)s)")
+    parser.add_argument("--saida", help="arquivo de saída (padrão: data/sintetico/tabela_<linhas>.csv)")
+    parser.add_argument("--parametros-por-amostra", type=int, default=PARAMETROS_POR_AMOSTRA,
+                        help="média de parâmetros analisados por amostra (padrão: %(default)s)")
+    parser.add_argument("--semente", type=int, default=2025, help="semente do sorteio, para arquivos reproduzíveis")
+    args = parser.parse_args()
+
+    linhas = ler_tamanho(args.linhas)
+    saida = args.saida or path.join(current_path, "..", "data", "sintetico", f"tabela_{args.linhas}.csv")
+    makedirs(path.dirname(path.abspath(saida)), exist_ok=True)
+
+    gerador = Gerador(linhas, args.parametros_por_amostra, args.semente)
+    escritas = 0
+    numero = 1
+    with open(saida, "w", encoding="utf-8-sig", newline="") as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=COLUNAS)
+        escritor.writeheader()
+        while escritas < linhas:
+            for linha in gerador.amostra(numero):
+                escritor.writerow(linha)
+                escritas += 1
+                if escritas >= linhas:
+                    break
+            numero += 1
+
+    print(f"{escritas} linhas ({numero - 1} amostras, {len(gerador.municipios)} municípios) gravadas em {saida}")
+
+
+if __name__ == "__main__":
+    main()
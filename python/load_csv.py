@@ -1,116 +1,719 @@
 from dotenv import load_dotenv
-from os import getenv
-import csv
+from os import getenv, path, remove, replace
+import argparse
+import hashlib
+import json
+import multiprocessing
 import mysql.connector
+import queue
+import time
+import zlib
+
+from chaves_compactas import BANCO as BANCO_COMPACTO, QUERIES_COMPACTO, ResolvedorIds
+from fontes import expandir_fontes, ler_fontes
+from normalizar import normalizar_bloco, gravar_quarentena
+from relatorio_carga import RelatorioCarga, contagem_vazia
+from resumos import AVISO_SEM_RESUMOS, ResumosPendentes
 
-# conexão com database
 load_dotenv()
-conn = mysql.connector.connect(
-    host=getenv("db_host"),
-    user=getenv("db_user"),
-    password=getenv("db_password"),
-    database=getenv("db_name")
-)
-
-cursor = conn.cursor()
-
-with open("data/original_dataset/tabela.csv", encoding="utf-8-sig") as arquivo:
-    leitor = csv.DictReader(arquivo)
-
-    for linha in leitor:
-       
-
-        regiao = linha["Região Geográfica"]
-        uf = linha["UF"]
-
-        # Tabela 1.
-        query = """
-                    INSERT IGNORE INTO Estado (UF, Regiao)
-                    VALUES (%s, %s);
-
-                """
-        valores = (uf,regiao)
-        cursor.execute(query, valores)
-
-        # Tabela 2.
-        CodigoDoIBGE = linha["Código IBGE"]
-        RegionalDeSaude = linha["Regional de Saúde"]
-        NomeMunicipio = linha["Município"]
-        
-        query = """
-                    INSERT IGNORE INTO Municipio (CodigoDoIBGE, RegionalDeSaude,NomeMunicipio,fk_Estado_UF) 
-                    VALUES (%s,%s,%s,%s); 
-                """
-        valores = (CodigoDoIBGE,RegionalDeSaude,NomeMunicipio,uf)
-        cursor.execute(query, valores)
-        
-        # Tabela 3.
-        CodigoFormaDeAbastecimento=linha["Código Forma de Abastecimento"]
-        TipoDaFormaDeAbastecimento=linha["Tipo da Forma de Abastecimento"]
-        NomeETA_UTA=linha["Nome da ETA/UTA"]
-        NomeDaFormaDeAbastecimento=linha["Nome da Forma de Abastecimento"]
-        query = """
-                   INSERT IGNORE INTO Abastecimento (CodigoFormaDeAbastecimento,TipoDaFormaDeAbastecimento,NomeETA_UTA,NomeDaFormaDeAbastecimento)
-                   VALUES (%s,%s,%s,%s); 
-                """
-        valores = (CodigoFormaDeAbastecimento,TipoDaFormaDeAbastecimento,NomeETA_UTA,NomeDaFormaDeAbastecimento)
-        cursor.execute(query, valores)
-
-        # Tabela 4.
-        query = """INSERT IGNORE INTO Abastecido (fk_Municipio_CodigoDoIBGE, fk_Abastecimento_CodigoFormaDeAbastecimento)
-                VALUES (%s,%s);
-                """
-        valores= (CodigoDoIBGE,CodigoFormaDeAbastecimento)
-        cursor.execute(query, valores)
-
-        # Tabela 5.
-        NumeroDaAmostra=linha["Número da amostra"]
-        DataDeRegistroNoSISAGUA=linha["Data de Registro no SISAGUA"]
-        DataColeta=linha["Data da Coleta"]
-        DescricaoDoLocal=linha["Descrição do Local"]
-        Zona=linha["Zona"]
-        CategoriaArea=linha["Categoria Área"]
-        Area = linha["Área"]
-        TipoDoLocal= linha["Tipo do Local"]
-        NomeLocal=linha["Local"]
-        Latitude=linha["Latitude"]
-        Longitude=linha["Longitude"]
-
-        Procedencia=linha["Procedência da Coleta"]
-        PontoDeColeta=linha["Ponto de Coleta"]
-        Motivo=linha["Motivo da Coleta"]
-        Hora=linha["Hora da coleta"]
-
-        query = """INSERT IGNORE INTO Coleta_Amostra_LocalColeta 
+
+# consultas de inserção, na ordem de dependência das tabelas
+# (sem ';' no final para o executemany conseguir montar um único INSERT com várias linhas em VALUES)
+QUERIES = {
+    "Estado": """
+        INSERT IGNORE INTO Estado (UF, Regiao)
+        VALUES (%s, %s)
+    """,
+    "Municipio": """
+        INSERT IGNORE INTO Municipio (CodigoDoIBGE, RegionalDeSaude, NomeMunicipio, fk_Estado_UF)
+        VALUES (%s, %s, %s, %s)
+    """,
+    "Abastecimento": """
+        INSERT IGNORE INTO Abastecimento (CodigoFormaDeAbastecimento, TipoDaFormaDeAbastecimento, NomeETA_UTA, NomeDaFormaDeAbastecimento)
+        VALUES (%s, %s, %s, %s)
+    """,
+    "Abastecido": """
+        INSERT IGNORE INTO Abastecido (fk_Municipio_CodigoDoIBGE, fk_Abastecimento_CodigoFormaDeAbastecimento)
+        VALUES (%s, %s)
+    """,
+    "Coleta_Amostra_LocalColeta": """
+        INSERT IGNORE INTO Coleta_Amostra_LocalColeta
         (NumeroDaAmostra, DataDeRegistroNoSISAGUA, DataColeta, DescricaoDoLocal, Zona, CategoriaArea, Area, TipoDoLocal, NomeLocal, Latitude, Longitude, fk_Municipio_CodigoDoIBGE, Procedencia, PontoDeColeta, Motivo, Hora)
-        VALUES (%s, %s,%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
-                """
-        valores= (NumeroDaAmostra, DataDeRegistroNoSISAGUA, DataColeta, DescricaoDoLocal, Zona, CategoriaArea, Area, TipoDoLocal, NomeLocal, Latitude, Longitude, CodigoDoIBGE, Procedencia, PontoDeColeta, Motivo, Hora)
-        cursor.execute(query, valores)
-
-        #Tabela 6.
-        Grupo = linha["Grupo"]
-        Parametro_ciano_ = linha["Parâmetro (ciano)"]
-
-        query = """
-                INSERT IGNORE INTO Classificacao (Grupo, Parametro_Ciano_)
-                VALUES (%s, %s);
-                """
-        valores = (Grupo, Parametro_ciano_)
-        cursor.execute(query, valores)
-
-        #Tabela 7.
-        Resultado = linha["Resultado"]
-        DataDoLaudo = linha["Data do Laudo"]
-
-        query = """
-                INSERT IGNORE INTO Analise (fk_Amostra_DataColeta,fk_Amostra_Hora,fk_Amostra_NumeroDaAmostra,fk_Classificacao_Parametro_ciano_, Resultado, DataDoLaudo)  VALUES (%s,%s,%s,%s,%s,%s);
-                """
-        valores = (DataColeta,Hora,NumeroDaAmostra,Parametro_ciano_,Resultado,DataDoLaudo)
-        cursor.execute(query, valores)
-
-conn.commit()
-cursor.close()
-conn.close()
-
-print("Inserção concluída!\n")
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """,
+    # Localizacao é uma coluna gerada a partir da latitude e longitude
+    "Coleta_Geo": """
+        INSERT IGNORE INTO Coleta_Geo (fk_Amostra_DataColeta, fk_Amostra_Hora, fk_Amostra_NumeroDaAmostra, Latitude, Longitude)
+        VALUES (%s, %s, %s, %s, %s)
+    """,
+    "Classificacao": """
+        INSERT IGNORE INTO Classificacao (Grupo, Parametro_Ciano_)
+        VALUES (%s, %s)
+    """,
+    "Analise": """
+        INSERT IGNORE INTO Analise (fk_Amostra_DataColeta, fk_Amostra_Hora, fk_Amostra_NumeroDaAmostra, fk_Classificacao_Parametro_ciano_, Resultado, DataDoLaudo)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """,
+}
+
+# posição da chave primária na tupla de valores de cada tabela de dimensão.
+# chaves já vistas são descartadas em memória, antes de chegar ao servidor
+CHAVES_DIMENSAO = {
+    "Estado": 0,           # UF
+    "Municipio": 0,        # CodigoDoIBGE
+    "Abastecimento": 0,    # CodigoFormaDeAbastecimento
+    "Classificacao": 1,    # Parametro_ciano_
+}
+
+ARQUIVO_PADRAO = "data/original_dataset/tabela.csv"
+
+# linhas normalizadas de uma vez pelo pandas; blocos pequenos pagam mais overhead por linha
+TAMANHO_BLOCO_NORMALIZACAO = 10000
+
+
+def ler_checkpoint(caminho_checkpoint, fontes):
+    """Retorna o checkpoint, {"fontes": {rotulo: {"offset", "linha", "concluida"}}, "resumos": ...}, ou None se não houver."""
+    if not path.exists(caminho_checkpoint):
+        return None
+    with open(caminho_checkpoint, encoding="utf-8") as arquivo:
+        checkpoint = json.load(arquivo)
+    if "arquivo" in checkpoint:
+        # checkpoint de um só arquivo, gravado por versões anteriores da carga
+        checkpoint = {"fontes": {checkpoint["arquivo"]: {"offset": checkpoint["offset"], "linha": checkpoint["linha"], "concluida": False}}}
+    desconhecidas = set(checkpoint["fontes"]) - {fonte.rotulo for fonte in fontes}
+    if desconhecidas:
+        raise SystemExit(f"O checkpoint {caminho_checkpoint} pertence a outros arquivos: {', '.join(sorted(desconhecidas))}")
+    return checkpoint
+
+
+def salvar_checkpoint(caminho_checkpoint, posicoes, resumos):
+    # grava num arquivo temporário e troca de uma vez, para nunca deixar um checkpoint pela metade
+    temporario = caminho_checkpoint + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        # os grupos de resumo tocados até aqui, para a retomada ainda recalculá-los no final
+        json.dump({"fontes": posicoes, "resumos": resumos.para_json()}, arquivo, indent=2, ensure_ascii=False)
+    replace(temporario, caminho_checkpoint)
+
+
+def extrair_valores(linha):
+    """Separa uma linha do CSV original nas tuplas de valores de cada tabela."""
+
+    # Tabela 1.
+    regiao = linha["Região Geográfica"]
+    uf = linha["UF"]
+
+    # Tabela 2.
+    CodigoDoIBGE = linha["Código IBGE"]
+    RegionalDeSaude = linha["Regional de Saúde"]
+    NomeMunicipio = linha["Município"]
+
+    # Tabela 3.
+    CodigoFormaDeAbastecimento = linha["Código Forma de Abastecimento"]
+    TipoDaFormaDeAbastecimento = linha["Tipo da Forma de Abastecimento"]
+    NomeETA_UTA = linha["Nome da ETA/UTA"]
+    NomeDaFormaDeAbastecimento = linha["Nome da Forma de Abastecimento"]
+
+    # Tabela 5.
+    NumeroDaAmostra = linha["Número da amostra"]
+    DataDeRegistroNoSISAGUA = linha["Data de Registro no SISAGUA"]
+    DataColeta = linha["Data da Coleta"]
+    DescricaoDoLocal = linha["Descrição do Local"]
+    Zona = linha["Zona"]
+    CategoriaArea = linha["Categoria Área"]
+    Area = linha["Área"]
+    TipoDoLocal = linha["Tipo do Local"]
+    NomeLocal = linha["Local"]
+    Latitude = linha["Latitude"]
+    Longitude = linha["Longitude"]
+    Procedencia = linha["Procedência da Coleta"]
+    PontoDeColeta = linha["Ponto de Coleta"]
+    Motivo = linha["Motivo da Coleta"]
+    Hora = linha["Hora da coleta"]
+
+    # Tabela 6.
+    Grupo = linha["Grupo"]
+    Parametro_ciano_ = linha["Parâmetro (ciano)"]
+
+    # Tabela 7.
+    Resultado = linha["Resultado"]
+    DataDoLaudo = linha["Data do Laudo"]
+
+    valores = {
+        "Estado": (uf, regiao),
+        "Municipio": (CodigoDoIBGE, RegionalDeSaude, NomeMunicipio, uf),
+        "Abastecimento": (CodigoFormaDeAbastecimento, TipoDaFormaDeAbastecimento, NomeETA_UTA, NomeDaFormaDeAbastecimento),
+        "Abastecido": (CodigoDoIBGE, CodigoFormaDeAbastecimento),
+        "Coleta_Amostra_LocalColeta": (NumeroDaAmostra, DataDeRegistroNoSISAGUA, DataColeta, DescricaoDoLocal, Zona, CategoriaArea, Area, TipoDoLocal, NomeLocal, Latitude, Longitude, CodigoDoIBGE, Procedencia, PontoDeColeta, Motivo, Hora),
+        "Classificacao": (Grupo, Parametro_ciano_),
+        "Analise": (DataColeta, Hora, NumeroDaAmostra, Parametro_ciano_, Resultado, DataDoLaudo),
+    }
+    # só as coletas com as duas coordenadas válidas ganham um ponto
+    if Latitude is not None and Longitude is not None:
+        valores["Coleta_Geo"] = (DataColeta, Hora, NumeroDaAmostra, Latitude, Longitude)
+    return valores
+
+
+def conectar(banco=None):
+    # conexão com database
+    return mysql.connector.connect(
+        host=getenv("db_host"),
+        user=getenv("db_user"),
+        password=getenv("db_password"),
+        database=banco or getenv("db_name")
+    )
+
+
+class CargaEmLotes:
+    """Acumula as linhas de cada tabela e envia em lotes com executemany."""
+
+    queries = QUERIES
+
+    def __init__(self, conn, tamanho_lote, relatorio):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.tamanho_lote = tamanho_lote
+        self.relatorio = relatorio
+        self.pendentes = 0
+        self.buffers = {tabela: [] for tabela in self.queries}
+        self.vistos = {tabela: set() for tabela in CHAVES_DIMENSAO}
+        # pares município/abastecimento também se repetem em quase todas as linhas
+        self.vistos["Abastecido"] = set()
+
+    def adicionar(self, valores):
+        for tabela, tupla in valores.items():
+            if tabela in self.vistos:
+                posicao = CHAVES_DIMENSAO.get(tabela)
+                chave = tupla if posicao is None else tupla[posicao]
+                if chave in self.vistos[tabela]:
+                    self.relatorio.registrar_descarte(tabela)
+                    continue
+                self.vistos[tabela].add(chave)
+            self.buffers[tabela].append(tupla)
+
+        self.pendentes += 1
+        if self.pendentes >= self.tamanho_lote:
+            self.descarregar()
+
+    def enviar(self, tabelas):
+        enviadas = 0
+        for tabela in tabelas:
+            buffer = self.buffers[tabela]
+            if buffer:
+                with self.relatorio.medir("banco"):
+                    self.cursor.executemany(self.queries[tabela], buffer)
+                self.relatorio.registrar_envio(tabela, len(buffer), self.cursor.rowcount)
+                enviadas += len(buffer)
+                buffer.clear()
+        return enviadas
+
+    def descarregar(self):
+        # esvazia todos os buffers juntos e na ordem de queries, para que as
+        # linhas referenciadas pelas chaves estrangeiras já estejam no banco
+        self.enviar(self.queries)
+        self.pendentes = 0
+
+    def commit(self):
+        self.descarregar()
+        with self.relatorio.medir("banco"):
+            self.conn.commit()
+
+    def finalizar(self):
+        self.commit()
+        self.cursor.close()
+
+
+class CargaCompacta(CargaEmLotes):
+    """Carga em lotes no esquema compacto, com as chaves naturais trocadas pelos ids inteiros."""
+
+    queries = QUERIES_COMPACTO
+
+    def __init__(self, conn, tamanho_lote, relatorio):
+        super().__init__(conn, tamanho_lote, relatorio)
+        self.ids = ResolvedorIds(self.cursor)
+        # as demais dimensões e as coletas já vistas são filtradas pelo ResolvedorIds
+        self.vistos = {"Estado": set(), "Fato_Abastecido": set()}
+
+    def adicionar(self, valores):
+        super().adicionar(self.ids.traduzir(valores))
+
+
+# Modo delta: cada linha do CSV recebe uma impressão digital (chave = amostra, data, hora e parâmetro;
+# conteúdo = a linha inteira), guardada em Carga_Impressao. Numa nova versão do OpenDataSUS só as
+# linhas novas, alteradas ou removidas desde a última carga chegam ao banco.
+CRIAR_IMPRESSOES = """
+    CREATE TABLE IF NOT EXISTS Carga_Impressao (
+        Chave BINARY(16) PRIMARY KEY,
+        Conteudo BINARY(16) NOT NULL,
+        NumeroDaAmostra VARCHAR(255),
+        DataColeta DATE,
+        Hora TIME,
+        Parametro_ciano_ VARCHAR(255)
+    )
+"""
+
+COLUNAS_COLETA = ["NumeroDaAmostra", "DataDeRegistroNoSISAGUA", "DataColeta", "DescricaoDoLocal", "Zona", "CategoriaArea", "Area", "TipoDoLocal", "NomeLocal", "Latitude", "Longitude", "fk_Municipio_CodigoDoIBGE", "Procedencia", "PontoDeColeta", "Motivo", "Hora"]
+
+QUERIES_DELTA = {
+    **{tabela: query for tabela, query in QUERIES.items() if tabela in CHAVES_DIMENSAO or tabela == "Abastecido"},
+    # linhas alteradas: a análise antiga sai e a coleta é atualizada no lugar
+    "Analise_remover": """
+        DELETE FROM Analise
+        WHERE fk_Amostra_NumeroDaAmostra = %s AND fk_Amostra_DataColeta = %s
+          AND fk_Amostra_Hora = %s AND fk_Classificacao_Parametro_ciano_ = %s
+    """,
+    "Coleta_Amostra_LocalColeta": QUERIES["Coleta_Amostra_LocalColeta"],
+    "Coleta_atualizar": f"""
+        INSERT INTO Coleta_Amostra_LocalColeta
+        ({", ".join(COLUNAS_COLETA)})
+        VALUES ({", ".join(["%s"] * len(COLUNAS_COLETA))})
+        ON DUPLICATE KEY UPDATE {", ".join(f"{coluna} = VALUES({coluna})" for coluna in COLUNAS_COLETA if coluna not in ("NumeroDaAmostra", "DataColeta", "Hora"))}
+    """,
+    # coordenadas que sumiram ou mudaram numa linha alterada
+    "Coleta_Geo_remover": """
+        DELETE FROM Coleta_Geo
+        WHERE fk_Amostra_DataColeta = %s AND fk_Amostra_Hora = %s AND fk_Amostra_NumeroDaAmostra = %s
+    """,
+    "Coleta_Geo": QUERIES["Coleta_Geo"],
+    "Analise": QUERIES["Analise"],
+    "Carga_Impressao": """
+        INSERT INTO Carga_Impressao (Chave, Conteudo, NumeroDaAmostra, DataColeta, Hora, Parametro_ciano_)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE Conteudo = VALUES(Conteudo)
+    """,
+}
+
+
+def impressao(linha):
+    """Retorna (chave, conteudo) da linha original do CSV."""
+    campos = (linha["Número da amostra"], linha["Data da Coleta"], linha["Hora da coleta"], linha["Parâmetro (ciano)"])
+    chave = hashlib.blake2b("\x1f".join(campos).encode("utf-8"), digest_size=16).digest()
+    conteudo = hashlib.blake2b("\x1f".join(map(str, linha.values())).encode("utf-8"), digest_size=16).digest()
+    return chave, conteudo
+
+
+def campos_da_chave(valores):
+    """Amostra, data, hora e parâmetro já normalizados, como nas colunas DATE e TIME do banco."""
+    data_coleta, hora, numero, parametro = valores["Analise"][:4]
+    return numero, data_coleta, hora, parametro
+
+
+class CargaDelta(CargaEmLotes):
+    """Carga em lotes que só envia ao banco as linhas novas ou alteradas desde a última carga."""
+
+    queries = QUERIES_DELTA
+
+    def __init__(self, conn, tamanho_lote, relatorio, resumos):
+        super().__init__(conn, tamanho_lote, relatorio)
+        self.resumos = resumos
+        # chaves das linhas alteradas ainda no buffer, cujos grupos antigos de resumo faltam anotar
+        self.alteradas = []
+        self.cursor.execute(CRIAR_IMPRESSOES)
+        self.cursor.execute("SELECT Chave, Conteudo FROM Carga_Impressao")
+        self.anteriores = dict(self.cursor.fetchall())
+        self.vistas = set()
+        self.contagem = {"novas": 0, "alteradas": 0, "iguais": 0, "removidas": 0}
+
+    def adicionar_linha(self, linha, valores, registrar=True):
+        """linha é a linha original do CSV (base da impressão) e valores, o resultado de extrair_valores.
+
+        Retorna True se a linha foi enviada ao banco (nova ou alterada).
+        """
+        chave, conteudo = impressao(linha)
+        self.vistas.add(chave)
+        if not registrar or valores is None:
+            # linha já processada antes do checkpoint, ou rejeitada na normalização: só conta como vista
+            return False
+
+        anterior = self.anteriores.get(chave)
+        if anterior == conteudo:
+            self.contagem["iguais"] += 1
+            return False
+
+        # o hash usa o texto original; o banco recebe a data e a hora convertidas (dd/mm/aaaa, H:MM...)
+        campos = campos_da_chave(valores)
+
+        if anterior is None:
+            self.contagem["novas"] += 1
+        else:
+            self.contagem["alteradas"] += 1
+            self.alteradas.append(chave)
+            valores["Analise_remover"] = campos
+            valores["Coleta_atualizar"] = valores.pop("Coleta_Amostra_LocalColeta")
+            coleta = valores["Coleta_atualizar"]
+            valores["Coleta_Geo_remover"] = (coleta[2], coleta[15], coleta[0])
+        valores["Carga_Impressao"] = (chave, conteudo) + campos
+        self.adicionar(valores)
+        return True
+
+    def descarregar(self):
+        # se o município ou o ano do laudo mudaram, os grupos antigos também precisam ser recalculados:
+        # são lidos do banco antes de a atualização sobrescrever a coleta e a análise
+        if self.alteradas:
+            with self.relatorio.medir("banco"):
+                self.resumos.registrar_remocoes(self.cursor, self.alteradas)
+            self.alteradas = []
+        super().descarregar()
+
+    def remover_ausentes(self):
+        """Apaga as análises (e coletas que ficaram sem análise) que sumiram da nova versão do arquivo."""
+        ausentes = [chave for chave in self.anteriores if chave not in self.vistas]
+        self.contagem["removidas"] = len(ausentes)
+
+        for inicio in range(0, len(ausentes), self.tamanho_lote):
+            bloco = ausentes[inicio:inicio + self.tamanho_lote]
+            marcadores = ", ".join(["%s"] * len(bloco))
+            inicio_banco = time.perf_counter()
+            self.resumos.registrar_remocoes(self.cursor, bloco)
+            self.cursor.execute(f"""
+                DELETE a FROM Analise a
+                JOIN Carga_Impressao ci
+                  ON a.fk_Amostra_NumeroDaAmostra = ci.NumeroDaAmostra AND a.fk_Amostra_DataColeta = ci.DataColeta
+                 AND a.fk_Amostra_Hora = ci.Hora AND a.fk_Classificacao_Parametro_ciano_ = ci.Parametro_ciano_
+                WHERE ci.Chave IN ({marcadores})
+            """, bloco)
+            self.relatorio.registrar_envio("Analise_remover", len(bloco), self.cursor.rowcount)
+            # o ponto de cada coleta que vai sair: com sql/restricoes_particionado_squema.sql não há
+            # a chave estrangeira com ON DELETE CASCADE para apagá-lo junto
+            self.cursor.execute(f"""
+                DELETE g FROM Coleta_Geo g
+                JOIN Carga_Impressao ci
+                  ON g.fk_Amostra_NumeroDaAmostra = ci.NumeroDaAmostra AND g.fk_Amostra_DataColeta = ci.DataColeta
+                 AND g.fk_Amostra_Hora = ci.Hora
+                WHERE ci.Chave IN ({marcadores})
+                  AND NOT EXISTS (
+                      SELECT 1 FROM Analise a
+                      WHERE a.fk_Amostra_NumeroDaAmostra = g.fk_Amostra_NumeroDaAmostra
+                        AND a.fk_Amostra_DataColeta = g.fk_Amostra_DataColeta AND a.fk_Amostra_Hora = g.fk_Amostra_Hora
+                  )
+            """, bloco)
+            self.relatorio.registrar_envio("Coleta_Geo_remover", len(bloco), self.cursor.rowcount)
+            self.cursor.execute(f"""
+                DELETE c FROM Coleta_Amostra_LocalColeta c
+                JOIN Carga_Impressao ci
+                  ON c.NumeroDaAmostra = ci.NumeroDaAmostra AND c.DataColeta = ci.DataColeta AND c.Hora = ci.Hora
+                WHERE ci.Chave IN ({marcadores})
+                  AND NOT EXISTS (
+                      SELECT 1 FROM Analise a
+                      WHERE a.fk_Amostra_NumeroDaAmostra = c.NumeroDaAmostra
+                        AND a.fk_Amostra_DataColeta = c.DataColeta AND a.fk_Amostra_Hora = c.Hora
+                  )
+            """, bloco)
+            self.relatorio.registrar_envio("Coleta_remover", len(bloco), self.cursor.rowcount)
+            self.cursor.execute(f"DELETE FROM Carga_Impressao WHERE Chave IN ({marcadores})", bloco)
+            self.relatorio.tempos["banco"] += time.perf_counter() - inicio_banco
+
+
+# tabelas de fato distribuídas entre os processos, e a posição da chave usada para escolher o processo.
+# Coleta e Analise usam o NumeroDaAmostra, então a análise sempre vai para o mesmo processo (e a mesma
+# conexão) que inseriu a sua coleta
+TABELAS_FATO = {
+    "Abastecido": 0,                    # CodigoDoIBGE
+    "Coleta_Amostra_LocalColeta": 0,    # NumeroDaAmostra
+    "Coleta_Geo": 2,                    # NumeroDaAmostra
+    "Analise": 2,                       # NumeroDaAmostra
+}
+
+COMMIT = "commit"
+
+# segundos entre as verificações de que os processos de trabalho continuam vivos
+ESPERA_PROCESSOS = 5
+
+
+def descrever_erro(e):
+    return str(e) if isinstance(e, mysql.connector.Error) else f"{type(e).__name__}: {e}"
+
+
+def processo_fatos(fila, respostas):
+    """Processo de trabalho: insere os lotes de fatos recebidos pela fila com a sua própria conexão."""
+    conn, erro = None, None
+    try:
+        conn = conectar()
+        cursor = conn.cursor()
+    except Exception as e:
+        erro = descrever_erro(e)
+
+    # contadores desde o último commit, devolvidos ao processo principal junto com a confirmação
+    contagens = {tabela: contagem_vazia() for tabela in TABELAS_FATO}
+    segundos_banco = 0.0
+
+    while True:
+        mensagem = fila.get()
+        if mensagem is None:
+            break
+        if mensagem == COMMIT:
+            inicio = time.perf_counter()
+            if erro is None:
+                try:
+                    conn.commit()
+                except Exception as e:
+                    erro = descrever_erro(e)
+            segundos_banco += time.perf_counter() - inicio
+            respostas.put((erro, contagens, segundos_banco))
+            contagens = {tabela: contagem_vazia() for tabela in TABELAS_FATO}
+            segundos_banco = 0.0
+            continue
+        if erro is not None:
+            # depois de uma falha só esvazia a fila, o erro é repassado no próximo commit
+            continue
+        try:
+            for tabela in QUERIES:
+                if mensagem.get(tabela):
+                    inicio = time.perf_counter()
+                    cursor.executemany(QUERIES[tabela], mensagem[tabela])
+                    segundos_banco += time.perf_counter() - inicio
+                    contagens[tabela]["enviadas"] += len(mensagem[tabela])
+                    contagens[tabela]["afetadas"] += max(cursor.rowcount, 0)
+        except Exception as e:
+            # qualquer falha (não só do banco) é repassada no próximo commit, em vez de encerrar o processo
+            erro = descrever_erro(e)
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+
+    if conn is not None:
+        cursor.close()
+        conn.close()
+
+
+class CargaParalela(CargaEmLotes):
+    """Carga em lotes com as tabelas de fato divididas entre vários processos.
+
+    As dimensões continuam sendo inseridas (e confirmadas) pelo processo principal antes
+    que os fatos do mesmo lote sejam repassados, para que as chaves estrangeiras já existam
+    quando as conexões dos outros processos inserirem os fatos.
+    """
+
+    def __init__(self, conn, tamanho_lote, relatorio, workers):
+        super().__init__(conn, tamanho_lote, relatorio)
+        contexto = multiprocessing.get_context()
+        self.respostas = contexto.Queue()
+        self.filas = []
+        self.processos = []
+        for _ in range(workers):
+            fila = contexto.Queue(maxsize=4)
+            processo = contexto.Process(target=processo_fatos, args=(fila, self.respostas), daemon=True)
+            processo.start()
+            self.filas.append(fila)
+            self.processos.append(processo)
+
+    def descarregar(self):
+        if self.enviar([tabela for tabela in QUERIES if tabela not in TABELAS_FATO]):
+            self.conn.commit()
+
+        lotes = [{tabela: [] for tabela in TABELAS_FATO} for _ in self.filas]
+        for tabela, posicao in TABELAS_FATO.items():
+            for tupla in self.buffers[tabela]:
+                # crc32 em vez de hash(): o resultado é o mesmo em qualquer execução
+                indice = zlib.crc32(tupla[posicao].encode("utf-8")) % len(self.filas)
+                lotes[indice][tabela].append(tupla)
+            self.buffers[tabela].clear()
+
+        for fila, lote in zip(self.filas, lotes):
+            if any(lote.values()):
+                self.repassar(fila, lote)
+        self.pendentes = 0
+
+    def conferir_processos(self):
+        # um processo morto (OOM, kill) nunca responde nem esvazia a sua fila: a carga para aqui
+        mortos = [processo for processo in self.processos if not processo.is_alive()]
+        if mortos:
+            self.encerrar_processos(forcar=True)
+            raise SystemExit(f"Um processo de carga terminou sem responder (código de saída {mortos[0].exitcode})")
+
+    def repassar(self, fila, mensagem):
+        while True:
+            try:
+                fila.put(mensagem, timeout=ESPERA_PROCESSOS)
+                return
+            except queue.Full:
+                self.conferir_processos()
+
+    def receber(self):
+        while True:
+            try:
+                return self.respostas.get(timeout=ESPERA_PROCESSOS)
+            except queue.Empty:
+                self.conferir_processos()
+
+    def commit(self):
+        super().commit()
+        # barreira: o checkpoint só pode ser gravado depois que todos os processos confirmaram
+        for fila in self.filas:
+            self.repassar(fila, COMMIT)
+        erros = []
+        for _ in self.filas:
+            erro, contagens, segundos_banco = self.receber()
+            self.relatorio.juntar(contagens, segundos_banco)
+            if erro is not None:
+                erros.append(erro)
+        if erros:
+            self.encerrar_processos()
+            raise SystemExit(f"Falha na inserção dos fatos: {erros[0]}")
+
+    def encerrar_processos(self, forcar=False):
+        for fila, processo in zip(self.filas, self.processos):
+            if forcar:
+                # sem isso a saída esperaria a fila entregar os lotes a um processo que não lê mais
+                fila.cancel_join_thread()
+                processo.terminate()
+            else:
+                fila.put(None)
+        for processo in self.processos:
+            processo.join()
+
+    def finalizar(self):
+        super().finalizar()
+        self.encerrar_processos()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Popula o banco a partir do CSV original do SISAGUA.")
+    parser.add_argument("arquivos", nargs="*", default=[ARQUIVO_PADRAO],
+                        help="CSVs de origem: arquivos, padrões glob ou pastas; aceita .csv.gz e .zip (padrão: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=int(getenv("db_batch_size", 1000)),
+                        help="linhas do CSV acumuladas antes de cada envio ao banco (padrão: %(default)s)")
+    parser.add_argument("--commit-every", type=int, default=int(getenv("db_commit_every", 50000)),
+                        help="linhas do CSV por transação; um checkpoint é gravado a cada commit (padrão: %(default)s)")
+    parser.add_argument("--checkpoint", help="arquivo de checkpoint (padrão: <arquivo>.checkpoint.json)")
+    parser.add_argument("--resume", action="store_true", help="retoma a partir do último commit registrado no checkpoint")
+    parser.add_argument("--workers", type=int, default=int(getenv("db_workers", 1)),
+                        help="processos para as tabelas de fato, cada um com a sua conexão (padrão: %(default)s)")
+    parser.add_argument("--leitores", type=int, default=int(getenv("db_leitores", 4)),
+                        help="arquivos lidos ao mesmo tempo, cada um numa thread (padrão: %(default)s)")
+    parser.add_argument("--delta", action="store_true",
+                        help="só insere, atualiza ou remove as linhas que mudaram desde a última carga")
+    parser.add_argument("--compacto", action="store_true",
+                        help=f"carrega o esquema compacto, com chaves inteiras, no banco {BANCO_COMPACTO} (.env: db_name_compacto)")
+    parser.add_argument("--ano", type=int,
+                        help="carrega só as amostras coletadas neste ano (uma partição, com sql/particoes_squema.sql)")
+    parser.add_argument("--quarentena", help="CSV com as linhas rejeitadas na normalização (padrão: <arquivo>.quarentena.csv)")
+    parser.add_argument("--relatorio", help="relatório JSON da execução (padrão: <arquivo>.relatorio.json)")
+    parser.add_argument("--progresso", type=float, default=10, help="segundos entre as linhas de progresso (padrão: %(default)s)")
+    args = parser.parse_args()
+    if args.delta and args.workers > 1:
+        parser.error("--delta não pode ser combinado com --workers")
+    if args.ano and args.delta:
+        parser.error("--ano não pode ser combinado com --delta: as linhas dos outros anos seriam tratadas como removidas")
+    if args.compacto and (args.delta or args.workers > 1 or args.ano):
+        parser.error("--compacto não pode ser combinado com --delta, --workers nem --ano")
+
+    fontes = expandir_fontes(args.arquivos)
+    # com um único arquivo ou pasta, os arquivos auxiliares ficam ao lado dele
+    if len(args.arquivos) == 1 and not any(caractere in args.arquivos[0] for caractere in "*?["):
+        prefixo = args.arquivos[0].rstrip("/\\")
+    else:
+        prefixo = "carga"
+    caminho_checkpoint = args.checkpoint or prefixo + ".checkpoint.json"
+    caminho_quarentena = args.quarentena or prefixo + ".quarentena.csv"
+    caminho_relatorio = args.relatorio or prefixo + ".relatorio.json"
+
+    # posição já confirmada no banco de cada fonte
+    posicoes = {fonte.rotulo: {"offset": 0, "linha": 0, "concluida": False} for fonte in fontes}
+    checkpoint = None
+    if args.resume:
+        checkpoint = ler_checkpoint(caminho_checkpoint, fontes)
+        if checkpoint:
+            posicoes.update(checkpoint["fontes"])
+            concluidas = sum(posicao["concluida"] for posicao in posicoes.values())
+            print(f"Retomando a partir da linha {sum(p['linha'] for p in posicoes.values())} ({concluidas} de {len(fontes)} arquivos concluídos)")
+        else:
+            print("Nenhum checkpoint encontrado, começando do início")
+    if not checkpoint and path.exists(caminho_quarentena):
+        remove(caminho_quarentena)
+    resumos = ResumosPendentes(checkpoint.get("resumos") if checkpoint else None)
+
+    modo = "delta" if args.delta else "paralelo" if args.workers > 1 else "compacto" if args.compacto else "lote"
+    relatorio = RelatorioCarga(", ".join(args.arquivos), modo, QUERIES_COMPACTO if args.compacto else QUERIES, args.progresso)
+
+    conn = conectar(BANCO_COMPACTO if args.compacto else None)
+    if args.compacto:
+        carga = CargaCompacta(conn, max(1, args.batch_size), relatorio)
+    elif args.delta:
+        carga = CargaDelta(conn, max(1, args.batch_size), relatorio, resumos)
+    elif args.workers > 1:
+        carga = CargaParalela(conn, max(1, args.batch_size), relatorio, args.workers)
+    else:
+        carga = CargaEmLotes(conn, max(1, args.batch_size), relatorio)
+    commit_every = max(1, args.commit_every)
+    desde_commit = 0
+    fora_do_ano = 0
+
+    # no modo delta os arquivos são sempre lidos do início: as linhas antes do checkpoint
+    # só entram no conjunto de chaves vistas, para não serem tratadas como removidas
+    retomada = {rotulo: posicao["linha"] for rotulo, posicao in posicoes.items()}
+    if args.delta:
+        posicoes = {rotulo: {"offset": 0, "linha": 0, "concluida": False} for rotulo in posicoes}
+
+    a_ler = [fonte for fonte in fontes if not posicoes[fonte.rotulo]["concluida"]]
+    offsets = {rotulo: posicao["offset"] for rotulo, posicao in posicoes.items()}
+    blocos = ler_fontes(a_ler, offsets, max(TAMANHO_BLOCO_NORMALIZACAO, args.batch_size), args.leitores)
+    while True:
+        with relatorio.medir("leitura"):
+            bloco = next(blocos, None)
+        if bloco is None:
+            break
+        fonte, linhas, offsets_linhas = bloco
+        posicao = posicoes[fonte.rotulo]
+        if linhas is None:
+            posicao["concluida"] = True
+            continue
+
+        # datas, horas, decimais e coordenadas chegam ao banco já convertidas
+        with relatorio.medir("normalizacao"):
+            tipadas, quarentena = normalizar_bloco(linhas)
+            if args.delta:
+                # na retomada, as linhas antes do checkpoint já estão na quarentena
+                quarentena = quarentena[quarentena.index >= retomada[fonte.rotulo] - posicao["linha"]]
+            quarentena.insert(0, "Arquivo", fonte.rotulo)
+            gravar_quarentena(caminho_quarentena, quarentena)
+        relatorio.linhas(len(linhas), len(quarentena), fonte.rotulo)
+
+        for linha, tipada, offset in zip(linhas, tipadas, offsets_linhas):
+            valores = None if tipada is None else extrair_valores(tipada)
+            if args.ano and valores is not None and tipada["Data da Coleta"].year != args.ano:
+                valores = None
+                fora_do_ano += 1
+            if args.delta:
+                if carga.adicionar_linha(linha, valores, registrar=posicao["linha"] >= retomada[fonte.rotulo]):
+                    resumos.registrar(valores)
+            elif valores is not None:
+                carga.adicionar(valores)
+                resumos.registrar(valores)
+            posicao["linha"] += 1
+            posicao["offset"] = offset
+            desde_commit += 1
+
+            # transações curtas: um crash perde no máximo commit_every linhas, mesmo no meio de um bloco
+            if desde_commit >= commit_every:
+                carga.commit()
+                salvar_checkpoint(caminho_checkpoint, posicoes, resumos)
+                desde_commit = 0
+
+    if args.delta:
+        carga.descarregar()
+        carga.remover_ausentes()
+        print(", ".join(f"{quantidade} {situacao}" for situacao, quantidade in carga.contagem.items()))
+
+    carga.finalizar()
+    # só os grupos tocados por esta carga; bancos sem sql/resumos_squema.sql são pulados
+    if resumos.atualizar(conn):
+        print("Tabelas de resumo atualizadas")
+    elif not args.compacto:
+        print(AVISO_SEM_RESUMOS)
+    conn.close()
+    if args.ano:
+        print(f"{fora_do_ano} linhas de outros anos ignoradas (--ano {args.ano})")
+
+    # carga completa, o checkpoint não é mais necessário
+    if path.exists(caminho_checkpoint):
+        remove(caminho_checkpoint)
+
+    relatorio.gravar(caminho_relatorio)
+    if relatorio.linhas_rejeitadas:
+        print(f"{relatorio.linhas_rejeitadas} linhas rejeitadas, veja {caminho_quarentena}")
+    print("Inserção concluída!\n")
+
+
+if __name__ == "__main__":
+    main()
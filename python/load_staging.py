@@ -0,0 +1,191 @@
+from dotenv import load_dotenv
+from os import getenv, path
+import argparse
+import csv
+import mysql.connector
+
+from resumos import AVISO_SEM_RESUMOS, refazer, resumos_existem
+
+load_dotenv()
+
+# Alternativa ao load_csv.py: o CSV inteiro vai para uma tabela larga de staging com
+# LOAD DATA LOCAL INFILE e as tabelas do esquema são preenchidas com INSERT ... SELECT DISTINCT,
+# tudo do lado do servidor. O servidor precisa estar com local_infile=ON.
+
+ARQUIVO_PADRAO = "data/original_dataset/tabela.csv"
+TABELA_STAGING = "Staging_SISAGUA"
+
+# coluna do CSV original -> coluna da tabela de staging
+COLUNAS_STAGING = {
+    "Região Geográfica": "Regiao",
+    "UF": "UF",
+    "Regional de Saúde": "RegionalDeSaude",
+    "Município": "NomeMunicipio",
+    "Código IBGE": "CodigoDoIBGE",
+    "Número da amostra": "NumeroDaAmostra",
+    "Motivo da Coleta": "Motivo",
+    "Tipo da Forma de Abastecimento": "TipoDaFormaDeAbastecimento",
+    "Código Forma de Abastecimento": "CodigoFormaDeAbastecimento",
+    "Nome da Forma de Abastecimento": "NomeDaFormaDeAbastecimento",
+    "Nome da ETA/UTA": "NomeETA_UTA",
+    "Data da Coleta": "DataColeta",
+    "Hora da coleta": "Hora",
+    "Data do Laudo": "DataDoLaudo",
+    "Data de Registro no SISAGUA": "DataDeRegistroNoSISAGUA",
+    "Procedência da Coleta": "Procedencia",
+    "Ponto de Coleta": "PontoDeColeta",
+    "Descrição do Local": "DescricaoDoLocal",
+    "Zona": "Zona",
+    "Categoria Área": "CategoriaArea",
+    "Área": "Area",
+    "Tipo do Local": "TipoDoLocal",
+    "Local": "NomeLocal",
+    "Latitude": "Latitude",
+    "Longitude": "Longitude",
+    "Grupo": "Grupo",
+    "Parâmetro (ciano)": "Parametro_ciano_",
+    "Resultado": "Resultado",
+}
+
+
+def coordenada(coluna, limite):
+    # vírgula decimal vira ponto; vazia, inválida ou fora da faixa vira NULL, como em normalizar.py
+    valor = f"REPLACE(NULLIF(TRIM({coluna}), ''), ',', '.')"
+    return f"IF({valor} REGEXP '^-?[0-9]+(\\\\.[0-9]+)?$' AND ABS({valor}) <= {limite}, {valor}, NULL)"
+
+
+# preenchimento das tabelas a partir da staging, na ordem de dependência
+INSERTS = {
+    "Estado": f"""
+        INSERT IGNORE INTO Estado (UF, Regiao)
+        SELECT DISTINCT UF, Regiao
+        FROM {TABELA_STAGING}
+        WHERE UF <> ''
+    """,
+    "Municipio": f"""
+        INSERT IGNORE INTO Municipio (CodigoDoIBGE, RegionalDeSaude, NomeMunicipio, fk_Estado_UF)
+        SELECT DISTINCT CodigoDoIBGE, RegionalDeSaude, NomeMunicipio, UF
+        FROM {TABELA_STAGING}
+        WHERE CodigoDoIBGE <> ''
+    """,
+    "Abastecimento": f"""
+        INSERT IGNORE INTO Abastecimento (CodigoFormaDeAbastecimento, TipoDaFormaDeAbastecimento, NomeETA_UTA, NomeDaFormaDeAbastecimento)
+        SELECT DISTINCT CodigoFormaDeAbastecimento, TipoDaFormaDeAbastecimento, NomeETA_UTA, NomeDaFormaDeAbastecimento
+        FROM {TABELA_STAGING}
+        WHERE CodigoFormaDeAbastecimento <> ''
+    """,
+    "Abastecido": f"""
+        INSERT IGNORE INTO Abastecido (fk_Municipio_CodigoDoIBGE, fk_Abastecimento_CodigoFormaDeAbastecimento)
+        SELECT DISTINCT CodigoDoIBGE, CodigoFormaDeAbastecimento
+        FROM {TABELA_STAGING}
+        WHERE CodigoDoIBGE <> '' AND CodigoFormaDeAbastecimento <> ''
+    """,
+    "Coleta_Amostra_LocalColeta": f"""
+        INSERT IGNORE INTO Coleta_Amostra_LocalColeta
+        (NumeroDaAmostra, DataDeRegistroNoSISAGUA, DataColeta, DescricaoDoLocal, Zona, CategoriaArea, Area, TipoDoLocal, NomeLocal, Latitude, Longitude, fk_Municipio_CodigoDoIBGE, Procedencia, PontoDeColeta, Motivo, Hora)
+        SELECT DISTINCT
+            NumeroDaAmostra, NULLIF(DataDeRegistroNoSISAGUA, ''), NULLIF(DataColeta, ''), DescricaoDoLocal, Zona, CategoriaArea, Area, TipoDoLocal, NomeLocal,
+            {coordenada("Latitude", 90)}, {coordenada("Longitude", 180)}, CodigoDoIBGE, Procedencia, PontoDeColeta, Motivo, NULLIF(Hora, '')
+        FROM {TABELA_STAGING}
+    """,
+    # o ponto é calculado pelo MySQL (coluna gerada) a partir das coordenadas já convertidas
+    "Coleta_Geo": """
+        INSERT IGNORE INTO Coleta_Geo (fk_Amostra_DataColeta, fk_Amostra_Hora, fk_Amostra_NumeroDaAmostra, Latitude, Longitude)
+        SELECT DataColeta, Hora, NumeroDaAmostra, Latitude, Longitude
+        FROM Coleta_Amostra_LocalColeta
+        WHERE Latitude IS NOT NULL AND Longitude IS NOT NULL
+    """,
+    "Classificacao": f"""
+        INSERT IGNORE INTO Classificacao (Grupo, Parametro_Ciano_)
+        SELECT DISTINCT Grupo, Parametro_ciano_
+        FROM {TABELA_STAGING}
+        WHERE Parametro_ciano_ <> ''
+    """,
+    "Analise": f"""
+        INSERT IGNORE INTO Analise (fk_Amostra_DataColeta, fk_Amostra_Hora, fk_Amostra_NumeroDaAmostra, fk_Classificacao_Parametro_ciano_, Resultado, DataDoLaudo)
+        SELECT DISTINCT
+            NULLIF(DataColeta, ''), NULLIF(Hora, ''), NumeroDaAmostra, Parametro_ciano_, REPLACE(NULLIF(Resultado, ''), ',', '.'), NULLIF(DataDoLaudo, '')
+        FROM {TABELA_STAGING}
+    """,
+}
+
+
+def ler_cabecalho(caminho):
+    """Lê o cabeçalho do CSV e descobre o terminador de linha usado no arquivo."""
+    with open(caminho, "rb") as arquivo:
+        primeira_linha = arquivo.readline()
+    terminador = "\r\n" if primeira_linha.endswith(b"\r\n") else "\n"
+
+    with open(caminho, encoding="utf-8-sig", newline="") as arquivo:
+        cabecalho = next(csv.reader(arquivo))
+
+    return cabecalho, terminador
+
+
+def montar_load_data(cabecalho, terminador):
+    # colunas do CSV que não existem no esquema (Ano, Mês, ...) são descartadas em @ignorar
+    colunas = ", ".join(COLUNAS_STAGING.get(coluna.strip(), "@ignorar") for coluna in cabecalho)
+    terminador_sql = terminador.replace("\r", "\\r").replace("\n", "\\n")
+
+    return f"""
+        LOAD DATA LOCAL INFILE %s
+        INTO TABLE {TABELA_STAGING}
+        CHARACTER SET utf8mb4
+        FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+        LINES TERMINATED BY '{terminador_sql}'
+        IGNORE 1 LINES
+        ({colunas})
+    """
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga do CSV original do SISAGUA via LOAD DATA e tabela de staging.")
+    parser.add_argument("arquivo", nargs="?", default=ARQUIVO_PADRAO, help="CSV de origem (padrão: %(default)s)")
+    parser.add_argument("--manter-staging", action="store_true", help="não apaga a tabela de staging ao final")
+    args = parser.parse_args()
+
+    caminho = path.abspath(args.arquivo)
+    cabecalho, terminador = ler_cabecalho(caminho)
+
+    # conexão com database
+    conn = mysql.connector.connect(
+        host=getenv("db_host"),
+        user=getenv("db_user"),
+        password=getenv("db_password"),
+        database=getenv("db_name"),
+        allow_local_infile=True
+    )
+    cursor = conn.cursor()
+
+    colunas = ",\n".join(f"    {coluna} VARCHAR(255)" for coluna in COLUNAS_STAGING.values())
+    cursor.execute(f"DROP TABLE IF EXISTS {TABELA_STAGING}")
+    cursor.execute(f"CREATE TABLE {TABELA_STAGING} (\n{colunas}\n)")
+
+    print(f"Carregando {caminho} em {TABELA_STAGING}...")
+    cursor.execute(montar_load_data(cabecalho, terminador), (caminho,))
+    print(f"{cursor.rowcount} linhas na staging")
+
+    for tabela, query in INSERTS.items():
+        cursor.execute(query)
+        print(f"{tabela}: {cursor.rowcount} linhas inseridas")
+
+    conn.commit()
+
+    # a staging não anota grupos: os resumos, se existirem, são refeitos inteiros
+    if resumos_existem(cursor):
+        refazer(conn)
+        print("Tabelas de resumo refeitas")
+    else:
+        print(AVISO_SEM_RESUMOS)
+
+    if not args.manter_staging:
+        cursor.execute(f"DROP TABLE {TABELA_STAGING}")
+
+    cursor.close()
+    conn.close()
+
+    print("Inserção concluída!\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+from datetime import datetime
+from os import path, replace
+import json
+
+# Manifesto da exportação (data/db_export/manifesto.json): para cada tabela, as colunas, a
+# quantidade de linhas, a maior chave primária e um checksum do conteúdo, todos calculados no
+# servidor. Na exportação seguinte, as tabelas que não mudaram são puladas e, em Coleta e Análise,
+# quando a mudança foi só a chegada de linhas novas, só essas linhas são acrescentadas.
+
+ARQUIVO = "manifesto.json"
+
+# chave primária de cada tabela, na ordem do índice (a maior chave é lida pelo próprio índice)
+CHAVES = {
+    "Estado": ["UF"],
+    "Municipio": ["CodigoDoIBGE"],
+    "Abastecimento": ["CodigoFormaDeAbastecimento"],
+    "Abastecido": ["fk_Municipio_CodigoDoIBGE", "fk_Abastecimento_CodigoFormaDeAbastecimento"],
+    "Coleta_Amostra_LocalColeta": ["DataColeta", "Hora", "NumeroDaAmostra"],
+    "Classificacao": ["Parametro_ciano_"],
+    "Analise": ["DataDoLaudo", "fk_Amostra_NumeroDaAmostra", "fk_Classificacao_Parametro_ciano_"],
+    "Resumo_Coleta_Municipio": ["fk_Municipio_CodigoDoIBGE", "Ano", "TipoDoLocal"],
+    "Resumo_Coleta_UF_Ano": ["fk_Estado_UF", "Ano"],
+    "Resumo_Analise_Municipio_Parametro": ["fk_Municipio_CodigoDoIBGE", "fk_Classificacao_Parametro_ciano_", "Ano"],
+}
+
+# tabelas em que uma nova versão dos dados normalmente só acrescenta linhas no fim da chave
+TABELAS_SO_ACRESCIMO = ["Coleta_Amostra_LocalColeta", "Analise"]
+
+PULAR, ACRESCENTAR, COMPLETA = "pular", "acrescentar", "completa"
+
+
+def ler_manifesto(pasta):
+    caminho = path.join(pasta, ARQUIVO)
+    if not path.exists(caminho):
+        return {"tabelas": {}}
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def gravar_manifesto(pasta, manifesto):
+    manifesto["gerado_em"] = datetime.now().isoformat(timespec="seconds")
+    caminho = path.join(pasta, ARQUIVO)
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(manifesto, arquivo, indent=2, ensure_ascii=False)
+    replace(temporario, caminho)
+
+
+def filtro_chave(tabela, operador, chave):
+    """Comparação de tupla com a chave primária, ex.: (DataColeta, Hora, NumeroDaAmostra) > (%s, %s, %s)."""
+    colunas = ", ".join(CHAVES[tabela])
+    return f"({colunas}) {operador} ({', '.join(['%s'] * len(chave))})", tuple(chave)
+
+
+def resumir(cursor, tabela, colunas, ate=None):
+    """Retorna (linhas, checksum) da tabela, ou só das linhas com chave <= ate.
+
+    O checksum é o BIT_XOR dos CRC32 de cada linha: não depende da ordem e é calculado
+    inteiro no servidor, sem trazer as linhas para o cliente.
+    """
+    linha = "CONCAT_WS(CHAR(9), " + ", ".join(f"IFNULL({coluna}, 'NULL')" for coluna in colunas) + ")"
+    filtro, parametros = "", ()
+    if ate is not None:
+        filtro, parametros = filtro_chave(tabela, "<=", ate)
+        filtro = "WHERE " + filtro
+    cursor.execute(f"SELECT COUNT(*), BIT_XOR(CRC32({linha})) FROM {tabela} {filtro}", parametros)
+    linhas, checksum = cursor.fetchone()
+    return int(linhas), int(checksum or 0)
+
+
+def levantar_estado(cursor, tabela, formatar):
+    """Colunas (e seus tipos), linhas, checksum e maior chave atuais da tabela."""
+    cursor.execute("""
+        SELECT COLUMN_NAME, DATA_TYPE FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY ORDINAL_POSITION
+    """, (tabela,))
+    colunas, tipos = [], []
+    for coluna, tipo in cursor.fetchall():
+        colunas.append(coluna)
+        tipos.append(tipo.decode() if isinstance(tipo, (bytes, bytearray)) else tipo)
+    linhas, checksum = resumir(cursor, tabela, colunas)
+
+    chave = CHAVES[tabela]
+    cursor.execute(f"SELECT {', '.join(chave)} FROM {tabela} ORDER BY {', '.join(c + ' DESC' for c in chave)} LIMIT 1")
+    maior = cursor.fetchone()
+    return {
+        "colunas": colunas,
+        "tipos": tipos,
+        "linhas": linhas,
+        "checksum": checksum,
+        "chave_maxima": None if maior is None else [formatar(valor) for valor in maior],
+    }
+
+
+def comparar(cursor, tabela, atual, anterior):
+    """Decide como a tabela precisa ser exportada em relação ao manifesto anterior."""
+    if not anterior or (anterior["colunas"], anterior.get("tipos")) != (atual["colunas"], atual["tipos"]):
+        return COMPLETA
+    if (anterior["linhas"], anterior["checksum"]) == (atual["linhas"], atual["checksum"]):
+        return PULAR
+    # só linhas novas: tudo até a maior chave anterior continua exatamente igual
+    if tabela in TABELAS_SO_ACRESCIMO and anterior["chave_maxima"] is not None:
+        if resumir(cursor, tabela, atual["colunas"], anterior["chave_maxima"]) == (anterior["linhas"], anterior["checksum"]):
+            return ACRESCENTAR
+    return COMPLETA
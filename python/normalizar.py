@@ -0,0 +1,118 @@
+from os import path
+import pandas as pd
+
+# Etapa de normalização da carga: as datas, horas, decimais e coordenadas do CSV original são
+# convertidas de uma vez para cada bloco de linhas (com pandas), em vez de o MySQL converter as
+# strings linha a linha ou gravar datas zeradas. Linhas que não podem entrar no banco vão para
+# um arquivo de quarentena, junto com o motivo.
+
+FORMATOS_DATA = ["%Y-%m-%d", "%d/%m/%Y", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y %H:%M:%S"]
+FORMATOS_DATA_HORA = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M:%S.%f", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%Y-%m-%d", "%d/%m/%Y"]
+FORMATOS_HORA = ["%H:%M", "%H:%M:%S"]
+
+# colunas que fazem parte das chaves primárias de Coleta_Amostra_LocalColeta e Analise:
+# vazias ou inválidas, a linha vai para a quarentena
+DATAS_OBRIGATORIAS = ["Data da Coleta", "Data do Laudo"]
+TEXTOS_OBRIGATORIOS = ["Número da amostra", "Parâmetro (ciano)"]
+HORA = "Hora da coleta"
+# inválida, a linha vai para a quarentena; vazia vira NULL
+RESULTADO = "Resultado"
+# inválidas ou fora da faixa viram NULL, sem descartar a amostra
+DATA_REGISTRO = "Data de Registro no SISAGUA"
+COORDENADAS = {"Latitude": 90, "Longitude": 180}
+
+# limite de Analise.Resultado DECIMAL(8,2)
+RESULTADO_MAXIMO = 999999.99
+
+
+def converter_datas(serie, formatos):
+    """Tenta cada formato só nas posições que os anteriores não conseguiram converter."""
+    convertida = pd.Series(pd.NaT, index=serie.index, dtype="datetime64[ns]")
+    for formato in formatos:
+        faltando = convertida.isna() & serie.notna()
+        if not faltando.any():
+            break
+        convertida[faltando] = pd.to_datetime(serie[faltando], format=formato, errors="coerce")
+    return convertida
+
+
+def converter_decimais(serie, separador_milhar=True):
+    """Converte números com vírgula decimal ('1.234,5' ou '-15,79') ou ponto decimal ('0.5')."""
+    com_virgula = serie.str.contains(",", regex=False, na=False)
+    texto = serie.str.replace(".", "", regex=False) if separador_milhar else serie
+    texto = serie.where(~com_virgula, texto.str.replace(",", ".", regex=False))
+    return pd.to_numeric(texto, errors="coerce")
+
+
+def para_python(serie):
+    # NaN/NaT viram None, que o conector envia como NULL
+    return serie.astype(object).where(serie.notna(), None)
+
+
+def normalizar_bloco(linhas):
+    """Normaliza um bloco de linhas do csv.DictReader.
+
+    Retorna (tipadas, rejeitadas): tipadas tem uma entrada por linha de entrada, com as colunas já
+    convertidas para date/datetime/time/float (ou None se a linha foi rejeitada), e rejeitadas é um
+    DataFrame com as linhas originais recusadas e a coluna "Motivo", indexado pela posição no bloco.
+    """
+    # só as colunas convertidas ou obrigatórias passam pelo pandas; as demais seguem como vieram
+    convertidas = TEXTOS_OBRIGATORIOS + DATAS_OBRIGATORIAS + [HORA, DATA_REGISTRO, RESULTADO] + list(COORDENADAS)
+    texto = pd.DataFrame({coluna: [linha.get(coluna) for linha in linhas] for coluna in convertidas}).apply(lambda coluna: coluna.str.strip())
+    vazias = texto.isna() | (texto == "")
+
+    tipadas = {}
+    motivos = pd.Series("", index=texto.index)
+
+    def rejeitar(mascara, motivo):
+        motivos[mascara] = motivos[mascara] + motivo + "; "
+
+    for coluna in TEXTOS_OBRIGATORIOS:
+        rejeitar(vazias[coluna], f"{coluna} vazio")
+
+    for coluna in DATAS_OBRIGATORIAS:
+        datas = converter_datas(texto[coluna].where(~vazias[coluna]), FORMATOS_DATA)
+        rejeitar(datas.isna(), f"{coluna} vazia ou inválida")
+        tipadas[coluna] = para_python(datas.dt.date.where(datas.notna()))
+
+    horas = converter_datas(texto[HORA].where(~vazias[HORA]), FORMATOS_HORA)
+    rejeitar(horas.isna(), f"{HORA} vazia ou inválida")
+    tipadas[HORA] = para_python(horas.dt.time.where(horas.notna()))
+
+    registro = converter_datas(texto[DATA_REGISTRO].where(~vazias[DATA_REGISTRO]), FORMATOS_DATA_HORA)
+    tipadas[DATA_REGISTRO] = para_python(pd.Series(registro.dt.to_pydatetime(), index=registro.index, dtype=object).where(registro.notna()))
+
+    resultado = converter_decimais(texto[RESULTADO].where(~vazias[RESULTADO]))
+    rejeitar(~vazias[RESULTADO] & resultado.isna(), f"{RESULTADO} inválido")
+    rejeitar(resultado.abs() > RESULTADO_MAXIMO, f"{RESULTADO} fora da faixa")
+    tipadas[RESULTADO] = para_python(resultado)
+
+    for coluna, limite in COORDENADAS.items():
+        coordenada = converter_decimais(texto[coluna].where(~vazias[coluna]), separador_milhar=False)
+        tipadas[coluna] = para_python(coordenada.where(coordenada.abs() <= limite))
+
+    rejeitadas_mascara = (motivos != "").tolist()
+    colunas_tipadas = {coluna: serie.tolist() for coluna, serie in tipadas.items()}
+    tipadas_lista = []
+    for indice, (linha, rejeitada) in enumerate(zip(linhas, rejeitadas_mascara)):
+        if rejeitada:
+            tipadas_lista.append(None)
+            continue
+        tipada = dict(linha)
+        for coluna, valores in colunas_tipadas.items():
+            tipada[coluna] = valores[indice]
+        tipadas_lista.append(tipada)
+
+    # o índice é a posição da linha no bloco, usada pela carga delta para retomar a quarentena
+    posicoes_rejeitadas = [indice for indice, rejeitada in enumerate(rejeitadas_mascara) if rejeitada]
+    rejeitadas = pd.DataFrame([linhas[indice] for indice in posicoes_rejeitadas], index=posicoes_rejeitadas)
+    # campos excedentes do DictReader ficam na chave None
+    rejeitadas = rejeitadas.drop(columns=[None], errors="ignore")
+    rejeitadas["Motivo"] = [motivo.rstrip("; ") for motivo in motivos if motivo]
+    return tipadas_lista, rejeitadas
+
+
+def gravar_quarentena(caminho, rejeitadas):
+    if rejeitadas.empty:
+        return
+    rejeitadas.to_csv(caminho, mode="a", header=not path.exists(caminho), index=False, encoding="utf-8")
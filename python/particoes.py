@@ -0,0 +1,173 @@
+from dotenv import load_dotenv
+from os import getenv, makedirs, path
+import argparse
+import mysql.connector
+
+from export_tables import PASTA_PADRAO, TAMANHO_LOTE, criar_pool, exportar_tsv, ler_em_lotes
+from resumos import ResumosPendentes, resumos_existem
+
+load_dotenv()
+
+# Operações por ano nas tabelas particionadas por sql/particoes_squema.sql. Cada ano é uma partição
+# p<ano> de Coleta_Amostra_LocalColeta e de Analise (pelo ano da coleta), então listar, exportar ou
+# apagar um ano mexe só nela, sem varrer o resto do histórico. Para recarregar um ano:
+#   python python/particoes.py remover 2019
+#   python python/load_csv.py --ano 2019 data/original_dataset/tabela.csv
+
+TABELAS_PARTICIONADAS = ["Coleta_Amostra_LocalColeta", "Analise"]
+
+# linhas de um ano que ficam fora das tabelas particionadas: (tabela, coluna da data da coleta)
+DEPENDENTES = [("Coleta_Geo", "fk_Amostra_DataColeta"), ("Carga_Impressao", "DataColeta")]
+
+
+def conectar():
+    return mysql.connector.connect(
+        host=getenv("db_host"),
+        user=getenv("db_user"),
+        password=getenv("db_password"),
+        database=getenv("db_name")
+    )
+
+
+def particao(ano):
+    return f"p{ano}"
+
+
+def listar_particoes(cursor):
+    """Retorna {tabela: [(partição, limite, linhas estimadas)]} na ordem das partições."""
+    cursor.execute(f"""
+        SELECT TABLE_NAME, PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME IN ({", ".join(["%s"] * len(TABELAS_PARTICIONADAS))})
+          AND PARTITION_NAME IS NOT NULL
+        ORDER BY TABLE_NAME, PARTITION_ORDINAL_POSITION
+    """, TABELAS_PARTICIONADAS)
+    particoes = {tabela: [] for tabela in TABELAS_PARTICIONADAS}
+    for tabela, nome, limite, linhas in cursor.fetchall():
+        particoes[tabela].append((nome, limite, linhas))
+    return particoes
+
+
+def conferir_ano(cursor, ano):
+    """Encerra com erro se alguma tabela não estiver particionada ou não tiver a partição do ano."""
+    for tabela, particoes in listar_particoes(cursor).items():
+        if not particoes:
+            raise SystemExit(f"{tabela} não está particionada; aplique sql/particoes_squema.sql")
+        if particao(ano) not in (nome for nome, _, _ in particoes):
+            raise SystemExit(f"{tabela} não tem a partição {particao(ano)}; crie com: particoes.py criar {ano}")
+
+
+def tabela_existe(cursor, tabela):
+    cursor.execute("SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (tabela,))
+    return cursor.fetchone()[0] > 0
+
+
+def criar(cursor, ano):
+    """Separa o ano de p_futuro numa partição própria (só para anos depois da última partição).
+
+    Os anos entre a última partição e o pedido ganham as suas partições junto, senão a partição
+    do ano pedido também guardaria os anos anteriores a ele.
+    """
+    for tabela, particoes in listar_particoes(cursor).items():
+        if not particoes:
+            raise SystemExit(f"{tabela} não está particionada; aplique sql/particoes_squema.sql")
+        if particao(ano) in (nome for nome, _, _ in particoes):
+            print(f"{tabela}: {particao(ano)} já existe")
+            continue
+        ultimo_limite = max(int(limite) for _, limite, _ in particoes if limite != "MAXVALUE")
+        if ano < ultimo_limite:
+            raise SystemExit(f"{tabela}: {ano} está antes da última partição, não pode sair de p_futuro")
+        anos = range(ultimo_limite, ano + 1)
+        novas = [f"PARTITION {particao(a)} VALUES LESS THAN ({a + 1})" for a in anos]
+        cursor.execute(f"""
+            ALTER TABLE {tabela} REORGANIZE PARTITION p_futuro INTO (
+                {", ".join(novas)},
+                PARTITION p_futuro VALUES LESS THAN MAXVALUE
+            )
+        """)
+        print(f"{tabela}: {', '.join(particao(a) for a in anos)} criada(s)")
+
+
+def remover(conn, cursor, ano):
+    """Apaga um ano inteiro: esvazia as partições e as linhas dependentes do mesmo ano."""
+    conferir_ano(cursor, ano)
+    # grupos das tabelas de resumo que o ano alimenta, recalculados depois de apagá-lo
+    resumos = None
+    if resumos_existem(cursor):
+        resumos = ResumosPendentes()
+        cursor.execute(f"""
+            SELECT DISTINCT ca.fk_Municipio_CodigoDoIBGE, a.fk_Classificacao_Parametro_ciano_, IFNULL(YEAR(a.DataDoLaudo), 0)
+            FROM Coleta_Amostra_LocalColeta PARTITION ({particao(ano)}) ca
+            LEFT JOIN Analise PARTITION ({particao(ano)}) a
+              ON a.fk_Amostra_DataColeta = ca.DataColeta AND a.fk_Amostra_Hora = ca.Hora
+             AND a.fk_Amostra_NumeroDaAmostra = ca.NumeroDaAmostra
+            WHERE ca.fk_Municipio_CodigoDoIBGE IS NOT NULL
+        """)
+        for municipio, parametro, ano_laudo in cursor.fetchall():
+            resumos.coletas.add((municipio, ano))
+            if parametro is not None:
+                resumos.analises.add((municipio, parametro, ano_laudo))
+    # as dependentes saem primeiro, numa transação própria: o TRUNCATE PARTITION é DDL e faz
+    # commit implícito, então nada pode ficar pendente antes dele. Se ele falhar, basta repetir
+    for tabela, coluna in DEPENDENTES:
+        if not tabela_existe(cursor, tabela):
+            continue
+        cursor.execute(f"DELETE FROM {tabela} WHERE {coluna} >= %s AND {coluna} < %s", (f"{ano}-01-01", f"{ano + 1}-01-01"))
+        print(f"{tabela}: {cursor.rowcount} linhas de {ano} apagadas")
+    conn.commit()
+    for tabela in TABELAS_PARTICIONADAS:
+        # TRUNCATE PARTITION descarta a partição de uma vez, sem apagar linha a linha
+        cursor.execute(f"ALTER TABLE {tabela} TRUNCATE PARTITION {particao(ano)}")
+        print(f"{tabela}: {particao(ano)} esvaziada")
+    if resumos is not None:
+        resumos.atualizar(conn)
+        print("Tabelas de resumo atualizadas")
+
+
+def exportar(cursor, ano, pasta, tamanho_lote):
+    """Exporta as partições do ano para <pasta>/anos/<ano>/<tabela>.csv, no formato de export_tables.py."""
+    conferir_ano(cursor, ano)
+    destino = path.join(pasta, "anos", str(ano))
+    makedirs(destino, exist_ok=True)
+    pool = criar_pool(1)
+    for tabela in TABELAS_PARTICIONADAS:
+        lotes = ler_em_lotes(pool, f"SELECT * FROM {tabela} PARTITION ({particao(ano)})", (), tamanho_lote)
+        linhas = exportar_tsv(tabela, lotes, destino)
+        print(f"{tabela}: {linhas} linhas de {ano} em {path.join(destino, tabela + '.csv')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lista, cria, exporta e apaga os anos das tabelas particionadas.")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    comandos.add_parser("listar", help="partições de cada tabela com as linhas estimadas")
+    for nome, ajuda in [("criar", "cria a partição de um ano novo"),
+                        ("exportar", "exporta um ano para <pasta>/anos/<ano>"),
+                        ("remover", "apaga todas as coletas e análises de um ano")]:
+        comando = comandos.add_parser(nome, help=ajuda)
+        comando.add_argument("ano", type=int)
+        if nome == "exportar":
+            comando.add_argument("--pasta", default=getenv("db_export_path_file") or PASTA_PADRAO,
+                                 help="pasta de exportação (padrão: db_export_path_file do .env ou data/db_export)")
+            comando.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="linhas lidas do servidor por vez (padrão: %(default)s)")
+    args = parser.parse_args()
+
+    conn = conectar()
+    cursor = conn.cursor()
+    if args.comando == "listar":
+        for tabela, particoes in listar_particoes(cursor).items():
+            print(tabela)
+            for nome, limite, linhas in particoes:
+                print(f"    {nome:<10} < {limite:<9} ~{linhas} linhas")
+    elif args.comando == "criar":
+        criar(cursor, args.ano)
+    elif args.comando == "remover":
+        remover(conn, cursor, args.ano)
+    else:
+        exportar(cursor, args.ano, args.pasta, max(1, args.lote))
+    cursor.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
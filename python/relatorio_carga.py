@@ -0,0 +1,114 @@
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import time
+
+# Contadores e tempos da carga: linhas lidas, enviadas, inseridas e ignoradas pelo INSERT IGNORE
+# por tabela, tempo gasto lendo/normalizando o CSV e conversando com o banco, e a vazão ao longo
+# da carga. Mostrados periodicamente no terminal e gravados em JSON ao final.
+
+
+def contagem_vazia():
+    return {"enviadas": 0, "afetadas": 0, "descartadas_em_memoria": 0}
+
+
+class RelatorioCarga:
+    def __init__(self, arquivo, modo, tabelas_insert_ignore, intervalo_progresso=10):
+        self.arquivo = arquivo
+        self.modo = modo
+        self.tabelas_insert_ignore = set(tabelas_insert_ignore)
+        self.intervalo_progresso = intervalo_progresso
+        self.iniciado_em = datetime.now()
+        self.inicio = time.perf_counter()
+        self.linhas_lidas = 0
+        self.linhas_rejeitadas = 0
+        self.tabelas = {}
+        self.fontes = {}
+        self.tempos = {"leitura": 0.0, "normalizacao": 0.0, "banco": 0.0}
+        self.vazao = []
+        self.ultimo_progresso = (self.inicio, 0)
+
+    def tabela(self, nome):
+        if nome not in self.tabelas:
+            self.tabelas[nome] = contagem_vazia()
+        return self.tabelas[nome]
+
+    @contextmanager
+    def medir(self, etapa):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tempos[etapa] += time.perf_counter() - inicio
+
+    def registrar_envio(self, tabela, enviadas, afetadas):
+        contagem = self.tabela(tabela)
+        contagem["enviadas"] += enviadas
+        contagem["afetadas"] += max(afetadas, 0)
+
+    def registrar_descarte(self, tabela, quantidade=1):
+        self.tabela(tabela)["descartadas_em_memoria"] += quantidade
+
+    def juntar(self, tabelas, segundos_banco):
+        """Soma os contadores vindos de outro processo (modo paralelo)."""
+        for nome, contagem in tabelas.items():
+            for campo, valor in contagem.items():
+                self.tabela(nome)[campo] += valor
+        self.tempos["banco"] += segundos_banco
+
+    def linhas(self, lidas, rejeitadas=0, fonte=None):
+        self.linhas_lidas += lidas
+        self.linhas_rejeitadas += rejeitadas
+        if fonte is not None:
+            contagem = self.fontes.setdefault(fonte, {"linhas_lidas": 0, "linhas_rejeitadas": 0})
+            contagem["linhas_lidas"] += lidas
+            contagem["linhas_rejeitadas"] += rejeitadas
+
+        agora = time.perf_counter()
+        momento, linhas_antes = self.ultimo_progresso
+        if agora - momento >= self.intervalo_progresso:
+            decorrido = agora - self.inicio
+            instantanea = (self.linhas_lidas - linhas_antes) / (agora - momento)
+            media = self.linhas_lidas / decorrido
+            self.vazao.append({"segundos": round(decorrido, 1), "linhas": self.linhas_lidas, "linhas_por_segundo": round(instantanea, 1)})
+            print(f"[{decorrido:8.1f}s] {self.linhas_lidas} linhas lidas, {instantanea:,.0f} linhas/s (média {media:,.0f} linhas/s)")
+            self.ultimo_progresso = (agora, self.linhas_lidas)
+
+    def resumo(self):
+        duracao = time.perf_counter() - self.inicio
+        tabelas = {}
+        for nome, contagem in self.tabelas.items():
+            tabelas[nome] = dict(contagem)
+            # nas tabelas com INSERT IGNORE, o que foi enviado e não inserido foi ignorado como duplicado
+            if nome not in self.tabelas_insert_ignore:
+                continue
+            tabelas[nome]["inseridas"] = contagem["afetadas"]
+            tabelas[nome]["ignoradas"] = contagem["enviadas"] - contagem["afetadas"]
+
+        return {
+            "arquivo": self.arquivo,
+            "modo": self.modo,
+            "iniciado_em": self.iniciado_em.isoformat(timespec="seconds"),
+            "duracao_segundos": round(duracao, 2),
+            "linhas_lidas": self.linhas_lidas,
+            "linhas_rejeitadas": self.linhas_rejeitadas,
+            "linhas_por_segundo": round(self.linhas_lidas / duracao, 1) if duracao else None,
+            "tempos_segundos": {etapa: round(segundos, 2) for etapa, segundos in self.tempos.items()},
+            "arquivos": self.fontes,
+            "tabelas": tabelas,
+            "vazao": self.vazao,
+        }
+
+    def gravar(self, caminho):
+        resumo = self.resumo()
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(resumo, arquivo, indent=2, ensure_ascii=False)
+
+        print(f"\n{'tabela':<28} {'enviadas':>10} {'inseridas':>10} {'ignoradas':>10} {'em memória':>11}")
+        for nome, contagem in resumo["tabelas"].items():
+            print(f"{nome:<28} {contagem['enviadas']:>10} {contagem.get('inseridas', contagem['afetadas']):>10} "
+                  f"{contagem.get('ignoradas', '-'):>10} {contagem['descartadas_em_memoria']:>11}")
+        tempos = resumo["tempos_segundos"]
+        print(f"{resumo['linhas_lidas']} linhas em {resumo['duracao_segundos']}s ({resumo['linhas_por_segundo']} linhas/s): "
+              f"leitura {tempos['leitura']}s, normalização {tempos['normalizacao']}s, banco {tempos['banco']}s")
+        print(f"Relatório gravado em {caminho}")
@@ -0,0 +1,214 @@
+from dotenv import load_dotenv
+from os import getenv
+import argparse
+import mysql.connector
+
+load_dotenv()
+
+# Tabelas de resumo (sql/resumos_squema.sql) com os agregados das abas "Visão Geral" e "Em Detalhes"
+# do app. A carga anota os grupos tocados (município e ano da coleta; município, parâmetro e ano do
+# laudo) e, ao final, só esses grupos são recalculados a partir das tabelas do esquema. O resumo por
+# UF é somado a partir do resumo por município, que já está atualizado nesse ponto.
+# Rodado sozinho, este script refaz os resumos inteiros.
+
+RESUMOS = ["Resumo_Coleta_Municipio", "Resumo_Coleta_UF_Ano", "Resumo_Analise_Municipio_Parametro"]
+
+# os grupos anotados por uma carga sem as tabelas de resumo se perdem; resumos.py refaz tudo depois
+AVISO_SEM_RESUMOS = ("As tabelas de resumo não existem e não foram atualizadas. Aplique sql/resumos_squema.sql "
+                     "e rode python python/resumos.py para calculá-las (o app também funciona sem elas, mais devagar)")
+
+# grupos pendentes, numa tabela temporária da conexão: (nome, colunas)
+PENDENTES = {
+    "coletas": ("Resumo_Pendente_Coleta", "Municipio VARCHAR(255), Ano SMALLINT, PRIMARY KEY (Municipio, Ano)"),
+    "analises": ("Resumo_Pendente_Analise", "Municipio VARCHAR(255), Parametro VARCHAR(255), Ano SMALLINT, PRIMARY KEY (Municipio, Parametro, Ano)"),
+}
+
+# com pendentes, o SELECT parte da tabela temporária e lê só as linhas dos grupos tocados
+# (pelos índices de município + data); sem, agrega a tabela inteira
+COLETA_MUNICIPIO = """
+    INSERT INTO Resumo_Coleta_Municipio (fk_Municipio_CodigoDoIBGE, Ano, TipoDoLocal, TotalAmostras, PrimeiraColeta, UltimaColeta)
+    SELECT ca.fk_Municipio_CodigoDoIBGE, YEAR(ca.DataColeta), IFNULL(ca.TipoDoLocal, ''), COUNT(*), MIN(ca.DataColeta), MAX(ca.DataColeta)
+    FROM {origem}
+    WHERE ca.fk_Municipio_CodigoDoIBGE IS NOT NULL
+    GROUP BY ca.fk_Municipio_CodigoDoIBGE, YEAR(ca.DataColeta), IFNULL(ca.TipoDoLocal, '')
+"""
+ORIGEM_COLETA = {
+    False: "Coleta_Amostra_LocalColeta ca",
+    True: """Resumo_Pendente_Coleta p
+        JOIN Coleta_Amostra_LocalColeta ca
+          ON ca.fk_Municipio_CodigoDoIBGE = p.Municipio
+         AND ca.DataColeta >= MAKEDATE(p.Ano, 1) AND ca.DataColeta < MAKEDATE(p.Ano + 1, 1)""",
+}
+
+COLETA_UF = """
+    INSERT INTO Resumo_Coleta_UF_Ano (fk_Estado_UF, Regiao, Ano, TotalAmostras, PrimeiraColeta, UltimaColeta)
+    SELECT e.UF, e.Regiao, r.Ano, SUM(r.TotalAmostras), MIN(r.PrimeiraColeta), MAX(r.UltimaColeta)
+    FROM Resumo_Coleta_Municipio r
+    JOIN Municipio m ON r.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+    JOIN Estado e ON m.fk_Estado_UF = e.UF
+    {filtro}
+    GROUP BY e.UF, e.Regiao, r.Ano
+"""
+# UFs e anos que contêm algum município pendente
+UFS_PENDENTES = """
+    SELECT DISTINCT m.fk_Estado_UF, p.Ano
+    FROM Resumo_Pendente_Coleta p
+    JOIN Municipio m ON m.CodigoDoIBGE = p.Municipio
+"""
+
+ANALISE = """
+    INSERT INTO Resumo_Analise_Municipio_Parametro
+    (fk_Municipio_CodigoDoIBGE, fk_Classificacao_Parametro_ciano_, Ano, Quantidade, Minimo, Maximo, Soma)
+    SELECT ca.fk_Municipio_CodigoDoIBGE, a.fk_Classificacao_Parametro_ciano_, IFNULL(YEAR(a.DataDoLaudo), 0),
+           COUNT(a.Resultado), MIN(a.Resultado), MAX(a.Resultado), SUM(a.Resultado)
+    FROM {origem}
+    WHERE ca.fk_Municipio_CodigoDoIBGE IS NOT NULL
+    GROUP BY ca.fk_Municipio_CodigoDoIBGE, a.fk_Classificacao_Parametro_ciano_, IFNULL(YEAR(a.DataDoLaudo), 0)
+"""
+JUNCAO_ANALISE = """
+        JOIN Analise a
+          ON a.fk_Amostra_DataColeta = ca.DataColeta
+         AND a.fk_Amostra_Hora = ca.Hora
+         AND a.fk_Amostra_NumeroDaAmostra = ca.NumeroDaAmostra"""
+ORIGEM_ANALISE = {
+    False: "Coleta_Amostra_LocalColeta ca" + JUNCAO_ANALISE,
+    True: """Resumo_Pendente_Analise p
+        JOIN Coleta_Amostra_LocalColeta ca ON ca.fk_Municipio_CodigoDoIBGE = p.Municipio""" + JUNCAO_ANALISE + """
+         AND a.fk_Classificacao_Parametro_ciano_ = p.Parametro
+         AND IFNULL(YEAR(a.DataDoLaudo), 0) = p.Ano""",
+}
+
+# grupos que a carga delta vai apagar ou alterar, lidos antes da mudança (Chave IN (...) é completado na hora)
+GRUPOS_REMOVIDOS = """
+    SELECT ca.fk_Municipio_CodigoDoIBGE, ca.DataColeta, a.fk_Classificacao_Parametro_ciano_, a.DataDoLaudo
+    FROM Carga_Impressao ci
+    JOIN Coleta_Amostra_LocalColeta ca
+      ON ca.NumeroDaAmostra = ci.NumeroDaAmostra AND ca.DataColeta = ci.DataColeta AND ca.Hora = ci.Hora
+    LEFT JOIN Analise a
+      ON a.fk_Amostra_NumeroDaAmostra = ci.NumeroDaAmostra AND a.fk_Amostra_DataColeta = ci.DataColeta
+     AND a.fk_Amostra_Hora = ci.Hora AND a.fk_Classificacao_Parametro_ciano_ = ci.Parametro_ciano_
+    WHERE ci.Chave IN ({marcadores})
+"""
+
+
+def ano_laudo(data):
+    # análises sem data do laudo ficam no ano 0 do resumo
+    return data.year if data else 0
+
+
+def resumos_existem(cursor):
+    cursor.execute(f"""
+        SELECT COUNT(*) FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({", ".join(["%s"] * len(RESUMOS))})
+    """, RESUMOS)
+    return cursor.fetchone()[0] == len(RESUMOS)
+
+
+def refazer(conn):
+    """Recalcula os resumos inteiros, a partir das tabelas do esquema."""
+    cursor = conn.cursor()
+    for tabela in RESUMOS:
+        cursor.execute(f"DELETE FROM {tabela}")
+    cursor.execute(COLETA_MUNICIPIO.format(origem=ORIGEM_COLETA[False]))
+    cursor.execute(COLETA_UF.format(filtro=""))
+    cursor.execute(ANALISE.format(origem=ORIGEM_ANALISE[False]))
+    conn.commit()
+    cursor.close()
+
+
+class ResumosPendentes:
+    """Grupos dos resumos tocados pela carga, recalculados em atualizar()."""
+
+    def __init__(self, anteriores=None):
+        anteriores = anteriores or {}
+        self.coletas = {tuple(grupo) for grupo in anteriores.get("coletas", [])}
+        self.analises = {tuple(grupo) for grupo in anteriores.get("analises", [])}
+
+    def registrar(self, valores):
+        """valores é o dicionário de extrair_valores (com a coleta como inserção ou atualização)."""
+        coleta = valores.get("Coleta_Amostra_LocalColeta") or valores["Coleta_atualizar"]
+        municipio, ano = coleta[11], coleta[2].year
+        if not municipio:
+            return
+        self.coletas.add((municipio, ano))
+        parametro, data_laudo = valores["Analise"][3], valores["Analise"][5]
+        self.analises.add((municipio, parametro, ano_laudo(data_laudo)))
+
+    def registrar_remocoes(self, cursor, chaves):
+        """Anota os grupos das linhas de Carga_Impressao com essas chaves, antes de a carga delta apagá-las ou atualizá-las."""
+        cursor.execute(GRUPOS_REMOVIDOS.format(marcadores=", ".join(["%s"] * len(chaves))), chaves)
+        for municipio, data_coleta, parametro, data_laudo in cursor.fetchall():
+            if not municipio:
+                continue
+            self.coletas.add((municipio, data_coleta.year))
+            if parametro is not None:
+                self.analises.add((municipio, parametro, ano_laudo(data_laudo)))
+
+    def para_json(self):
+        return {"coletas": sorted(self.coletas), "analises": sorted(self.analises)}
+
+    def atualizar(self, conn):
+        """Recalcula só os grupos pendentes; retorna False se o banco não tem as tabelas de resumo."""
+        cursor = conn.cursor()
+        if not resumos_existem(cursor):
+            cursor.close()
+            return False
+        cursor.execute("SELECT COUNT(*) FROM Resumo_Coleta_Municipio")
+        if cursor.fetchone()[0] == 0:
+            # primeira carga: agregar tudo de uma vez sai mais barato que grupo a grupo
+            cursor.close()
+            refazer(conn)
+            self.coletas.clear()
+            self.analises.clear()
+            return True
+
+        for chave, grupos in (("coletas", self.coletas), ("analises", self.analises)):
+            tabela, colunas = PENDENTES[chave]
+            cursor.execute(f"CREATE TEMPORARY TABLE IF NOT EXISTS {tabela} ({colunas})")
+            cursor.execute(f"DELETE FROM {tabela}")
+            if grupos:
+                marcadores = ", ".join(["%s"] * len(next(iter(grupos))))
+                cursor.executemany(f"INSERT IGNORE INTO {tabela} VALUES ({marcadores})", sorted(grupos))
+
+        cursor.execute("""
+            DELETE r FROM Resumo_Coleta_Municipio r
+            JOIN Resumo_Pendente_Coleta p ON r.fk_Municipio_CodigoDoIBGE = p.Municipio AND r.Ano = p.Ano
+        """)
+        cursor.execute(COLETA_MUNICIPIO.format(origem=ORIGEM_COLETA[True]))
+        cursor.execute(f"""
+            DELETE u FROM Resumo_Coleta_UF_Ano u
+            JOIN ({UFS_PENDENTES}) x ON u.fk_Estado_UF = x.fk_Estado_UF AND u.Ano = x.Ano
+        """)
+        cursor.execute(COLETA_UF.format(filtro=f"WHERE (e.UF, r.Ano) IN ({UFS_PENDENTES})"))
+        cursor.execute("""
+            DELETE r FROM Resumo_Analise_Municipio_Parametro r
+            JOIN Resumo_Pendente_Analise p
+              ON r.fk_Municipio_CodigoDoIBGE = p.Municipio AND r.fk_Classificacao_Parametro_ciano_ = p.Parametro AND r.Ano = p.Ano
+        """)
+        cursor.execute(ANALISE.format(origem=ORIGEM_ANALISE[True]))
+        conn.commit()
+        cursor.close()
+        self.coletas.clear()
+        self.analises.clear()
+        return True
+
+
+def main():
+    argparse.ArgumentParser(description="Refaz as tabelas de resumo do dashboard a partir das tabelas do esquema.").parse_args()
+    conn = mysql.connector.connect(
+        host=getenv("db_host"),
+        user=getenv("db_user"),
+        password=getenv("db_password"),
+        database=getenv("db_name")
+    )
+    cursor = conn.cursor()
+    if not resumos_existem(cursor):
+        raise SystemExit("As tabelas de resumo não existem; aplique sql/resumos_squema.sql")
+    cursor.close()
+    refazer(conn)
+    conn.close()
+    print("Resumos refeitos")
+
+
+if __name__ == "__main__":
+    main()
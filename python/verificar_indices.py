@@ -0,0 +1,237 @@
+from dotenv import load_dotenv
+from os import getenv
+import argparse
+import mysql.connector
+
+load_dotenv()
+
+# Confere com EXPLAIN que as consultas do dashboard usam os índices de sql/indices_squema.sql.
+# As consultas são as de streamlit/app.py (numeradas como lá) e as PREDEFINED_QUERIES, no
+# dialeto do MySQL (YEAR() no lugar de strftime) e com os filtros como parâmetros.
+# Rode depois da carga: com as tabelas vazias o otimizador prefere varrer tudo.
+
+# nome da consulta -> (SQL, {alias: índices aceitos}); os parâmetros %(uf)s, %(municipio)s, %(parametro)s
+# e %(data)s vêm da linha de comando
+CONSULTAS = {
+    "consulta 5 (municípios da UF)": ("""
+        SELECT DISTINCT m.NomeMunicipio
+        FROM Municipio m
+        WHERE m.fk_Estado_UF = %(uf)s
+          AND m.NomeMunicipio IS NOT NULL AND m.NomeMunicipio != ''
+        ORDER BY m.NomeMunicipio
+    """, {"m": {"idx_municipio_uf_nome"}}),
+    "consulta 6 (visão do município)": ("""
+        SELECT COUNT(*), MIN(ca.DataColeta), MAX(ca.DataColeta)
+        FROM Coleta_Amostra_LocalColeta ca
+        JOIN Municipio m ON ca.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+        WHERE ca.DataColeta IS NOT NULL
+          AND m.NomeMunicipio = %(municipio)s
+          AND m.fk_Estado_UF = %(uf)s
+    """, {"m": {"idx_municipio_uf_nome"}, "ca": {"idx_coleta_municipio_data"}}),
+    "consulta 7 (distribuição anual do município)": ("""
+        SELECT YEAR(ca.DataColeta) AS ano, COUNT(*) AS total_amostras
+        FROM Coleta_Amostra_LocalColeta ca
+        JOIN Municipio m ON ca.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+        JOIN Estado e ON m.fk_Estado_UF = e.UF
+        WHERE ca.DataColeta IS NOT NULL
+          AND m.NomeMunicipio = %(municipio)s
+          AND e.UF = %(uf)s
+        GROUP BY YEAR(ca.DataColeta)
+        ORDER BY ano
+    """, {"m": {"idx_municipio_uf_nome"}, "ca": {"idx_coleta_municipio_data"}}),
+    "consulta 8 (formas de abastecimento)": ("""
+        SELECT a.NomeDaFormaDeAbastecimento, COUNT(*) AS total
+        FROM Municipio m
+        JOIN Estado e ON m.fk_Estado_UF = e.UF
+        LEFT JOIN Abastecido ab ON m.CodigoDoIBGE = ab.fk_Municipio_CodigoDoIBGE
+        LEFT JOIN Abastecimento a ON ab.fk_Abastecimento_CodigoFormaDeAbastecimento = a.CodigoFormaDeAbastecimento
+        WHERE m.NomeMunicipio = %(municipio)s
+          AND e.UF = %(uf)s
+        GROUP BY a.CodigoFormaDeAbastecimento, a.NomeDaFormaDeAbastecimento
+    """, {"m": {"idx_municipio_uf_nome"}, "ab": {"PRIMARY"}}),
+    "consulta 9 (locais de coleta)": ("""
+        SELECT ca.TipoDoLocal, COUNT(*) AS total
+        FROM Municipio m
+        JOIN Estado e ON m.fk_Estado_UF = e.UF
+        LEFT JOIN Coleta_Amostra_LocalColeta ca ON m.CodigoDoIBGE = ca.fk_Municipio_CodigoDoIBGE
+        WHERE m.NomeMunicipio = %(municipio)s
+          AND e.UF = %(uf)s
+        GROUP BY ca.TipoDoLocal
+    """, {"m": {"idx_municipio_uf_nome"}, "ca": {"idx_coleta_municipio_data"}}),
+    "consulta 10 (estatísticas do parâmetro no município)": ("""
+        SELECT COUNT(*), MIN(a.Resultado), AVG(a.Resultado), MAX(a.Resultado)
+        FROM Analise a
+        JOIN Coleta_Amostra_LocalColeta ca
+            ON a.fk_Amostra_DataColeta = ca.DataColeta
+           AND a.fk_Amostra_Hora = ca.Hora
+           AND a.fk_Amostra_NumeroDaAmostra = ca.NumeroDaAmostra
+        JOIN Municipio m ON ca.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+        JOIN Estado e ON m.fk_Estado_UF = e.UF
+        WHERE e.UF = %(uf)s
+          AND m.NomeMunicipio = %(municipio)s
+          AND a.fk_Classificacao_Parametro_ciano_ = %(parametro)s
+          AND a.Resultado IS NOT NULL
+    """, {
+        "a": {"idx_analise_parametro_resultado", "idx_analise_amostra", "FK_Analise_2"},
+        "m": {"idx_municipio_uf_nome", "idx_municipio_nome", "PRIMARY"},
+    }),
+    "consulta 11 (evolução anual do parâmetro)": ("""
+        SELECT YEAR(a.DataDoLaudo) AS ano, AVG(a.Resultado) AS media
+        FROM Analise a
+        JOIN Coleta_Amostra_LocalColeta ca
+            ON a.fk_Amostra_DataColeta = ca.DataColeta
+           AND a.fk_Amostra_Hora = ca.Hora
+           AND a.fk_Amostra_NumeroDaAmostra = ca.NumeroDaAmostra
+        JOIN Municipio m ON ca.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+        JOIN Estado e ON m.fk_Estado_UF = e.UF
+        WHERE e.UF = %(uf)s
+          AND m.NomeMunicipio = %(municipio)s
+          AND a.fk_Classificacao_Parametro_ciano_ = %(parametro)s
+          AND a.Resultado IS NOT NULL
+          AND a.DataDoLaudo IS NOT NULL
+        GROUP BY YEAR(a.DataDoLaudo)
+        ORDER BY ano
+    """, {
+        "a": {"idx_analise_parametro_resultado", "idx_analise_amostra", "FK_Analise_2"},
+        "m": {"idx_municipio_uf_nome", "idx_municipio_nome", "PRIMARY"},
+    }),
+    "mais_10_amostras": ("""
+        SELECT m.NomeMunicipio, e.UF, COUNT(ca.NumeroDaAmostra) AS QuantidadeAmostras
+        FROM Municipio m
+        JOIN Estado e ON m.fk_Estado_UF = e.UF
+        JOIN Coleta_Amostra_LocalColeta ca ON m.CodigoDoIBGE = ca.fk_Municipio_CodigoDoIBGE
+        GROUP BY m.NomeMunicipio, e.UF
+        HAVING COUNT(ca.NumeroDaAmostra) > 10
+        ORDER BY COUNT(ca.NumeroDaAmostra) DESC
+    """, {"ca": {"idx_coleta_municipio_data"}}),
+    "filtro_data": ("""
+        SELECT m.NomeMunicipio, e.UF, ca.DataColeta, ca.Hora, ca.NumeroDaAmostra, c.Parametro_ciano_, a.Resultado, a.DataDoLaudo
+        FROM Coleta_Amostra_LocalColeta ca
+        JOIN Municipio m ON ca.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+        JOIN Estado e ON m.fk_Estado_UF = e.UF
+        JOIN Analise a ON ca.DataColeta = a.fk_Amostra_DataColeta
+            AND ca.Hora = a.fk_Amostra_Hora
+            AND ca.NumeroDaAmostra = a.fk_Amostra_NumeroDaAmostra
+        JOIN Classificacao c ON a.fk_Classificacao_Parametro_ciano_ = c.Parametro_ciano_
+        WHERE ca.DataColeta = %(data)s
+    """, {"ca": {"PRIMARY"}, "a": {"idx_analise_amostra", "FK_Analise_2"}}),
+    "media_parametro": ("""
+        SELECT AVG(a.Resultado) AS MediaParametro
+        FROM Analise a
+        JOIN Classificacao c ON a.fk_Classificacao_Parametro_ciano_ = c.Parametro_ciano_
+        WHERE c.Parametro_ciano_ = %(parametro)s
+    """, {"a": {"idx_analise_parametro_resultado"}}),
+    "forma_abastecimento_excede_parametro": ("""
+        SELECT DISTINCT m.NomeMunicipio, e.UF
+        FROM Municipio m
+        JOIN Estado e ON m.fk_Estado_UF = e.UF
+        JOIN Coleta_Amostra_LocalColeta ca ON m.CodigoDoIBGE = ca.fk_Municipio_CodigoDoIBGE
+        JOIN Analise a ON ca.DataColeta = a.fk_Amostra_DataColeta
+             AND ca.Hora = a.fk_Amostra_Hora
+             AND ca.NumeroDaAmostra = a.fk_Amostra_NumeroDaAmostra
+        JOIN Classificacao c ON a.fk_Classificacao_Parametro_ciano_ = c.Parametro_ciano_
+        WHERE ca.TipoDoLocal = 'Grupo de casas'
+          AND c.Parametro_ciano_ = %(parametro)s
+          AND a.Resultado > 0.5
+          AND m.NomeMunicipio IN (
+              SELECT DISTINCT m2.NomeMunicipio
+              FROM Municipio m2
+              JOIN Coleta_Amostra_LocalColeta ca2 ON m2.CodigoDoIBGE = ca2.fk_Municipio_CodigoDoIBGE
+              WHERE ca2.TipoDoLocal = 'Grupo de casas'
+          )
+    """, {
+        "a": {"idx_analise_parametro_resultado", "idx_analise_amostra", "FK_Analise_2"},
+        "ca2": {"idx_coleta_tipolocal"},
+    }),
+    "local_acima_media": ("""
+        SELECT DISTINCT m.NomeMunicipio, ca.NomeLocal, ca.TipoDoLocal
+        FROM Coleta_Amostra_LocalColeta ca
+        JOIN Municipio m ON ca.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+        JOIN Analise a ON ca.DataColeta = a.fk_Amostra_DataColeta
+                     AND ca.Hora = a.fk_Amostra_Hora
+                     AND ca.NumeroDaAmostra = a.fk_Amostra_NumeroDaAmostra
+        JOIN Classificacao c ON a.fk_Classificacao_Parametro_ciano_ = c.Parametro_ciano_
+        WHERE m.NomeMunicipio = %(municipio)s AND ca.NomeLocal != ''
+          AND c.Parametro_ciano_ = %(parametro)s
+          AND a.Resultado > (
+              SELECT AVG(Resultado)
+              FROM Analise a2
+              JOIN Classificacao c2 ON a2.fk_Classificacao_Parametro_ciano_ = c2.Parametro_ciano_
+              WHERE c2.Parametro_ciano_ = %(parametro)s
+          )
+    """, {
+        "m": {"idx_municipio_nome", "idx_municipio_uf_nome"},
+        "a2": {"idx_analise_parametro_resultado"},
+    }),
+    "entre_parametro": ("""
+        SELECT DISTINCT a.fk_Amostra_NumeroDaAmostra
+        FROM Analise a
+        JOIN Classificacao c ON a.fk_Classificacao_Parametro_ciano_ = c.Parametro_ciano_
+        WHERE c.Parametro_ciano_ = %(parametro)s
+            AND (a.Resultado < 6.5 OR a.Resultado > 108.5)
+    """, {"a": {"idx_analise_parametro_resultado"}}),
+}
+
+TABELAS = ["Estado", "Municipio", "Abastecimento", "Abastecido", "Coleta_Amostra_LocalColeta", "Classificacao", "Analise"]
+
+
+def conectar():
+    return mysql.connector.connect(
+        host=getenv("db_host"),
+        user=getenv("db_user"),
+        password=getenv("db_password"),
+        database=getenv("db_name")
+    )
+
+
+def explicar(cursor, consulta, parametros):
+    """Retorna {alias: (tipo de acesso, índice usado)} do EXPLAIN tradicional."""
+    cursor.execute("EXPLAIN " + consulta, parametros)
+    colunas = cursor.column_names
+    acessos = {}
+    for linha in cursor.fetchall():
+        linha = dict(zip(colunas, linha))
+        if linha["table"] is not None:
+            acessos[linha["table"]] = (linha["type"], linha["key"])
+    return acessos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Confere com EXPLAIN que as consultas do dashboard usam os índices secundários.")
+    parser.add_argument("--uf", default="BA", help="UF usada nos filtros (padrão: %(default)s)")
+    parser.add_argument("--municipio", default="SALVADOR", help="município usado nos filtros (padrão: %(default)s)")
+    parser.add_argument("--parametro", default="Cylindrospermopsis sp.", help="parâmetro ciano usado nos filtros (padrão: %(default)s)")
+    parser.add_argument("--data", default="2014-10-21", help="data da coleta usada em filtro_data (padrão: %(default)s)")
+    args = parser.parse_args()
+    parametros = {"uf": args.uf, "municipio": args.municipio, "parametro": args.parametro, "data": args.data}
+
+    conn = conectar()
+    cursor = conn.cursor()
+    # estatísticas atualizadas, para o plano refletir os dados carregados
+    for tabela in TABELAS:
+        cursor.execute(f"ANALYZE TABLE {tabela}")
+        cursor.fetchall()
+
+    falhas = 0
+    for nome, (consulta, esperados) in CONSULTAS.items():
+        acessos = explicar(cursor, consulta, parametros)
+        problemas = []
+        for alias, indices in esperados.items():
+            tipo, indice = acessos.get(alias, (None, None))
+            if indice not in indices:
+                problemas.append(f"{alias} usou {indice or 'nenhum índice'} ({tipo}), esperado {' ou '.join(sorted(indices))}")
+        plano = ", ".join(f"{alias}: {indice or '-'} ({tipo})" for alias, (tipo, indice) in acessos.items())
+        print(f"[{'OK' if not problemas else 'FALHA'}] {nome}\n    {plano}")
+        for problema in problemas:
+            print(f"    -> {problema}")
+        falhas += bool(problemas)
+
+    cursor.close()
+    conn.close()
+    print(f"\n{len(CONSULTAS) - falhas} de {len(CONSULTAS)} consultas usam os índices esperados")
+    if falhas:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+/* Entre a carga (fase 2) e as restrições (fase 3): sem o UNIQUE(NumeroDaAmostra) e as chaves
+   estrangeiras durante a carga, o INSERT IGNORE não descarta mais a amostra que se repete com outra
+   data ou hora de coleta, nem as análises dela. Aqui cada NumeroDaAmostra fica só com a coleta mais
+   antiga; as repetidas e as suas análises vão para Quarentena_Coleta e Quarentena_Analise, e os pontos
+   de Coleta_Geo delas são apagados. Depois disto, refaça os resumos (python/resumos.py). */
+USE Projeto_final;
+
+CREATE TEMPORARY TABLE Coleta_Repetida (PRIMARY KEY (DataColeta, Hora, NumeroDaAmostra))
+SELECT DataColeta, Hora, NumeroDaAmostra
+FROM (
+    SELECT DataColeta, Hora, NumeroDaAmostra,
+           ROW_NUMBER() OVER (PARTITION BY NumeroDaAmostra ORDER BY DataColeta, Hora) AS Ordem
+    FROM Coleta_Amostra_LocalColeta
+) ca
+WHERE Ordem > 1;
+
+CREATE TABLE IF NOT EXISTS Quarentena_Coleta SELECT * FROM Coleta_Amostra_LocalColeta WHERE FALSE;
+CREATE TABLE IF NOT EXISTS Quarentena_Analise SELECT * FROM Analise WHERE FALSE;
+
+INSERT INTO Quarentena_Analise
+SELECT a.*
+FROM Analise a
+    JOIN Coleta_Repetida r
+        ON a.fk_Amostra_DataColeta = r.DataColeta
+       AND a.fk_Amostra_Hora = r.Hora
+       AND a.fk_Amostra_NumeroDaAmostra = r.NumeroDaAmostra;
+
+INSERT INTO Quarentena_Coleta
+SELECT ca.*
+FROM Coleta_Amostra_LocalColeta ca
+    JOIN Coleta_Repetida r
+        ON ca.DataColeta = r.DataColeta AND ca.Hora = r.Hora AND ca.NumeroDaAmostra = r.NumeroDaAmostra;
+
+DELETE a FROM Analise a
+    JOIN Coleta_Repetida r
+        ON a.fk_Amostra_DataColeta = r.DataColeta
+       AND a.fk_Amostra_Hora = r.Hora
+       AND a.fk_Amostra_NumeroDaAmostra = r.NumeroDaAmostra;
+
+DELETE g FROM Coleta_Geo g
+    JOIN Coleta_Repetida r
+        ON g.fk_Amostra_DataColeta = r.DataColeta
+       AND g.fk_Amostra_Hora = r.Hora
+       AND g.fk_Amostra_NumeroDaAmostra = r.NumeroDaAmostra;
+
+DELETE ca FROM Coleta_Amostra_LocalColeta ca
+    JOIN Coleta_Repetida r
+        ON ca.DataColeta = r.DataColeta AND ca.Hora = r.Hora AND ca.NumeroDaAmostra = r.NumeroDaAmostra;
+
+SELECT COUNT(*) AS AmostrasRepetidasEmQuarentena FROM Coleta_Repetida;
+
+DROP TEMPORARY TABLE Coleta_Repetida;
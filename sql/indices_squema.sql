@@ -0,0 +1,27 @@
+/* Índices secundários para os caminhos de acesso do dashboard (streamlit/app.py e PREDEFINED_QUERIES).
+   Aplicado depois da carga e antes de restricoes_squema.sql: FK_Municipio_2, FK_Coleta_Amostra_LocalColeta_2
+   e FK_Analise_3 reaproveitam estes índices (a coluna da FK é a primeira de cada um) em vez de criar os seus.
+   python/verificar_indices.py confere com EXPLAIN que as consultas do dashboard os usam. */
+USE Projeto_final;
+
+ALTER TABLE Municipio
+    -- municípios de uma UF em ordem de nome, e município escolhido por UF + nome (consultas 5 a 9)
+    ADD INDEX idx_municipio_uf_nome (fk_Estado_UF, NomeMunicipio),
+    -- município escolhido só pelo nome (consultas 10 e 11, local_acima_media)
+    ADD INDEX idx_municipio_nome (NomeMunicipio);
+
+ALTER TABLE Coleta_Amostra_LocalColeta
+    -- amostras de um município e o seu período de coletas (consultas 6, 7 e 9, mais_10_amostras)
+    ADD INDEX idx_coleta_municipio_data (fk_Municipio_CodigoDoIBGE, DataColeta),
+    -- filtro por tipo de local (forma_abastecimento_excede_parametro)
+    ADD INDEX idx_coleta_tipolocal (TipoDoLocal, fk_Municipio_CodigoDoIBGE);
+
+ALTER TABLE Analise
+    -- a chave primária começa por DataDoLaudo: sem estes, buscas por parâmetro ou por amostra varrem a tabela.
+    -- parâmetro + resultado cobre as médias e filtros de faixa sem ler as linhas
+    ADD INDEX idx_analise_parametro_resultado (fk_Classificacao_Parametro_ciano_, Resultado),
+    ADD INDEX idx_analise_amostra (fk_Amostra_NumeroDaAmostra);
+
+ALTER TABLE Coleta_Geo
+    -- amostras num raio ou numa caixa de coordenadas (python/consultar_proximidade.py)
+    ADD SPATIAL INDEX idx_coleta_geo_localizacao (Localizacao);
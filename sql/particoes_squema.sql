@@ -0,0 +1,53 @@
+/* Particionamento por ano (RANGE) de Coleta_Amostra_LocalColeta e Analise, aplicado logo depois de
+   tabelas_squema.sql, com as tabelas ainda vazias (python python/create_local_database.py --particionado).
+   As duas tabelas usam o ano da coleta, então um ano é o mesmo conjunto de amostras nas duas e pode
+   ser exportado, apagado ou recarregado sozinho (python/particoes.py e load_csv.py --ano).
+
+   O MySQL exige que toda chave única contenha a coluna do particionamento e não aceita chaves
+   estrangeiras em tabelas particionadas: Analise ganha fk_Amostra_DataColeta na chave primária e,
+   no lugar de restricoes_squema.sql, vale restricoes_particionado_squema.sql (sem as FKs de Coleta
+   e Análise nem o UNIQUE(NumeroDaAmostra)). Coleta_Geo não é particionada: índices SPATIAL não são
+   suportados em tabelas particionadas.
+
+   Anos depois de 2026 caem em p_futuro até que a partição do ano seja criada (particoes.py criar). */
+USE Projeto_final;
+
+ALTER TABLE Coleta_Amostra_LocalColeta
+    PARTITION BY RANGE (YEAR(DataColeta)) (
+        PARTITION p_antigo VALUES LESS THAN (2014),
+        PARTITION p2014 VALUES LESS THAN (2015),
+        PARTITION p2015 VALUES LESS THAN (2016),
+        PARTITION p2016 VALUES LESS THAN (2017),
+        PARTITION p2017 VALUES LESS THAN (2018),
+        PARTITION p2018 VALUES LESS THAN (2019),
+        PARTITION p2019 VALUES LESS THAN (2020),
+        PARTITION p2020 VALUES LESS THAN (2021),
+        PARTITION p2021 VALUES LESS THAN (2022),
+        PARTITION p2022 VALUES LESS THAN (2023),
+        PARTITION p2023 VALUES LESS THAN (2024),
+        PARTITION p2024 VALUES LESS THAN (2025),
+        PARTITION p2025 VALUES LESS THAN (2026),
+        PARTITION p2026 VALUES LESS THAN (2027),
+        PARTITION p_futuro VALUES LESS THAN MAXVALUE
+    );
+
+ALTER TABLE Analise
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (DataDoLaudo, fk_Amostra_NumeroDaAmostra, fk_Classificacao_Parametro_ciano_, fk_Amostra_DataColeta)
+    PARTITION BY RANGE (YEAR(fk_Amostra_DataColeta)) (
+        PARTITION p_antigo VALUES LESS THAN (2014),
+        PARTITION p2014 VALUES LESS THAN (2015),
+        PARTITION p2015 VALUES LESS THAN (2016),
+        PARTITION p2016 VALUES LESS THAN (2017),
+        PARTITION p2017 VALUES LESS THAN (2018),
+        PARTITION p2018 VALUES LESS THAN (2019),
+        PARTITION p2019 VALUES LESS THAN (2020),
+        PARTITION p2020 VALUES LESS THAN (2021),
+        PARTITION p2021 VALUES LESS THAN (2022),
+        PARTITION p2022 VALUES LESS THAN (2023),
+        PARTITION p2023 VALUES LESS THAN (2024),
+        PARTITION p2024 VALUES LESS THAN (2025),
+        PARTITION p2025 VALUES LESS THAN (2026),
+        PARTITION p2026 VALUES LESS THAN (2027),
+        PARTITION p_futuro VALUES LESS THAN MAXVALUE
+    );
@@ -0,0 +1,48 @@
+/* Fase 3 da criação do esquema compacto (tabelas_compacto_squema.sql): chaves estrangeiras e
+   índices secundários, aplicados depois da carga como em restricoes_squema.sql e indices_squema.sql.
+   Os ids são resolvidos pela própria carga, então as chaves estrangeiras só confirmam o que ela gravou. */
+USE Projeto_final_compacto;
+
+ALTER TABLE Dim_Municipio
+    ADD INDEX idx_municipio_uf_nome (fk_Estado_UF, NomeMunicipio),
+    ADD INDEX idx_municipio_nome (NomeMunicipio),
+    ADD CONSTRAINT FK_Dim_Municipio_Estado
+        FOREIGN KEY (fk_Estado_UF)
+        REFERENCES Estado (UF)
+        ON DELETE NO ACTION;
+
+ALTER TABLE Fato_Coleta
+    ADD UNIQUE (NumeroDaAmostra),
+    ADD INDEX idx_coleta_municipio_data (fk_Municipio_IdMunicipio, DataColeta),
+    ADD INDEX idx_coleta_tipolocal (TipoDoLocal, fk_Municipio_IdMunicipio),
+    ADD CONSTRAINT FK_Fato_Coleta_Municipio
+        FOREIGN KEY (fk_Municipio_IdMunicipio)
+        REFERENCES Dim_Municipio (IdMunicipio);
+
+ALTER TABLE Fato_Coleta_Geo
+    ADD SPATIAL INDEX idx_coleta_geo_localizacao (Localizacao),
+    ADD CONSTRAINT FK_Fato_Coleta_Geo_Coleta
+        FOREIGN KEY (fk_Coleta_IdColeta)
+        REFERENCES Fato_Coleta (IdColeta)
+        ON DELETE CASCADE;
+
+ALTER TABLE Fato_Analise
+    ADD INDEX idx_analise_parametro_resultado (fk_Classificacao_IdClassificacao, Resultado),
+    ADD CONSTRAINT FK_Fato_Analise_Coleta
+        FOREIGN KEY (fk_Coleta_IdColeta)
+        REFERENCES Fato_Coleta (IdColeta)
+        ON DELETE CASCADE,
+    ADD CONSTRAINT FK_Fato_Analise_Classificacao
+        FOREIGN KEY (fk_Classificacao_IdClassificacao)
+        REFERENCES Dim_Classificacao (IdClassificacao)
+        ON DELETE NO ACTION;
+
+ALTER TABLE Fato_Abastecido
+    ADD CONSTRAINT FK_Fato_Abastecido_Municipio
+        FOREIGN KEY (fk_Municipio_IdMunicipio)
+        REFERENCES Dim_Municipio (IdMunicipio)
+        ON DELETE NO ACTION,
+    ADD CONSTRAINT FK_Fato_Abastecido_Abastecimento
+        FOREIGN KEY (fk_Abastecimento_IdAbastecimento)
+        REFERENCES Dim_Abastecimento (IdAbastecimento)
+        ON DELETE CASCADE;
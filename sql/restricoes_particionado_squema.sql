@@ -0,0 +1,21 @@
+/* Fase 3 da criação com particionamento (particoes_squema.sql): as restrições de restricoes_squema.sql
+   que o MySQL aceita com Coleta_Amostra_LocalColeta e Analise particionadas. As ligações entre coleta,
+   análise e classificação ficam a cargo da carga; verificar_integridade.sql continua listando as
+   linhas que as violariam. */
+USE Projeto_final;
+
+ALTER TABLE Municipio
+    ADD CONSTRAINT FK_Municipio_2
+        FOREIGN KEY (fk_Estado_UF)
+        REFERENCES Estado (UF)
+        ON DELETE NO ACTION;
+
+ALTER TABLE Abastecido
+    ADD CONSTRAINT FK_Abastecido_1
+        FOREIGN KEY (fk_Municipio_CodigoDoIBGE)
+        REFERENCES Municipio (CodigoDoIBGE)
+        ON DELETE NO ACTION,
+    ADD CONSTRAINT FK_Abastecido_2
+        FOREIGN KEY (fk_Abastecimento_CodigoFormaDeAbastecimento)
+        REFERENCES Abastecimento (CodigoFormaDeAbastecimento)
+        ON DELETE CASCADE;
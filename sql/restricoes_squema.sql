@@ -0,0 +1,44 @@
+/* Fase 3 da criação: restrições aplicadas depois da carga (fase 2), para que os inserts não
+   paguem a verificação das chaves estrangeiras e a manutenção dos índices linha a linha.
+   Cada tabela recebe um único ALTER TABLE, então os índices são montados numa só passada.
+   As amostras repetidas já saíram em deduplicar_amostras.sql; se algum ALTER falhar mesmo assim,
+   rode verificar_integridade.sql para ver as linhas problemáticas. */
+USE Projeto_final;
+
+ALTER TABLE Municipio
+    ADD CONSTRAINT FK_Municipio_2
+        FOREIGN KEY (fk_Estado_UF)
+        REFERENCES Estado (UF)
+        ON DELETE NO ACTION;
+
+ALTER TABLE Coleta_Amostra_LocalColeta
+    ADD UNIQUE (NumeroDaAmostra),
+    ADD CONSTRAINT FK_Coleta_Amostra_LocalColeta_2
+        FOREIGN KEY (fk_Municipio_CodigoDoIBGE)
+        REFERENCES Municipio (CodigoDoIBGE);
+
+ALTER TABLE Coleta_Geo
+    ADD CONSTRAINT FK_Coleta_Geo_1
+        FOREIGN KEY (fk_Amostra_DataColeta, fk_Amostra_Hora, fk_Amostra_NumeroDaAmostra)
+        REFERENCES Coleta_Amostra_LocalColeta (DataColeta, Hora, NumeroDaAmostra)
+        ON DELETE CASCADE;
+
+ALTER TABLE Analise
+    ADD CONSTRAINT FK_Analise_2
+        FOREIGN KEY (fk_Amostra_DataColeta, fk_Amostra_Hora, fk_Amostra_NumeroDaAmostra)
+        REFERENCES Coleta_Amostra_LocalColeta (DataColeta, Hora, NumeroDaAmostra)
+        ON DELETE CASCADE,
+    ADD CONSTRAINT FK_Analise_3
+        FOREIGN KEY (fk_Classificacao_Parametro_ciano_)
+        REFERENCES Classificacao (Parametro_ciano_)
+        ON DELETE NO ACTION;
+
+ALTER TABLE Abastecido
+    ADD CONSTRAINT FK_Abastecido_1
+        FOREIGN KEY (fk_Municipio_CodigoDoIBGE)
+        REFERENCES Municipio (CodigoDoIBGE)
+        ON DELETE NO ACTION,
+    ADD CONSTRAINT FK_Abastecido_2
+        FOREIGN KEY (fk_Abastecimento_CodigoFormaDeAbastecimento)
+        REFERENCES Abastecimento (CodigoFormaDeAbastecimento)
+        ON DELETE CASCADE;
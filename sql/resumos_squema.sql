@@ -0,0 +1,40 @@
+/* Tabelas de resumo com os agregados das abas "Visão Geral" e "Em Detalhes" do app, mantidas pela
+   carga (python/load_csv.py recalcula só os grupos tocados; python/resumos.py refaz tudo).
+   Podem ser criadas a qualquer momento: a próxima carga, ou resumos.py, preenche as tabelas vazias. */
+USE Projeto_final;
+
+-- amostras por município, ano da coleta e tipo do local (consultas 6, 7 e 9)
+CREATE TABLE IF NOT EXISTS Resumo_Coleta_Municipio (
+    fk_Municipio_CodigoDoIBGE VARCHAR(255),
+    Ano SMALLINT,
+    TipoDoLocal VARCHAR(255),
+    TotalAmostras INT NOT NULL,
+    PrimeiraColeta DATE,
+    UltimaColeta DATE,
+    PRIMARY KEY (fk_Municipio_CodigoDoIBGE, Ano, TipoDoLocal)
+);
+
+-- amostras por UF (com a região) e ano da coleta (consultas 1 a 4)
+CREATE TABLE IF NOT EXISTS Resumo_Coleta_UF_Ano (
+    fk_Estado_UF CHAR(2),
+    Regiao VARCHAR(255),
+    Ano SMALLINT,
+    TotalAmostras INT NOT NULL,
+    PrimeiraColeta DATE,
+    UltimaColeta DATE,
+    PRIMARY KEY (fk_Estado_UF, Ano)
+);
+
+-- resultados por município, parâmetro e ano do laudo (consultas 10 e 11); a média é Soma / Quantidade,
+-- Quantidade conta só os resultados não nulos, como o COUNT(a.Resultado) do app, e análises sem data
+-- do laudo ficam no Ano 0
+CREATE TABLE IF NOT EXISTS Resumo_Analise_Municipio_Parametro (
+    fk_Municipio_CodigoDoIBGE VARCHAR(255),
+    fk_Classificacao_Parametro_ciano_ VARCHAR(255),
+    Ano SMALLINT,
+    Quantidade INT NOT NULL,
+    Minimo DECIMAL(8,2),
+    Maximo DECIMAL(8,2),
+    Soma DECIMAL(16,2),
+    PRIMARY KEY (fk_Municipio_CodigoDoIBGE, fk_Classificacao_Parametro_ciano_, Ano)
+);
@@ -0,0 +1,128 @@
+/* Versão compacta do esquema, num banco à parte (Projeto_final_compacto): Município, Abastecimento,
+   Classificação e as amostras de Coleta ganham chaves substitutas inteiras, e Analise guarda só
+   esses ids (4 + 2 + 3 bytes de chave) em vez de NumeroDaAmostra, DataColeta, Hora e o texto
+   inteiro do parâmetro em cada linha e em cada entrada de índice.
+   Os ids são resolvidos pela carga (python/load_csv.py --compacto). As views no fim expõem as
+   sete tabelas com os nomes e colunas de tabelas_squema.sql, então as consultas do dashboard e
+   a exportação funcionam sem mudança. Restrições e índices secundários: restricoes_compacto_squema.sql. */
+CREATE DATABASE IF NOT EXISTS Projeto_final_compacto;
+USE Projeto_final_compacto;
+
+
+CREATE TABLE IF NOT EXISTS Estado (
+    UF CHAR(2) PRIMARY KEY,
+    Regiao VARCHAR(255)
+);
+
+-- ~5.570 municípios: cabe em SMALLINT
+CREATE TABLE IF NOT EXISTS Dim_Municipio (
+    IdMunicipio SMALLINT UNSIGNED PRIMARY KEY,
+    CodigoDoIBGE VARCHAR(255) NOT NULL,
+    RegionalDeSaude VARCHAR(255),
+    NomeMunicipio VARCHAR(255),
+    fk_Estado_UF CHAR(2) NOT NULL,
+    UNIQUE (CodigoDoIBGE)
+);
+
+CREATE TABLE IF NOT EXISTS Dim_Abastecimento (
+    IdAbastecimento INT UNSIGNED PRIMARY KEY,
+    CodigoFormaDeAbastecimento VARCHAR(255) NOT NULL,
+    TipoDaFormaDeAbastecimento VARCHAR(255),
+    NomeETA_UTA VARCHAR(255),
+    NomeDaFormaDeAbastecimento VARCHAR(255),
+    UNIQUE (CodigoFormaDeAbastecimento)
+);
+
+CREATE TABLE IF NOT EXISTS Fato_Abastecido (
+    fk_Municipio_IdMunicipio SMALLINT UNSIGNED,
+    fk_Abastecimento_IdAbastecimento INT UNSIGNED,
+    PRIMARY KEY (fk_Municipio_IdMunicipio, fk_Abastecimento_IdAbastecimento)
+);
+
+CREATE TABLE IF NOT EXISTS Fato_Coleta (
+    IdColeta INT UNSIGNED PRIMARY KEY,
+    NumeroDaAmostra VARCHAR(255) NOT NULL,
+    DataDeRegistroNoSISAGUA DATETIME,
+    DataColeta DATE NOT NULL,
+    DescricaoDoLocal VARCHAR(255),
+    Zona VARCHAR(255),
+    CategoriaArea VARCHAR(255),
+    Area VARCHAR(255),
+    TipoDoLocal VARCHAR(255),
+    NomeLocal VARCHAR(255),
+    Latitude DECIMAL(8,6),
+    Longitude DECIMAL(9,6),
+    fk_Municipio_IdMunicipio SMALLINT UNSIGNED,
+    Procedencia VARCHAR(255),
+    PontoDeColeta VARCHAR(255),
+    Motivo VARCHAR(255),
+    Hora TIME NOT NULL,
+    -- a chave natural (a chave primária de Coleta_Amostra_LocalColeta) continua única
+    UNIQUE (DataColeta, Hora, NumeroDaAmostra)
+);
+
+-- ponto das coletas com coordenadas, como Coleta_Geo em tabelas_squema.sql
+CREATE TABLE IF NOT EXISTS Fato_Coleta_Geo (
+    fk_Coleta_IdColeta INT UNSIGNED PRIMARY KEY,
+    Latitude DECIMAL(8,6) NOT NULL,
+    Longitude DECIMAL(9,6) NOT NULL,
+    Localizacao POINT SRID 4326 AS (ST_SRID(POINT(Longitude, Latitude), 4326)) STORED NOT NULL
+);
+
+-- algumas dezenas de parâmetros: SMALLINT sobra
+CREATE TABLE IF NOT EXISTS Dim_Classificacao (
+    IdClassificacao SMALLINT UNSIGNED PRIMARY KEY,
+    Grupo VARCHAR(255),
+    Parametro_ciano_ VARCHAR(255) NOT NULL,
+    UNIQUE (Parametro_ciano_)
+);
+
+-- a chave começa pela amostra: as análises de uma coleta ficam juntas, que é como o dashboard as junta
+CREATE TABLE IF NOT EXISTS Fato_Analise (
+    fk_Coleta_IdColeta INT UNSIGNED,
+    fk_Classificacao_IdClassificacao SMALLINT UNSIGNED,
+    Resultado DECIMAL(8,2),
+    DataDoLaudo DATE,
+    PRIMARY KEY (fk_Coleta_IdColeta, fk_Classificacao_IdClassificacao, DataDoLaudo)
+);
+
+
+-- As tabelas no formato de tabelas_squema.sql, com as chaves naturais de volta.
+
+CREATE OR REPLACE VIEW Municipio AS
+SELECT CodigoDoIBGE, RegionalDeSaude, NomeMunicipio, fk_Estado_UF
+FROM Dim_Municipio;
+
+CREATE OR REPLACE VIEW Abastecimento AS
+SELECT CodigoFormaDeAbastecimento, TipoDaFormaDeAbastecimento, NomeETA_UTA, NomeDaFormaDeAbastecimento
+FROM Dim_Abastecimento;
+
+CREATE OR REPLACE VIEW Abastecido AS
+SELECT m.CodigoDoIBGE AS fk_Municipio_CodigoDoIBGE, a.CodigoFormaDeAbastecimento AS fk_Abastecimento_CodigoFormaDeAbastecimento
+FROM Fato_Abastecido ab
+    JOIN Dim_Municipio m ON ab.fk_Municipio_IdMunicipio = m.IdMunicipio
+    JOIN Dim_Abastecimento a ON ab.fk_Abastecimento_IdAbastecimento = a.IdAbastecimento;
+
+CREATE OR REPLACE VIEW Coleta_Amostra_LocalColeta AS
+SELECT c.NumeroDaAmostra, c.DataDeRegistroNoSISAGUA, c.DataColeta, c.DescricaoDoLocal, c.Zona, c.CategoriaArea,
+       c.Area, c.TipoDoLocal, c.NomeLocal, c.Latitude, c.Longitude, m.CodigoDoIBGE AS fk_Municipio_CodigoDoIBGE,
+       c.Procedencia, c.PontoDeColeta, c.Motivo, c.Hora
+FROM Fato_Coleta c
+    LEFT JOIN Dim_Municipio m ON c.fk_Municipio_IdMunicipio = m.IdMunicipio;
+
+CREATE OR REPLACE VIEW Coleta_Geo AS
+SELECT c.DataColeta AS fk_Amostra_DataColeta, c.Hora AS fk_Amostra_Hora, c.NumeroDaAmostra AS fk_Amostra_NumeroDaAmostra,
+       g.Latitude, g.Longitude, g.Localizacao
+FROM Fato_Coleta_Geo g
+    JOIN Fato_Coleta c ON g.fk_Coleta_IdColeta = c.IdColeta;
+
+CREATE OR REPLACE VIEW Classificacao AS
+SELECT Grupo, Parametro_ciano_
+FROM Dim_Classificacao;
+
+CREATE OR REPLACE VIEW Analise AS
+SELECT c.DataColeta AS fk_Amostra_DataColeta, c.Hora AS fk_Amostra_Hora, c.NumeroDaAmostra AS fk_Amostra_NumeroDaAmostra,
+       cl.Parametro_ciano_ AS fk_Classificacao_Parametro_ciano_, a.Resultado, a.DataDoLaudo
+FROM Fato_Analise a
+    JOIN Fato_Coleta c ON a.fk_Coleta_IdColeta = c.IdColeta
+    JOIN Dim_Classificacao cl ON a.fk_Classificacao_IdClassificacao = cl.IdClassificacao;
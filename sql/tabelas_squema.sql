@@ -1,4 +1,6 @@
 /* Lógico_2: */
+/* Fase 1 da criação: só as tabelas e chaves primárias. As chaves estrangeiras e o UNIQUE
+   ficam em restricoes_squema.sql, aplicado depois da carga dos dados. */
 CREATE DATABASE IF NOT EXISTS Projeto_Final;
 USE Projeto_final;
 
@@ -39,8 +41,8 @@ CREATE TABLE IF NOT EXISTS Abastecido (
     Area VARCHAR(255),
     TipoDoLocal VARCHAR(255),
     NomeLocal VARCHAR(255),
-    Latitude VARCHAR(255),
-    Longitude VARCHAR(255),
+    Latitude DECIMAL(8,6),
+    Longitude DECIMAL(9,6),
    	fk_Municipio_CodigoDoIBGE VARCHAR(255),
    
    	Procedencia VARCHAR(255),
@@ -50,6 +52,19 @@ CREATE TABLE IF NOT EXISTS Abastecido (
     PRIMARY KEY (DataColeta, Hora, NumeroDaAmostra)
 );
  
+/* Ponto geográfico das coletas que têm coordenadas. Fica fora de Coleta_Amostra_LocalColeta porque
+   o índice SPATIAL (criado em indices_squema.sql) exige a coluna NOT NULL, e muitas amostras não têm
+   latitude/longitude. Localizacao é calculada pelo próprio MySQL a partir das duas colunas. */
+CREATE TABLE IF NOT EXISTS Coleta_Geo (
+    fk_Amostra_DataColeta DATE,
+    fk_Amostra_Hora TIME,
+    fk_Amostra_NumeroDaAmostra VARCHAR(255),
+    Latitude DECIMAL(8,6) NOT NULL,
+    Longitude DECIMAL(9,6) NOT NULL,
+    Localizacao POINT SRID 4326 AS (ST_SRID(POINT(Longitude, Latitude), 4326)) STORED NOT NULL,
+    PRIMARY KEY (fk_Amostra_DataColeta, fk_Amostra_Hora, fk_Amostra_NumeroDaAmostra)
+);
+
 CREATE TABLE IF NOT EXISTS Classificacao (
     Grupo VARCHAR(255),
     Parametro_ciano_ VARCHAR(255) PRIMARY KEY
@@ -67,38 +82,3 @@ CREATE TABLE IF NOT EXISTS Analise (
   
     PRIMARY KEY (DataDoLaudo, fk_Amostra_NumeroDaAmostra, fk_Classificacao_Parametro_ciano_)
 );
-
-
-
-ALTER TABLE Municipio ADD CONSTRAINT FK_Municipio_2
-    FOREIGN KEY (fk_Estado_UF)
-    REFERENCES Estado (UF)
-    ON DELETE NO ACTION;
-   
-ALTER TABLE Coleta_Amostra_LocalColeta
-ADD UNIQUE (NumeroDaAmostra);
- 
-ALTER TABLE Coleta_Amostra_LocalColeta ADD CONSTRAINT FK_Coleta_Amostra_LocalColeta_2
-    FOREIGN KEY (fk_Municipio_CodigoDoIBGE)
-    REFERENCES Municipio (CodigoDoIBGE);
-    
-ALTER TABLE Analise
-ADD CONSTRAINT FK_Analise_2
-    FOREIGN KEY (fk_Amostra_DataColeta, fk_Amostra_Hora, fk_Amostra_NumeroDaAmostra)
-    REFERENCES Coleta_Amostra_LocalColeta (DataColeta, Hora, NumeroDaAmostra)
-    ON DELETE CASCADE;
- 
-ALTER TABLE Analise ADD CONSTRAINT FK_Analise_3
-    FOREIGN KEY (fk_Classificacao_Parametro_ciano_)
-    REFERENCES Classificacao (Parametro_ciano_)
-    ON DELETE NO ACTION;
- 
-ALTER TABLE Abastecido ADD CONSTRAINT FK_Abastecido_1
-    FOREIGN KEY (fk_Municipio_CodigoDoIBGE)
-    REFERENCES Municipio (CodigoDoIBGE)
-    ON DELETE NO ACTION;
- 
-ALTER TABLE Abastecido ADD CONSTRAINT FK_Abastecido_2
-    FOREIGN KEY (fk_Abastecimento_CodigoFormaDeAbastecimento)
-    REFERENCES Abastecimento (CodigoFormaDeAbastecimento)
-    ON DELETE CASCADE;
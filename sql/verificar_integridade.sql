@@ -0,0 +1,48 @@
+/* Relatório de integridade, para rodar entre a carga e restricoes_squema.sql: lista as linhas
+   que violariam as chaves estrangeiras e o UNIQUE(NumeroDaAmostra), que ainda não existem
+   durante a carga. Cada consulta vazia significa que a restrição correspondente pode ser criada. */
+USE Projeto_final;
+
+-- FK_Municipio_2: município com UF inexistente
+SELECT 'FK_Municipio_2' AS Restricao, m.CodigoDoIBGE, m.fk_Estado_UF
+FROM Municipio m
+    LEFT JOIN Estado e ON m.fk_Estado_UF = e.UF
+WHERE e.UF IS NULL;
+
+-- UNIQUE(NumeroDaAmostra): mesma amostra com data/hora de coleta diferentes
+SELECT 'UNIQUE_NumeroDaAmostra' AS Restricao, NumeroDaAmostra, COUNT(*) AS Ocorrencias
+FROM Coleta_Amostra_LocalColeta
+GROUP BY NumeroDaAmostra
+HAVING COUNT(*) > 1;
+
+-- FK_Coleta_Amostra_LocalColeta_2: coleta em município inexistente
+SELECT 'FK_Coleta_Amostra_LocalColeta_2' AS Restricao, ca.NumeroDaAmostra, ca.fk_Municipio_CodigoDoIBGE
+FROM Coleta_Amostra_LocalColeta ca
+    LEFT JOIN Municipio m ON ca.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+WHERE ca.fk_Municipio_CodigoDoIBGE IS NOT NULL AND m.CodigoDoIBGE IS NULL;
+
+-- FK_Analise_2: análise sem a coleta correspondente
+SELECT 'FK_Analise_2' AS Restricao, a.fk_Amostra_NumeroDaAmostra, a.fk_Amostra_DataColeta, a.fk_Amostra_Hora
+FROM Analise a
+    LEFT JOIN Coleta_Amostra_LocalColeta ca
+        ON a.fk_Amostra_DataColeta = ca.DataColeta
+       AND a.fk_Amostra_Hora = ca.Hora
+       AND a.fk_Amostra_NumeroDaAmostra = ca.NumeroDaAmostra
+WHERE ca.NumeroDaAmostra IS NULL;
+
+-- FK_Analise_3: análise com parâmetro inexistente
+SELECT 'FK_Analise_3' AS Restricao, a.fk_Amostra_NumeroDaAmostra, a.fk_Classificacao_Parametro_ciano_
+FROM Analise a
+    LEFT JOIN Classificacao c ON a.fk_Classificacao_Parametro_ciano_ = c.Parametro_ciano_
+WHERE a.fk_Classificacao_Parametro_ciano_ IS NOT NULL AND c.Parametro_ciano_ IS NULL;
+
+-- FK_Abastecido_1 / FK_Abastecido_2: vínculo com município ou forma de abastecimento inexistente
+SELECT 'FK_Abastecido_1' AS Restricao, ab.fk_Municipio_CodigoDoIBGE, ab.fk_Abastecimento_CodigoFormaDeAbastecimento
+FROM Abastecido ab
+    LEFT JOIN Municipio m ON ab.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+WHERE m.CodigoDoIBGE IS NULL;
+
+SELECT 'FK_Abastecido_2' AS Restricao, ab.fk_Municipio_CodigoDoIBGE, ab.fk_Abastecimento_CodigoFormaDeAbastecimento
+FROM Abastecido ab
+    LEFT JOIN Abastecimento a ON ab.fk_Abastecimento_CodigoFormaDeAbastecimento = a.CodigoFormaDeAbastecimento
+WHERE a.CodigoFormaDeAbastecimento IS NULL;
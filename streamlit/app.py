@@ -3,10 +3,16 @@ import streamlit as st
 import pandas as pd
 import os
 import csv
-from pandasql import sqldf
+import sqlite3
+import threading
 import plotly.express as px
 import json
+import re
+import time
 import urllib.request
+from dotenv import load_dotenv
+
+load_dotenv()
 
 #########################
 # URL do GeoJSON dos estados do Brasil (padrão IBGE)
@@ -18,6 +24,7 @@ geojson_url = "https://raw.githubusercontent.com/codeforamerica/click_that_hood/
 #########################
 
 base_dir = os.path.dirname(__file__)
+pasta_dados = os.path.join(base_dir, "..", "data", "db_export")
 
 st.set_page_config(
     page_title="VISISAGUA",  
@@ -25,36 +32,555 @@ st.set_page_config(
     layout="centered"
 )
 
-@st.cache_data
+# tipos das colunas de cada tabela exportada; as que não aparecem aqui ficam como texto.
+# categoria serve para colunas com poucos valores repetidos em muitas linhas (UF, Zona, parâmetro...)
+ESQUEMAS = {
+    "Estado": {"UF": "categoria", "Regiao": "categoria"},
+    "Municipio": {"RegionalDeSaude": "categoria", "fk_Estado_UF": "categoria"},
+    "Abastecimento": {"TipoDaFormaDeAbastecimento": "categoria"},
+    "Coleta_Amostra_LocalColeta": {
+        "DataDeRegistroNoSISAGUA": "data",
+        "DataColeta": "data",
+        "Zona": "categoria",
+        "CategoriaArea": "categoria",
+        "Area": "categoria",
+        "TipoDoLocal": "categoria",
+        "Latitude": "numero",
+        "Longitude": "numero",
+        "fk_Municipio_CodigoDoIBGE": "categoria",
+        "Procedencia": "categoria",
+        "PontoDeColeta": "categoria",
+        "Motivo": "categoria",
+    },
+    "Classificacao": {"Grupo": "categoria"},
+    "Analise": {
+        "fk_Amostra_DataColeta": "data",
+        "fk_Classificacao_Parametro_ciano_": "categoria",
+        "Resultado": "numero",
+        "DataDoLaudo": "data",
+    },
+    "Resumo_Coleta_UF_Ano": {
+        "fk_Estado_UF": "categoria",
+        "Regiao": "categoria",
+        "Ano": "inteiro",
+        "TotalAmostras": "inteiro",
+        "PrimeiraColeta": "data",
+        "UltimaColeta": "data",
+    },
+    "Resumo_Coleta_Municipio": {
+        "fk_Municipio_CodigoDoIBGE": "categoria",
+        "Ano": "inteiro",
+        "TipoDoLocal": "categoria",
+        "TotalAmostras": "inteiro",
+        "PrimeiraColeta": "data",
+        "UltimaColeta": "data",
+    },
+    "Resumo_Analise_Municipio_Parametro": {
+        "fk_Municipio_CodigoDoIBGE": "categoria",
+        "fk_Classificacao_Parametro_ciano_": "categoria",
+        "Ano": "inteiro",
+        "Quantidade": "inteiro",
+        "Minimo": "numero",
+        "Maximo": "numero",
+        "Soma": "numero",
+    },
+}
+
+
+def ler_tsv(caminho, esquema):
+    # tudo é lido como texto, sem inferência, e só as categorias já saem do parser no tipo final;
+    # datas e números são convertidos em aplicar_tipos, depois de juntar as partes da tabela, com
+    # os valores inválidos (coordenadas de snapshots antigos, por exemplo) virando nulos
+    colunas = pd.read_csv(caminho, sep='\t', nrows=0, encoding='latin1').columns
+    dtype = {coluna: "category" if esquema.get(coluna) == "categoria" else str for coluna in colunas}
+    opcoes = dict(sep='\t', dtype=dtype, na_values=['NULL', ''], keep_default_na=False)
+    # engine C: nas partes de Análise (texto com muitas colunas repetidas) foi mais rápido que o pyarrow
+    try:
+        return pd.read_csv(caminho, encoding='utf-8', engine='c', **opcoes)
+    except UnicodeDecodeError:
+        return pd.read_csv(caminho, encoding='latin1', engine='c', **opcoes)
+
+
+def aplicar_tipos(df, esquema):
+    for coluna in df.columns:
+        tipo = esquema.get(coluna)
+        if tipo == "data":
+            df[coluna] = pd.to_datetime(df[coluna], format="ISO8601", errors="coerce")
+        elif tipo == "numero":
+            df[coluna] = pd.to_numeric(df[coluna], errors="coerce").astype("float64")
+        elif tipo == "inteiro":
+            df[coluna] = pd.to_numeric(df[coluna], errors="coerce").astype("Int64")
+        elif tipo == "categoria":
+            # o MySQL exporta CHAR com espaços à direita; o strip é feito uma vez por categoria
+            serie = df[coluna].astype("category")
+            categorias = serie.cat.categories.astype(str).str.strip()
+            if categorias.is_unique:
+                df[coluna] = serie.cat.rename_categories(categorias)
+            else:
+                df[coluna] = serie.astype(str).str.strip().astype("category")
+        elif tipo is None and pd.api.types.is_string_dtype(df[coluna]):
+            df[coluna] = df[coluna].str.strip()
+    return df
+
+
 def carregar_tabelas():
+    """Lê as tabelas exportadas em DataFrames, só para montar o banco em memória (criar_banco).
+
+    Não fica em cache: depois de gravadas no SQLite, as tabelas saem da memória e as abas
+    consultam só o banco.
+    """
     tabelas = {}
-    pasta_dados = os.path.join(base_dir, "..", "data", "db_export")
 
     arquivos_csv = [f for f in os.listdir(pasta_dados) if f.endswith('.csv')]
     for arquivo in sorted(arquivos_csv):
         nome_tabela = os.path.splitext(arquivo)[0]
-        caminho = os.path.join(pasta_dados, arquivo)
+        tabelas[nome_tabela] = ler_tsv(os.path.join(pasta_dados, arquivo), ESQUEMAS.get(nome_tabela, {}))
+
+    # tabelas grandes (Analise) vêm em partes compactadas: db_export/Analise/parte-0001.tsv.gz, ...
+    # cada parte é lida e descompactada por vez, em ordem
+    for nome_tabela in sorted(os.listdir(pasta_dados)):
+        pasta_partes = os.path.join(pasta_dados, nome_tabela)
+        if not os.path.isdir(pasta_partes):
+            continue
+        partes = sorted(f for f in os.listdir(pasta_partes) if f.endswith('.tsv.gz'))
+        if partes:
+            tabelas[nome_tabela] = pd.concat(
+                [ler_tsv(os.path.join(pasta_partes, parte), ESQUEMAS.get(nome_tabela, {})) for parte in partes],
+                ignore_index=True
+            )
+
+    for nome_tabela, df in tabelas.items():
+        tabelas[nome_tabela] = aplicar_tipos(df, ESQUEMAS.get(nome_tabela, {}))
+
+    return tabelas
+
+#########################
+# banco de consultas (SQLite)
+#########################
 
-        df = None
-        for encoding in ['utf-8', 'latin1']:
+# chaves primárias e índices nas junções e filtros das consultas, como em python/exportar_sqlite.py
+INDICES = {
+    "Estado": [["UF"]],
+    "Municipio": [["CodigoDoIBGE"], ["fk_Estado_UF"], ["NomeMunicipio"]],
+    "Abastecimento": [["CodigoFormaDeAbastecimento"]],
+    "Abastecido": [["fk_Municipio_CodigoDoIBGE"], ["fk_Abastecimento_CodigoFormaDeAbastecimento"]],
+    "Coleta_Amostra_LocalColeta": [["DataColeta", "Hora", "NumeroDaAmostra"], ["fk_Municipio_CodigoDoIBGE"], ["NumeroDaAmostra"]],
+    "Classificacao": [["Parametro_ciano_"]],
+    "Analise": [["fk_Amostra_DataColeta", "fk_Amostra_Hora", "fk_Amostra_NumeroDaAmostra"], ["fk_Classificacao_Parametro_ciano_"]],
+    "Resumo_Coleta_Municipio": [["fk_Municipio_CodigoDoIBGE"]],
+    "Resumo_Analise_Municipio_Parametro": [["fk_Municipio_CodigoDoIBGE", "fk_Classificacao_Parametro_ciano_"]],
+}
+
+# ações que o console pode fazer no banco compartilhado: só ler (sqlite3.set_authorizer)
+LEITURA = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+
+TEMPO_MAXIMO = float(os.getenv("app_tempo_max_ms", 30000)) / 1000
+
+
+def versao_dados():
+    """Nome, tamanho e data de modificação dos arquivos exportados: muda a cada exportação."""
+    versao = []
+    for raiz, _, arquivos in os.walk(pasta_dados):
+        for arquivo in sorted(arquivos):
+            info = os.stat(os.path.join(raiz, arquivo))
+            versao.append((os.path.relpath(os.path.join(raiz, arquivo), pasta_dados), info.st_size, info.st_mtime))
+    return tuple(sorted(versao))
+
+
+def gravar_tabela(conn, nome, df):
+    # datas no mesmo texto ISO do sisagua.sqlite (só a data quando não há hora), categorias como texto
+    # cópia rasa: só as colunas convertidas são novas
+    df = df.copy(deep=False)
+    for coluna in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            datas = df[coluna].dropna()
+            formato = "%Y-%m-%d" if (datas == datas.dt.normalize()).all() else "%Y-%m-%d %H:%M:%S"
+            df[coluna] = df[coluna].dt.strftime(formato)
+        elif isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].astype(object)
+    df.to_sql(nome, conn, index=False)
+
+
+class BancoConsultas:
+    """Conexão SQLite única, somente leitura, compartilhada por todas as sessões do servidor.
+
+    O sqlite3 não deve executar duas consultas ao mesmo tempo na mesma conexão, então elas passam
+    uma de cada vez pelo lock; com os índices, cada uma leva milissegundos.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.lock = threading.Lock()
+        self.tabelas = {nome for nome, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        # estrutura de cada tabela para o "Filtro Simples", lida antes de o authorizer barrar os PRAGMAs
+        self.colunas = {
+            nome: pd.DataFrame(
+                [(coluna, tipo, "NO" if nao_nulo else "YES") for _, coluna, tipo, nao_nulo, _, _ in conn.execute(f'PRAGMA table_info("{nome}")')],
+                columns=["Coluna", "Tipo", "Nulos"]
+            )
+            for nome in self.tabelas
+        }
+        # o console roda SQL livre: nada de escrever, anexar outro arquivo ou mudar PRAGMAs
+        conn.set_authorizer(lambda acao, *_: sqlite3.SQLITE_OK if acao in LEITURA else sqlite3.SQLITE_DENY)
+
+    def consultar(self, sql, parametros=None):
+        with self.lock:
+            # interrompe consultas que passem de TEMPO_MAXIMO, para não travar as outras sessões
+            limite = time.monotonic() + TEMPO_MAXIMO
+            self.conn.set_progress_handler(lambda: time.monotonic() > limite, 10000)
             try:
-                df = pd.read_csv(
-                    caminho,
-                    sep='\t',
-                    encoding=encoding,
-                    on_bad_lines='skip',
-                    engine='python'
-                )
-                break
-            except Exception:
-                continue
+                return pd.read_sql_query(sql, self.conn, params=parametros or {})
+            finally:
+                self.conn.set_progress_handler(None, 0)
 
-        df = df.fillna('').astype(str)
-        df = df.apply(lambda col: col.str.strip().str.slice(0, 120))
 
-        tabelas[nome_tabela] = df
+@st.cache_resource(show_spinner="Preparando o banco de consultas...", max_entries=1)
+def criar_banco(versao):
+    """Abre o sisagua.sqlite exportado, se for tão recente quanto os TSVs, ou monta o banco em memória a partir deles.
+
+    A versão dos dados entra na chave do cache: uma nova exportação gera um banco novo, e o antigo sai do cache.
+    """
+    arquivo = os.path.join(pasta_dados, "sisagua.sqlite")
+    tsvs = [modificado for nome, _, modificado in versao if not nome.startswith("sisagua.sqlite") and nome != "manifesto.json"]
+    if os.path.exists(arquivo) and os.path.getmtime(arquivo) >= max(tsvs, default=0):
+        conn = sqlite3.connect(f"file:{arquivo}?mode=ro", uri=True, check_same_thread=False)
+        return BancoConsultas(conn)
+
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    tabelas = carregar_tabelas()
+    # cada DataFrame sai do dicionário ao ser gravado: os dados não ficam duas vezes na memória
+    while tabelas:
+        nome, df = tabelas.popitem()
+        gravar_tabela(conn, nome, df)
+        del df
+    for nome, indices in INDICES.items():
+        if nome not in {tabela for tabela, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}:
+            continue
+        for colunas in indices:
+            conn.execute(f"CREATE INDEX idx_{nome}_{'_'.join(colunas)} ON {nome} ({', '.join(colunas)})")
+    # estatísticas para o planejador escolher os índices
+    conn.execute("ANALYZE")
+    conn.commit()
+    return BancoConsultas(conn)
+
+#########################
+# backend MySQL (opcional)
+#########################
+
+# app_backend=mysql no .env faz o dashboard consultar direto o banco do .env em vez de copiar o
+# snapshot de data/db_export para cada processo; os filtros vão como parâmetros e os índices de
+# sql/indices_squema.sql resolvem. Se o banco não responder, o app volta para o snapshot.
+BACKEND = os.getenv("app_backend", "snapshot")
+
+# o console SQL roda SQL livre no banco: no modo MySQL só fica ativo com um usuário próprio do app
+# (app_db_user) cujos privilégios (SHOW GRANTS) sejam só SELECT; com o db_user da carga, qualquer
+# visitante poderia apagar tabelas
+CONSOLE_MYSQL = bool(os.getenv("app_db_user"))
+
+# privilégios que um usuário do console pode ter; USAGE é "nenhum privilégio"
+PRIVILEGIOS_CONSOLE = {"SELECT", "USAGE"}
+
+# depois de uma falha de conexão, quantos segundos o app usa o snapshot antes de tentar o banco de novo
+ESPERA_RECONEXAO = int(os.getenv("app_db_espera_segundos", 60))
+
+# palavras que não podem aparecer (fora de textos entre aspas) num comando do console no modo MySQL:
+# um WITH pode terminar em DELETE/UPDATE, um SELECT pode gravar arquivos ou variáveis com INTO e
+# ler arquivos do servidor com LOAD_FILE(). Só palavras de comando: REPLACE(), INSERT(), CHARACTER SET
+# e LOCK IN SHARE MODE aparecem em SELECTs válidos e ficam de fora (os privilégios, só SELECT, barram o resto)
+COMANDOS_PROIBIDOS = re.compile(
+    r"\b(UPDATE|DELETE|INTO|LOAD_FILE|CREATE|ALTER|DROP|TRUNCATE|RENAME|GRANT|REVOKE|CALL|HANDLER|"
+    r"PREPARE|EXECUTE|DEALLOCATE|FLUSH|KILL|SHUTDOWN|INSTALL|UNINSTALL)\b",
+    re.IGNORECASE
+)
+
+TABELAS_BANCO = ["Estado", "Municipio", "Abastecimento", "Abastecido", "Coleta_Amostra_LocalColeta", "Classificacao", "Analise"]
+
+# consultas do dashboard no dialeto do MySQL, com os mesmos nomes de coluna das versões SQLite
+CONSULTAS_MYSQL = {
+    "visao_geral": """
+        SELECT COUNT(*) AS total, MIN(DataColeta) AS antiga, MAX(DataColeta) AS recente
+        FROM Coleta_Amostra_LocalColeta
+        WHERE DataColeta IS NOT NULL
+    """,
+    "dist_temporal": """
+        SELECT YEAR(DataColeta) AS ano, COUNT(*) AS total
+        FROM Coleta_Amostra_LocalColeta
+        WHERE DataColeta IS NOT NULL
+        GROUP BY YEAR(DataColeta)
+        ORDER BY ano
+    """,
+    "ufs": """
+        SELECT e.UF, COUNT(ca.NumeroDaAmostra) AS total_amostras
+        FROM Coleta_Amostra_LocalColeta ca
+            JOIN Municipio m ON ca.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+            JOIN Estado e ON m.fk_Estado_UF = e.UF
+        GROUP BY e.UF
+        ORDER BY e.UF
+    """,
+    "regioes": """
+        SELECT e.Regiao, COUNT(ca.NumeroDaAmostra) AS total_amostras
+        FROM Coleta_Amostra_LocalColeta ca
+            JOIN Municipio m ON ca.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+            JOIN Estado e ON m.fk_Estado_UF = e.UF
+        GROUP BY e.Regiao
+        ORDER BY total_amostras DESC
+    """,
+    "lista_ufs": """
+        SELECT UF FROM Estado WHERE UF IS NOT NULL AND UF != '' ORDER BY UF
+    """,
+    "municipios": """
+        SELECT DISTINCT NomeMunicipio
+        FROM Municipio
+        WHERE fk_Estado_UF = %(uf)s AND NomeMunicipio IS NOT NULL AND NomeMunicipio != ''
+        ORDER BY NomeMunicipio
+    """,
+    "visao_municipio": """
+        SELECT COUNT(*) AS total, MIN(ca.DataColeta) AS antiga, MAX(ca.DataColeta) AS recente
+        FROM Coleta_Amostra_LocalColeta ca
+            JOIN Municipio m ON ca.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+        WHERE ca.DataColeta IS NOT NULL
+          AND m.NomeMunicipio = %(municipio)s
+          AND m.fk_Estado_UF = %(uf)s
+    """,
+    "dist_temporal_municipio": """
+        SELECT YEAR(ca.DataColeta) AS ano, COUNT(*) AS total
+        FROM Coleta_Amostra_LocalColeta ca
+            JOIN Municipio m ON ca.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+        WHERE ca.DataColeta IS NOT NULL
+          AND m.NomeMunicipio = %(municipio)s
+          AND m.fk_Estado_UF = %(uf)s
+        GROUP BY YEAR(ca.DataColeta)
+        ORDER BY ano
+    """,
+    "abastecimento": """
+        SELECT a.NomeDaFormaDeAbastecimento, COUNT(*) AS total
+        FROM Municipio m
+            LEFT JOIN Abastecido ab ON m.CodigoDoIBGE = ab.fk_Municipio_CodigoDoIBGE
+            LEFT JOIN Abastecimento a ON ab.fk_Abastecimento_CodigoFormaDeAbastecimento = a.CodigoFormaDeAbastecimento
+        WHERE m.NomeMunicipio = %(municipio)s
+          AND m.fk_Estado_UF = %(uf)s
+        GROUP BY a.CodigoFormaDeAbastecimento, a.NomeDaFormaDeAbastecimento
+    """,
+    "localcoleta": """
+        SELECT ca.TipoDoLocal, COUNT(*) AS total
+        FROM Municipio m
+            LEFT JOIN Coleta_Amostra_LocalColeta ca ON m.CodigoDoIBGE = ca.fk_Municipio_CodigoDoIBGE
+        WHERE m.NomeMunicipio = %(municipio)s
+          AND m.fk_Estado_UF = %(uf)s
+        GROUP BY ca.TipoDoLocal
+    """,
+    "parametros": """
+        SELECT Parametro_ciano_ FROM Classificacao WHERE Parametro_ciano_ != '' ORDER BY Parametro_ciano_
+    """,
+    "estatisticas": """
+        SELECT
+            COUNT(a.Resultado) AS total_resultados,
+            MIN(a.Resultado) AS min_resultado,
+            ROUND(AVG(a.Resultado), 2) AS media_resultado,
+            MAX(a.Resultado) AS max_resultado
+        FROM Analise a
+            JOIN Coleta_Amostra_LocalColeta ca
+                ON a.fk_Amostra_DataColeta = ca.DataColeta
+               AND a.fk_Amostra_Hora = ca.Hora
+               AND a.fk_Amostra_NumeroDaAmostra = ca.NumeroDaAmostra
+            JOIN Municipio m ON ca.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+        WHERE m.fk_Estado_UF = %(uf)s
+          AND m.NomeMunicipio = %(municipio)s
+          AND a.fk_Classificacao_Parametro_ciano_ = %(parametro)s
+          AND a.Resultado IS NOT NULL
+    """,
+    "evolucao_anual": """
+        SELECT
+            YEAR(a.DataDoLaudo) AS ano,
+            ROUND(AVG(a.Resultado), 2) AS media_resultado,
+            COUNT(a.Resultado) AS qtd_amostras
+        FROM Analise a
+            JOIN Coleta_Amostra_LocalColeta ca
+                ON a.fk_Amostra_DataColeta = ca.DataColeta
+               AND a.fk_Amostra_Hora = ca.Hora
+               AND a.fk_Amostra_NumeroDaAmostra = ca.NumeroDaAmostra
+            JOIN Municipio m ON ca.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+        WHERE m.fk_Estado_UF = %(uf)s
+          AND m.NomeMunicipio = %(municipio)s
+          AND a.fk_Classificacao_Parametro_ciano_ = %(parametro)s
+          AND a.Resultado IS NOT NULL
+          AND a.DataDoLaudo IS NOT NULL
+        GROUP BY YEAR(a.DataDoLaudo)
+        ORDER BY ano
+    """,
+}
+
+# com as tabelas de resumo no banco, os totais por UF e região não varrem as coletas
+RESUMOS_MYSQL = {
+    "ufs": """
+        SELECT fk_Estado_UF AS UF, SUM(TotalAmostras) AS total_amostras
+        FROM Resumo_Coleta_UF_Ano
+        GROUP BY fk_Estado_UF
+        ORDER BY fk_Estado_UF
+    """,
+    "regioes": """
+        SELECT Regiao, SUM(TotalAmostras) AS total_amostras
+        FROM Resumo_Coleta_UF_Ano
+        GROUP BY Regiao
+        ORDER BY total_amostras DESC
+    """,
+}
+
+
+@st.cache_resource(show_spinner=False)
+def falha_banco():
+    """Última falha ao criar o pool, compartilhada por todas as sessões do servidor."""
+    return {"quando": None, "erro": None}
+
+
+def somente_select(grants):
+    """True se as linhas de SHOW GRANTS só concedem SELECT (ou USAGE), sem papéis nem GRANT OPTION."""
+    for (linha,) in grants:
+        # GRANT <privilégios> ON <objeto> TO ...; papéis (GRANT `papel` TO ...) não têm ON
+        privilegios = re.match(r"GRANT (.+?) ON ", linha)
+        if not privilegios or "WITH GRANT OPTION" in linha.upper():
+            return False
+        # SELECT (coluna, ...) restringe colunas: os parênteses saem antes de separar por vírgula
+        nomes = re.sub(r"\([^)]*\)", "", privilegios.group(1))
+        if {nome.strip().upper() for nome in nomes.split(",")} - PRIVILEGIOS_CONSOLE:
+            return False
+    return True
+
+
+@st.cache_resource(show_spinner=False)
+def criar_pool():
+    """Pool de conexões compartilhado por todas as sessões e reruns do servidor, se o banco tem os resumos
+    e se o console pode ficar ativo (app_db_user só com SELECT)."""
+    import mysql.connector.pooling
+    from mysql.connector.constants import ClientFlag
+
+    pool = mysql.connector.pooling.MySQLConnectionPool(
+        pool_name="visisagua",
+        pool_size=int(os.getenv("app_db_conexoes", 8)),
+        host=os.getenv("db_host"),
+        # sem app_db_user as consultas fixas do dashboard usam o db_user, mas o console fica desativado
+        user=os.getenv("app_db_user") or os.getenv("db_user"),
+        password=os.getenv("app_db_password") or os.getenv("db_password"),
+        database=os.getenv("db_name"),
+        connection_timeout=5,
+        # um COM_QUERY nunca executa mais de um comando, mesmo que passe algum ';' pela validação do console
+        client_flags=[-ClientFlag.MULTI_STATEMENTS]
+    )
+    # falha aqui (e não fica no cache) se o banco estiver fora do ar
+    conn = pool.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ('Resumo_Coleta_UF_Ano', 'Resumo_Coleta_Municipio', 'Resumo_Analise_Municipio_Parametro')
+    """)
+    resumos = cursor.fetchone()[0] == 3
+    console = False
+    if CONSOLE_MYSQL:
+        cursor.execute("SHOW GRANTS")
+        console = somente_select(cursor.fetchall())
+    cursor.close()
+    conn.close()
+    return pool, resumos, console
+
+
+def conectar_banco():
+    if BACKEND != "mysql":
+        return None, False, False
+    falha = falha_banco()
+    # com o banco fora do ar, cada rerun esperaria o connection_timeout: tenta de novo só depois de ESPERA_RECONEXAO
+    if falha["quando"] is not None and time.monotonic() - falha["quando"] < ESPERA_RECONEXAO:
+        st.warning(f"Banco MySQL indisponível ({falha['erro']}). Usando o snapshot de data/db_export.")
+        return None, False, False
+    try:
+        return criar_pool()
+    except ImportError as e:
+        # sem o conector não é o banco que está fora do ar, é a instalação: nada de snapshot nem de espera
+        st.error(f"app_backend=mysql precisa do mysql-connector-python (streamlit/requirements.txt): {e}")
+        st.stop()
+    except Exception as e:
+        falha["quando"], falha["erro"] = time.monotonic(), e
+        st.warning(f"Banco MySQL indisponível ({e}). Usando o snapshot de data/db_export.")
+        return None, False, False
+
+
+def validar_console(sql):
+    """Aceita só um SELECT (ou WITH ... SELECT) no modo MySQL; levanta ValueError com o motivo.
+
+    A transação só de leitura não basta: o MySQL confirma a transação e executa DDL mesmo assim.
+    """
+    def neutralizar(trecho):
+        trecho = trecho.group(0)
+        # /*! ... */ é executado pelo MySQL: o conteúdo continua sendo verificado
+        if trecho.startswith("/*!"):
+            return " " + trecho[3:-2].lstrip("0123456789") + " "
+        return "''" if trecho[0] in "'\"`" else " "
+
+    # textos entre aspas e comentários numa só passada, da esquerda para a direita
+    texto = re.sub(
+        r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"|`[^`]*`|/\*.*?\*/|(?:--(?=\s|$)|#)[^\n]*",
+        neutralizar, sql, flags=re.DOTALL
+    )
+    texto = texto.strip().rstrip(";").strip()
+    if "'" in texto.replace("''", "") or '"' in texto or "/*" in texto:
+        raise ValueError("aspas ou comentário sem fechar")
+    if ";" in texto:
+        raise ValueError("o console aceita um comando por vez")
+    if not re.match(r"(SELECT|WITH)\b", texto, re.IGNORECASE):
+        raise ValueError("o console só aceita consultas SELECT ou WITH")
+    proibido = COMANDOS_PROIBIDOS.search(texto)
+    if proibido:
+        raise ValueError(f"{proibido.group(1).upper()} não é permitido no console")
+
+
+def obter_conexao():
+    from mysql.connector.errors import PoolError
+
+    # com todas as conexões em uso (mais sessões do que o pool), espera alguma voltar
+    for _ in range(100):
+        try:
+            return pool.get_connection()
+        except PoolError:
+            time.sleep(0.1)
+    return pool.get_connection()
+
+
+def executar_mysql(sql, parametros=None, somente_leitura=False):
+    conn = obter_conexao()
+    try:
+        if somente_leitura:
+            # SQL digitado no console (já validado): transação só de leitura e tempo máximo por SELECT
+            cursor = conn.cursor()
+            cursor.execute(f"SET SESSION MAX_EXECUTION_TIME = {int(os.getenv('app_tempo_max_ms', 30000))}")
+            # as aspas são lidas como validar_console as leu, com \ escapando o caractere seguinte
+            cursor.execute("SET SESSION sql_mode = REPLACE(@@SESSION.sql_mode, 'NO_BACKSLASH_ESCAPES', '')")
+            cursor.close()
+            conn.start_transaction(readonly=True)
+        cursor = conn.cursor()
+        cursor.execute(sql, parametros)
+        linhas = cursor.fetchall()
+        colunas = cursor.column_names
+        cursor.close()
+        if somente_leitura:
+            conn.rollback()
+        # coerce_float converte os DECIMAL (Resultado, médias) em float
+        return pd.DataFrame.from_records(linhas, columns=colunas, coerce_float=True)
+    finally:
+        conn.close()
+
+
+@st.cache_data(ttl=int(os.getenv("app_cache_segundos", 300)), show_spinner=False)
+def consultar_mysql(sql, parametros=None):
+    """Consultas fixas do dashboard, em cache; o SQL do console vai direto para executar_mysql."""
+    return executar_mysql(sql, parametros)
+
+
+def consultar(nome, query_snapshot, parametros=None):
+    """Roda uma consulta do dashboard: CONSULTAS_MYSQL[nome] no MySQL, ou query_snapshot no banco SQLite."""
+    if pool is None:
+        return banco.consultar(query_snapshot, parametros)
+    sql = RESUMOS_MYSQL.get(nome) if resumos_no_banco else None
+    return consultar_mysql(sql or CONSULTAS_MYSQL[nome], parametros)
 
-    return tabelas
 
 ################################
 # interface com streamlit
@@ -73,10 +599,23 @@ st.markdown("""
     pelo SISAGUA e podem ser acessados no site do [OpenDataSUS](https://opendatasus.saude.gov.br/dataset/sisagua-vigilancia-cianobacterias-e-cianotoxinas).
 """)
 
-tabelas = carregar_tabelas()
-
-if not tabelas:
-    st.stop()
+pool, resumos_no_banco, console_no_banco = conectar_banco()
+if pool is not None:
+    banco = None
+else:
+    # os TSVs só são lidos se o sisagua.sqlite não existir ou estiver desatualizado (criar_banco)
+    versao = versao_dados()
+    if not versao:
+        st.stop()
+
+    banco = criar_banco(versao)
+
+# tabelas de resumo exportadas do banco (python/resumos.py): quando presentes, as consultas com
+# junções das abas 1 e 2 leem os agregados prontos em vez das tabelas completas
+usar_resumos = banco is not None and all(
+    nome in banco.tabelas
+    for nome in ["Resumo_Coleta_Municipio", "Resumo_Coleta_UF_Ano", "Resumo_Analise_Municipio_Parametro"]
+)
 
 ###############################
 # abas disponiveis
@@ -97,13 +636,10 @@ with aba1:
         FROM Coleta_Amostra_LocalColeta
         WHERE DataColeta IS NOT NULL 
           AND DataColeta != ''
-          AND LENGTH(DataColeta) = 10
-          AND SUBSTR(DataColeta, 5, 1) = '-'
-          AND SUBSTR(DataColeta, 8, 1) = '-' 
     """
     
     try:
-        resultado = sqldf(query_visao_geral, tabelas)
+        resultado = consultar("visao_geral", query_visao_geral)
         row = resultado.iloc[0]
 
         total_amostras = int(row["total"])
@@ -192,15 +728,12 @@ with aba1:
         FROM Coleta_Amostra_LocalColeta
         WHERE DataColeta IS NOT NULL 
           AND DataColeta != ''
-          AND LENGTH(DataColeta) = 10
-          AND SUBSTR(DataColeta, 5, 1) = '-'
-          AND SUBSTR(DataColeta, 8, 1) = '-'
         GROUP BY strftime('%Y', DataColeta)
         ORDER BY ano;
     """
     
     try: 
-        df_dist_temporal = sqldf(query_dist_temporal, tabelas)
+        df_dist_temporal = consultar("dist_temporal", query_dist_temporal)
         
         if df_dist_temporal.empty:
             st.warning("Nenhum dado encontrado para gerar o gráfico de distribuição temporal.")
@@ -260,9 +793,18 @@ with aba1:
         GROUP BY e.UF
         ORDER BY e.UF;
     """
+    if usar_resumos:
+        query_ufs = """
+            SELECT
+                fk_Estado_UF AS UF,
+                SUM(TotalAmostras) AS total_amostras
+            FROM Resumo_Coleta_UF_Ano
+            GROUP BY fk_Estado_UF
+            ORDER BY fk_Estado_UF;
+        """
 
     try:
-        df_ufs = sqldf(query_ufs, tabelas)
+        df_ufs = consultar("ufs", query_ufs)
 
         if df_ufs.empty:
             st.warning("Nenhum dado encontrado para gerar o mapa por estado.")
@@ -341,9 +883,18 @@ with aba1:
         GROUP BY e.Regiao
         ORDER BY total_amostras DESC;
     """
+    if usar_resumos:
+        query_regioes = """
+            SELECT
+                Regiao,
+                SUM(TotalAmostras) AS total_amostras
+            FROM Resumo_Coleta_UF_Ano
+            GROUP BY Regiao
+            ORDER BY total_amostras DESC;
+        """
 
     try:
-        df_regioes = sqldf(query_regioes, tabelas)
+        df_regioes = consultar("regioes", query_regioes)
 
         if df_regioes.empty:
             st.warning("Nenhum dado encontrado para gerar o gráfico por região.")
@@ -396,7 +947,7 @@ with aba2:
             WHERE UF IS NOT NULL AND UF != ''
             ORDER BY UF;
         """
-        df_ufs = sqldf(query_ufs, tabelas)
+        df_ufs = consultar("lista_ufs", query_ufs)
         ufs = df_ufs["UF"].tolist()
     except Exception as e:
         st.error(f"Erro ao carregar UFs: {e}")
@@ -408,18 +959,18 @@ with aba2:
     if uf_selecionada:
         try:
             ## Query 5 --------------------------------------------------
-            query_municipios = f"""
+            query_municipios = """
                 SELECT DISTINCT m.NomeMunicipio
                 FROM Municipio m
                 WHERE m.fk_Estado_UF IN (
                     SELECT e.UF
                     FROM Estado e
-                    WHERE e.UF = '{uf_selecionada}'
+                    WHERE e.UF = :uf
                 )
                 AND m.NomeMunicipio IS NOT NULL AND m.NomeMunicipio != ''
                 ORDER BY m.NomeMunicipio;
             """
-            df_municipios = sqldf(query_municipios, tabelas)
+            df_municipios = consultar("municipios", query_municipios, {"uf": uf_selecionada})
             municipios = df_municipios["NomeMunicipio"].tolist()
 
             if municipios:
@@ -437,13 +988,13 @@ with aba2:
     
     if municipio_selecionado:
         ## Query 6 --------------------------------------------------
-        query_visao_municipio = f"""
+        query_visao_municipio = """
             SELECT 
                 COUNT(*) AS total,
                 MIN(sub.DataColeta) AS antiga,
                 MAX(sub.DataColeta) AS recente
             FROM (
-                -- Subconsulta: todas as amostras do município (e UF) selecionado, com validação de data
+                -- Subconsulta: todas as amostras do município (e UF) selecionado com data de coleta
                 SELECT 
                     ca.DataColeta
                 FROM Coleta_Amostra_LocalColeta ca
@@ -451,16 +1002,25 @@ with aba2:
                     ON ca.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
                 WHERE ca.DataColeta IS NOT NULL 
                   AND ca.DataColeta != ''
-                  AND LENGTH(ca.DataColeta) = 10
-                  AND SUBSTR(ca.DataColeta, 5, 1) = '-'
-                  AND SUBSTR(ca.DataColeta, 8, 1) = '-'
-                  AND m.NomeMunicipio = '{municipio_selecionado}'
-                  AND m.fk_Estado_UF = '{uf_selecionada}'
+                  AND m.NomeMunicipio = :municipio
+                  AND m.fk_Estado_UF = :uf
             ) AS sub;
         """
+        if usar_resumos:
+            query_visao_municipio = """
+                SELECT
+                    COALESCE(SUM(r.TotalAmostras), 0) AS total,
+                    MIN(r.PrimeiraColeta) AS antiga,
+                    MAX(r.UltimaColeta) AS recente
+                FROM Resumo_Coleta_Municipio r
+                JOIN Municipio m
+                    ON r.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+                WHERE m.NomeMunicipio = :municipio
+                  AND m.fk_Estado_UF = :uf;
+            """
         
         try:
-            resultado_m = sqldf(query_visao_municipio, tabelas)
+            resultado_m = consultar("visao_municipio", query_visao_municipio, {"uf": uf_selecionada, "municipio": municipio_selecionado})
             row_m = resultado_m.iloc[0]
 
             total_amostras_m = int(row_m["total"])
@@ -543,7 +1103,7 @@ with aba2:
         
         ## Query 7 --------------------------------------------------    
         try:
-            query_dist_temporal_municipio = f"""
+            query_dist_temporal_municipio = """
                 SELECT
                     strftime('%Y', ca.DataColeta) AS ano,
                     COUNT(*) AS total
@@ -555,16 +1115,26 @@ with aba2:
                 WHERE 
                     ca.DataColeta IS NOT NULL 
                     AND ca.DataColeta != ''
-                    AND LENGTH(ca.DataColeta) = 10
-                    AND SUBSTR(ca.DataColeta, 5, 1) = '-'
-                    AND SUBSTR(ca.DataColeta, 8, 1) = '-'
-                    AND m.NomeMunicipio = '{municipio_selecionado}'
-                    AND e.UF = '{uf_selecionada}'
+                    AND m.NomeMunicipio = :municipio
+                    AND e.UF = :uf
                 GROUP BY strftime('%Y', ca.DataColeta)
                 ORDER BY ano;
             """
+            if usar_resumos:
+                query_dist_temporal_municipio = """
+                    SELECT
+                        r.Ano AS ano,
+                        SUM(r.TotalAmostras) AS total
+                    FROM Resumo_Coleta_Municipio r
+                    JOIN Municipio m
+                        ON r.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+                    WHERE m.NomeMunicipio = :municipio
+                      AND m.fk_Estado_UF = :uf
+                    GROUP BY r.Ano
+                    ORDER BY ano;
+                """
 
-            df_temp_muni = sqldf(query_dist_temporal_municipio, tabelas)
+            df_temp_muni = consultar("dist_temporal_municipio", query_dist_temporal_municipio, {"uf": uf_selecionada, "municipio": municipio_selecionado})
 
             if df_temp_muni.empty:
                 st.info(f"Nenhuma coleta registrada para **{municipio_selecionado} - {uf_selecionada}**.")
@@ -614,7 +1184,7 @@ with aba2:
         st.divider()
         
         ## Query 8 --------------------------------------------------
-        query_abastecimento_bruto = f"""
+        query_abastecimento_bruto = """
             SELECT
                 a.NomeDaFormaDeAbastecimento,
                 COUNT(*) AS total
@@ -622,12 +1192,12 @@ with aba2:
                 JOIN Estado e ON m.fk_Estado_UF = e.UF
                 LEFT JOIN Abastecido ab ON m.CodigoDoIBGE = ab.fk_Municipio_CodigoDoIBGE
                 LEFT JOIN Abastecimento a ON ab.fk_Abastecimento_CodigoFormaDeAbastecimento = a.CodigoFormaDeAbastecimento
-            WHERE m.NomeMunicipio = '{municipio_selecionado}'
-              AND e.UF = '{uf_selecionada}'
+            WHERE m.NomeMunicipio = :municipio
+              AND e.UF = :uf
             GROUP BY a.CodigoFormaDeAbastecimento;
         """
         
-        df_abast = sqldf(query_abastecimento_bruto, tabelas)
+        df_abast = consultar("abastecimento", query_abastecimento_bruto, {"uf": uf_selecionada, "municipio": municipio_selecionado})
 
         if df_abast.empty:
             st.info("Nenhuma informação de abastecimento encontrada.")
@@ -663,19 +1233,30 @@ with aba2:
         
 
         ## Query 9 --------------------------------------------------
-        query_localcoleta_bruto = f"""
+        query_localcoleta_bruto = """
             SELECT
                 ca.TipoDoLocal,
                 COUNT(*) AS total
             FROM Municipio m
                 JOIN Estado e ON m.fk_Estado_UF = e.UF
                 LEFT JOIN Coleta_Amostra_LocalColeta ca ON m.CodigoDoIBGE = ca.fk_Municipio_CodigoDoIBGE
-            WHERE m.NomeMunicipio = '{municipio_selecionado}'
-              AND e.UF = '{uf_selecionada}'
+            WHERE m.NomeMunicipio = :municipio
+              AND e.UF = :uf
             GROUP BY ca.TipoDoLocal;
         """
+        if usar_resumos:
+            query_localcoleta_bruto = """
+                SELECT
+                    r.TipoDoLocal,
+                    SUM(r.TotalAmostras) AS total
+                FROM Municipio m
+                    JOIN Resumo_Coleta_Municipio r ON m.CodigoDoIBGE = r.fk_Municipio_CodigoDoIBGE
+                WHERE m.NomeMunicipio = :municipio
+                  AND m.fk_Estado_UF = :uf
+                GROUP BY r.TipoDoLocal;
+            """
         
-        df_localcoleta = sqldf(query_localcoleta_bruto, tabelas)
+        df_localcoleta = consultar("localcoleta", query_localcoleta_bruto, {"uf": uf_selecionada, "municipio": municipio_selecionado})
 
         if df_localcoleta.empty:
             st.info("Nenhuma informação de abastecimento encontrada.")
@@ -715,19 +1296,11 @@ with aba2:
         
         if municipio_selecionado and uf_selecionada:
             try:
-                if "Classificacao" in tabelas:
-                    df_param = tabelas["Classificacao"]
-                    parametros = (
-                        df_param["Parametro_ciano_"]
-                        .dropna()
-                        .astype(str)
-                        .str.strip()
-                        .replace("", pd.NA)
-                        .dropna()
-                        .sort_values()
-                        .unique()
-                        .tolist()
-                    )
+                if pool is not None or "Classificacao" in banco.tabelas:
+                    parametros = consultar("parametros", """
+                        SELECT DISTINCT TRIM(Parametro_ciano_) AS Parametro_ciano_ FROM Classificacao
+                        WHERE TRIM(Parametro_ciano_) != '' ORDER BY 1
+                    """)["Parametro_ciano_"].tolist()
                 else:
                     st.error("Tabela 'Classificacao' não encontrada.")
                     parametros = []
@@ -744,7 +1317,7 @@ with aba2:
             ## Query 10 --------------------------------------------------
             if parametro_selecionado:
                 try:
-                    query_estatisticas = f"""
+                    query_estatisticas = """
                         SELECT 
                             COUNT(a.Resultado) AS total_resultados,
                             MIN(a.Resultado) AS min_resultado,
@@ -760,13 +1333,30 @@ with aba2:
                         JOIN Estado e
                             ON m.fk_Estado_UF = e.UF
                         WHERE 
-                            e.UF = '{uf_selecionada}'
-                            AND m.NomeMunicipio = '{municipio_selecionado}'
-                            AND a.fk_Classificacao_Parametro_ciano_ = '{parametro_selecionado}'
+                            e.UF = :uf
+                            AND m.NomeMunicipio = :municipio
+                            AND a.fk_Classificacao_Parametro_ciano_ = :parametro
                             AND a.Resultado IS NOT NULL;
                     """
-
-                    df_stats = sqldf(query_estatisticas, tabelas)
+                    if usar_resumos:
+                        # média ponderada pelos totais de cada ano: SUM(Soma) / SUM(Quantidade)
+                        query_estatisticas = """
+                            SELECT
+                                COALESCE(SUM(r.Quantidade), 0) AS total_resultados,
+                                MIN(r.Minimo) AS min_resultado,
+                                ROUND(SUM(r.Soma) / SUM(r.Quantidade), 2) AS media_resultado,
+                                MAX(r.Maximo) AS max_resultado
+                            FROM Resumo_Analise_Municipio_Parametro r
+                            JOIN Municipio m
+                                ON r.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+                            WHERE
+                                m.fk_Estado_UF = :uf
+                                AND m.NomeMunicipio = :municipio
+                                AND r.fk_Classificacao_Parametro_ciano_ = :parametro
+                                AND r.Quantidade > 0;
+                        """
+
+                    df_stats = consultar("estatisticas", query_estatisticas, {"uf": uf_selecionada, "municipio": municipio_selecionado, "parametro": parametro_selecionado})
                     row_stats = df_stats.iloc[0]
 
                     total_resultados = int(row_stats["total_resultados"])
@@ -848,7 +1438,7 @@ with aba2:
                 
 
                 ## Query 11 --------------------------------------------------
-                query_evolu_anual = f"""
+                query_evolu_anual = """
                 SELECT
                     strftime('%Y', a.DataDoLaudo) AS ano,
                     ROUND(AVG(a.Resultado), 2) AS media_resultado,
@@ -863,17 +1453,36 @@ with aba2:
                 JOIN Estado e
                     ON m.fk_Estado_UF = e.UF
                 WHERE 
-                    e.UF = '{uf_selecionada}'
-                    AND m.NomeMunicipio = '{municipio_selecionado}'
-                    AND a.fk_Classificacao_Parametro_ciano_ = '{parametro_selecionado}'
+                    e.UF = :uf
+                    AND m.NomeMunicipio = :municipio
+                    AND a.fk_Classificacao_Parametro_ciano_ = :parametro
                     AND a.Resultado IS NOT NULL
                     AND a.DataDoLaudo IS NOT NULL
                 GROUP BY strftime('%Y', a.DataDoLaudo)
                 ORDER BY ano;
                 """
+                if usar_resumos:
+                    # Ano 0 agrupa as análises sem data do laudo
+                    query_evolu_anual = """
+                    SELECT
+                        r.Ano AS ano,
+                        ROUND(SUM(r.Soma) / SUM(r.Quantidade), 2) AS media_resultado,
+                        SUM(r.Quantidade) AS qtd_amostras
+                    FROM Resumo_Analise_Municipio_Parametro r
+                    JOIN Municipio m
+                        ON r.fk_Municipio_CodigoDoIBGE = m.CodigoDoIBGE
+                    WHERE
+                        m.fk_Estado_UF = :uf
+                        AND m.NomeMunicipio = :municipio
+                        AND r.fk_Classificacao_Parametro_ciano_ = :parametro
+                        AND r.Quantidade > 0
+                        AND r.Ano != 0
+                    GROUP BY r.Ano
+                    ORDER BY ano;
+                    """
                 
                 try:
-                    df_evolucao = sqldf(query_evolu_anual, tabelas)
+                    df_evolucao = consultar("evolucao_anual", query_evolu_anual, {"uf": uf_selecionada, "municipio": municipio_selecionado, "parametro": parametro_selecionado})
 
                     if df_evolucao.empty:
                         st.info(f"Nenhum resultado encontrado para o parâmetro **{parametro_selecionado}** em **{municipio_selecionado} - {uf_selecionada}**.")
@@ -928,129 +1537,94 @@ with aba2:
 # aba 3: filtro simples 
 ###############################
 with aba3:
+    # a busca vai ao banco (MySQL ou SQLite) como LIKE parametrizado e só as primeiras linhas voltam
     st.caption("Escolha uma tabela")
     nome = st.selectbox(
         "Tabela:",
-        list(tabelas.keys()),
+        TABELAS_BANCO if pool is not None else sorted(t for t in banco.tabelas if not t.startswith("sqlite_")),
         key="filtro_tab",
         label_visibility="collapsed"
     )
-    df = tabelas[nome]
-
-    if df.empty:
-        st.warning("Esta tabela está vazia.")
+    if pool is not None:
+        colunas = consultar_mysql("""
+            SELECT COLUMN_NAME AS Coluna, COLUMN_TYPE AS Tipo, IS_NULLABLE AS Nulos
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            ORDER BY ORDINAL_POSITION
+        """, (nome,))
     else:
-        # --- Informações da Tabela ---
-        with st.expander("**Detalhes da Tabela**", expanded=False):
-            col_info1, col_info2 = st.columns(2)
-            with col_info1:
-                st.metric("Linhas", f"{len(df):,}")
-            with col_info2:
-                st.metric("Colunas", len(df.columns))
-
-            st.markdown("##### Estrutura da Tabela")
-            schema = pd.DataFrame({
-                "Coluna": df.columns,
-                "Tipo": df.dtypes.astype(str),
-                "Nulos": df.isnull().sum(),
-                "% Nulos": (df.isnull().mean() * 100).round(2),
-                "Únicos": df.nunique(),
-                "Exemplo": df.apply(lambda x: x.dropna().iloc[0] if not x.dropna().empty else "—")
-            })
-            # Estilizar o schema visualmente
-            st.dataframe(
-                schema.style.format({
-                    "% Nulos": "{:.1f}%",
-                    "Nulos": "{:,}",
-                    "Únicos": "{:,}"
-                }),
-                use_container_width=True,
-                hide_index=True
-            )
-
-        st.divider()
-
-        col_filtro1, col_filtro2 = st.columns([2, 3])
-
-        with col_filtro1:
-            st.caption("1. Escolha a coluna")
-            coluna = st.selectbox(
-                "Coluna",
-                options=df.columns,
-                label_visibility="collapsed",
-                key="coluna_filtro"
-            )
-
-        with col_filtro2:
-            st.caption("2. Informe o valor")
-            valores_unicos = df[coluna].dropna().unique()
-
-            if len(valores_unicos) <= 50 and df[coluna].dtype == 'object':
-                valor = st.selectbox(
-                    "Valor",
-                    options=[""] + sorted(valores_unicos),
-                    label_visibility="collapsed",
-                    key="valor_selecao"
-                )
-            else:
-                valor = st.text_input(
-                    "Buscar substring",
-                    placeholder=f"Digite parte do valor em '{coluna}'",
-                    label_visibility="collapsed",
-                    key="valor_texto"
-                )
-
-        st.divider()
-
-        # --- Resultados ---
-        if valor:
-            # Garantir comparação segura (evitar erro em colunas numéricas)
-            if pd.api.types.is_string_dtype(df[coluna]) or df[coluna].dtype == 'object':
-                mask = df[coluna].astype(str).str.contains(valor, case=False, na=False)
-            else:
-                # Converter valor digitado para o tipo da coluna (ex: número)
-                try:
-                    valor_convertido = type(df[coluna].dropna().iloc[0])(valor)
-                    mask = df[coluna] == valor_convertido
-                except (ValueError, IndexError):
-                    mask = df[coluna].astype(str).str.contains(valor, case=False, na=False)
+        colunas = banco.colunas[nome]
+
+    with st.expander("**Detalhes da Tabela**", expanded=False):
+        if pool is not None:
+            linhas = consultar_mysql(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                (nome,)
+            ).iloc[0, 0]
+        else:
+            # nome vem de sqlite_master, não do usuário
+            linhas = banco.consultar(f'SELECT COUNT(*) FROM "{nome}"').iloc[0, 0]
+        col_info1, col_info2 = st.columns(2)
+        with col_info1:
+            st.metric("Linhas (estimativa)" if pool is not None else "Linhas", f"{int(linhas or 0):,}")
+        with col_info2:
+            st.metric("Colunas", len(colunas))
+        st.markdown("##### Estrutura da Tabela")
+        st.dataframe(colunas, use_container_width=True, hide_index=True)
 
-            resultado = df[mask].copy().reset_index(drop=True)
-            total = len(resultado)
+    st.divider()
 
-            # Feedback visual com destaque
-            if total == 0:
-                st.warning("Nenhum resultado encontrado.")
-            else:
-                st.success(f"Encontrado(s) **{total:,}** registro(s).")
+    col_filtro1, col_filtro2 = st.columns([2, 3])
+    with col_filtro1:
+        st.caption("1. Escolha a coluna")
+        coluna = st.selectbox(
+            "Coluna",
+            options=colunas["Coluna"],
+            label_visibility="collapsed",
+            key="coluna_filtro"
+        )
+    with col_filtro2:
+        st.caption("2. Informe o valor")
+        valor = st.text_input(
+            "Buscar substring",
+            placeholder=f"Digite parte do valor em '{coluna}'",
+            label_visibility="collapsed",
+            key="valor_texto"
+        )
 
-                # Mostrar amostra (limitada)
-                exibir = min(50, total)
-                st.markdown(f"**Mostrando os primeiros {exibir} resultados:**")
-                
-                # Estilizar a tabela: cabeçalhos em negrito, bordas, etc.
-                st.dataframe(
-                    resultado.head(50),
-                    use_container_width=True,
-                    height=400,
-                    column_config={
-                        "__index__": None,
-                    }
-                )
+    st.divider()
 
-                # Botão de download
-                if total > 0:
-                    csv = resultado.to_csv(index=False).encode('utf-8')
-                    st.download_button(
-                        label="Baixar Resultados (CSV)",
-                        data=csv,
-                        file_name=f"{nome}_filtrado_{coluna}_{valor}.csv",
-                        mime="text/csv",
-                        type="secondary"
-                    )
+    if valor:
+        limite = 1000
+        # nome e coluna vêm das listas acima (tabelas e colunas do banco), não do usuário
+        if pool is not None:
+            resultado = consultar_mysql(
+                f"SELECT * FROM `{nome}` WHERE CAST(`{coluna}` AS CHAR) LIKE %s LIMIT {limite}",
+                (f"%{valor}%",)
+            )
+        else:
+            # datas ficam como texto ISO no SQLite, então '2014-10' encontra as coletas do mês
+            resultado = banco.consultar(
+                f'SELECT * FROM "{nome}" WHERE CAST("{coluna}" AS TEXT) LIKE ? LIMIT {limite}',
+                (f"%{valor}%",)
+            )
+        total = len(resultado)
+        if total == 0:
+            st.warning("Nenhum resultado encontrado.")
         else:
-            st.info("Ajuste os filtros acima para buscar dados.")
-			
+            st.success(f"Encontrado(s) **{total:,}** registro(s)" + (f" (limitado a {limite})." if total == limite else "."))
+            st.markdown(f"**Mostrando os primeiros {min(50, total)} resultados:**")
+            st.dataframe(resultado.head(50), use_container_width=True, height=400)
+            st.download_button(
+                label="Baixar Resultados (CSV)",
+                data=resultado.to_csv(index=False).encode('utf-8'),
+                file_name=f"{nome}_filtrado_{coluna}_{valor}.csv",
+                mime="text/csv",
+                type="secondary"
+            )
+    else:
+        st.info("Ajuste os filtros acima para buscar dados.")
+
 with aba4: 
     st.markdown("""
         ### Consultas rápidas
@@ -1109,7 +1683,7 @@ with aba4:
                     AND ca.Hora = a.fk_Amostra_Hora
                     AND ca.NumeroDaAmostra = a.fk_Amostra_NumeroDaAmostra
                 JOIN Classificacao c ON a.fk_Classificacao_Parametro_ciano_ = c.Parametro_ciano_
-            WHERE ca.DataColeta = '2014-10-21';
+            WHERE ca.DataColeta >= '2014-10-21' AND ca.DataColeta < '2014-10-22';
         """,
         
         "media_parametro": """
@@ -1309,10 +1883,18 @@ with aba4:
     # atualiza o estado se o usuário digitar algo
     st.session_state.current_query = query
 
+    console_bloqueado = pool is not None and not console_no_banco
+    if console_bloqueado:
+        st.info("O console SQL fica desativado no modo MySQL sem um usuário só de leitura para o app (app_db_user no .env, só com GRANT SELECT).")
+
     # executar resultado
-    if st.button("Executar", type="primary"):
+    if st.button("Executar", type="primary", disabled=console_bloqueado):
         try:
-            resultado = sqldf(query, tabelas)
+            if pool is not None:
+                validar_console(query)
+                resultado = executar_mysql(query, somente_leitura=True)
+            else:
+                resultado = banco.consultar(query)
             st.success(f"{len(resultado)} linhas retornadas.")
             st.dataframe(resultado, use_container_width=True)
 